@@ -1,16 +1,12 @@
-import base64
-import io
 import os
 import random
-import json
+import mimetypes
 import sys
+import time
 from datetime import datetime
-from flask import Flask, request, jsonify, send_from_directory, render_template
-import pandas as pd
+from functools import wraps
+from flask import Flask, request, jsonify, send_from_directory, g
 
-
-import bcrypt
-import gspread
 from dotenv import load_dotenv
 
 # Ensure secrets and sensitive files are not pushed to Git
@@ -21,8 +17,17 @@ from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+
+import storage
+from asset_manifest import AssetManifest, IMMUTABLE_CACHE_CONTROL
+from attempt_spool import AttemptSpool
+from page_cache import PageCache, preferred_encoding
+from password_hashing import PasswordHasher, HashingBusy
+from quiz_sessions import QuizSessionStore, public_question
+from scoring import ScoringEngine, is_correct, score_percent, xp_for
+from session_tokens import SessionTokens, InvalidToken
+from worksheet_cache import clean_worksheet_name
+from user_directory import UserDirectory
 
 # Add the logic/python directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'logic', 'python'))
@@ -34,345 +39,279 @@ try:
     from logic.python import stats
     from logic.python import surface_areas_volumes
     from logic.python import triangles
+    from logic.python import question_pool
+    from logic.python import question_keys
     PYTHON_MODULES_AVAILABLE = True
+    # Keep the dynamic question buffers topped up in the background
+    question_pool.get_pool().start()
 except ImportError as e:
     print(f"Warning: Could not import Python modules: {e}")
     PYTHON_MODULES_AVAILABLE = False
 
+# Load every question bank in logic/pyqs once at startup; question_bank.get_bank() returns
+# the current one, which is swapped in whole when the bank generation changes (hot reload)
+try:
+    from logic.python import question_bank
+    print(f"Question bank loaded: {question_bank.get_bank().filenames()}")
+except ImportError as e:
+    print(f"Warning: Could not load question bank: {e}")
+    question_bank = None
+
 app = Flask(__name__)
 
-# Google Sheets setup
-SERVICE_ACCOUNT_FILE = os.getenv('SERVICE_ACCOUNT_FILE', 'service_account.json')
-SCOPES = os.getenv('SCOPES', 'https://www.googleapis.com/auth/spreadsheets,https://www.googleapis.com/auth/drive').split(',')
-SPREADSHEET_ID = os.getenv('SPREADSHEET_ID', '1FFLrl7f24QKM3xpQSYwib-NmlSE5s4Mb7iXFeVQVYIg')
-SHEET_NAME = os.getenv('SHEET_NAME', 'login')
-try:
-    credentials = service_account.Credentials.from_service_account_file(
-        SERVICE_ACCOUNT_FILE,
-        scopes=SCOPES
-    )
-    gspread_client = gspread.authorize(credentials)
-    sheet_service = build('sheets', 'v4', credentials=credentials)
-    spreadsheet = gspread_client.open_by_key(SPREADSHEET_ID)
-    login_sheet = spreadsheet.worksheet(SHEET_NAME)
-    GOOGLE_SHEETS_AVAILABLE = True
-    print("Google Sheets integration enabled")
-except Exception as e:
-    print(f"Warning: Google Sheets not available: {e}")
-    GOOGLE_SHEETS_AVAILABLE = False
-
-# Fallback: Simple in-memory user storage (for development/testing)
-FALLBACK_USERS = {}
-
-# Fetch users from login sheet
-def get_users():
-    if not GOOGLE_SHEETS_AVAILABLE:
-        # Return fallback users
-        return [[username, user_data['password_hash'], user_data['name']] 
-                for username, user_data in FALLBACK_USERS.items()]
+@app.before_request
+def check_question_bank_generation():
+    """One stat per request; a changed bank generation starts a background reload"""
+    if question_bank is not None:
+        question_bank.check_generation()
+
+# Storage backend: Google Sheets by default, STORAGE_BACKEND=sqlite for the embedded database.
+# Falls back to per-process in-memory storage when Google Sheets is not reachable.
+# Google Sheets connects on a background thread (STORAGE_LAZY_INIT=0 to block startup instead).
+STORAGE = storage.create_backend()
+
+def storage_warming():
+    return isinstance(STORAGE, storage.LazyStorage) and not STORAGE.ready()
+
+def sheets_storage():
+    """The Google Sheets backend once connected; None for other backends or while warming"""
+    backend = storage.unwrap(STORAGE)
+    return backend if isinstance(backend, storage.GoogleSheetsStorage) else None
+
+def require_storage(view):
+    """Answer 503 with status 'warming' until the storage backend is connected"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if storage_warming():
+            return jsonify({
+                'success': False,
+                'status': 'warming',
+                'message': 'Storage is still connecting, please retry shortly'
+            }), 503, {'Retry-After': '1'}
+        return view(*args, **kwargs)
+    return wrapper
+
+# Fetch users from the storage backend (raises on backend errors)
+def load_user_rows():
+    return STORAGE.load_user_rows()
+
+# Users indexed by normalized username for login/registration lookups
+USER_DIRECTORY = UserDirectory(load_user_rows)
+
+# bcrypt runs on a dedicated bounded pool (BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
+PASSWORD_HASHER = PasswordHasher()
+
+# Signed, expiring session tokens issued at login/registration (SESSION_SECRET, SESSION_TTL)
+SESSIONS = SessionTokens()
+
+def bearer_token():
+    header = request.headers.get('Authorization', '')
+    return header[7:].strip() if header.startswith('Bearer ') else None
+
+def require_session(view):
+    """Reject requests without a valid session token; the verified username is set on g.username"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            g.username = SESSIONS.verify(bearer_token())
+        except InvalidToken as e:
+            return jsonify({'success': False, 'message': str(e)}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+def optional_session_user():
+    """The session's username when a valid token is sent, else None (for routes open to guests)"""
+    if bearer_token() is None:
+        return None
     try:
-        result = sheet_service.spreadsheets().values().get(
-            spreadsheetId=SPREADSHEET_ID,
-            range=f'{SHEET_NAME}!A2:C'
-        ).execute()
-        return result.get('values', [])
-    except Exception as e:
-        print(f"Error fetching users from Google Sheets: {e}")
-        return []
+        return SESSIONS.verify(bearer_token())
+    except InvalidToken:
+        return None
+
+def session_forbidden(username):
+    """403 response if the path names a different user than the session, else None"""
+    if username.lower().strip() != g.username:
+        return jsonify({'success': False, 'message': 'Not allowed for this user'}), 403
+    return None
 
 # Append new user
 def append_user(username, password_hash, name):
-    if not GOOGLE_SHEETS_AVAILABLE:
-        # Store in fallback storage
-        FALLBACK_USERS[username] = {
-            'password_hash': password_hash.decode(),
-            'name': name
-        }
-        print(f"DEBUG: User '{username}' stored in fallback storage")
-        return True
-    try:
-        body = {'values': [[username, password_hash.decode(), name]]}
-        sheet_service.spreadsheets().values().append(
-            spreadsheetId=SPREADSHEET_ID,
-            range=f'{SHEET_NAME}!A:C',
-            valueInputOption='RAW',
-            body=body
-        ).execute()
-        return True
-    except Exception as e:
-        print(f"Error appending user to Google Sheets: {e}")
-        return False
+    return STORAGE.append_user(username, password_hash, name)
 
-# Create a worksheet if not already exists
+# Create the user's attempt log (a worksheet in Google Sheets) if not already exists
 def get_or_create_user_worksheet(username):
     """Get existing worksheet or create new one for the user with quiz headers"""
-    if not GOOGLE_SHEETS_AVAILABLE:
-        print("Google Sheets not available, using fallback mode")
-        return f"fallback://{username}_worksheet"
-        
-    try:
-        # Clean username for worksheet name (remove special characters)
-        worksheet_name = username.replace(' ', '_').replace('-', '_').replace('.', '_')
-        worksheet_name = ''.join(c for c in worksheet_name if c.isalnum() or c == '_')
-        print(f"DEBUG: Looking for worksheet: {worksheet_name}")
-        
-        # Get all existing worksheets to check if it already exists
-        all_worksheets = [ws.title for ws in spreadsheet.worksheets()]
-        print(f"DEBUG: All existing worksheets: {all_worksheets}")
-        
-        # Check if worksheet already exists using improved logic
-        # Try exact match first
-        if worksheet_name in all_worksheets:
-            print(f"DEBUG: Worksheet '{worksheet_name}' exists in list, trying to access it...")
-            try:
-                existing_worksheet = spreadsheet.worksheet(worksheet_name)
-                print(f"DEBUG: Successfully accessed existing worksheet: {existing_worksheet.title}")
-                return f"https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}/edit#gid={existing_worksheet.id}"
-            except Exception as access_error:
-                print(f"DEBUG: Could not access existing worksheet '{worksheet_name}': {str(access_error)}")
-        
-        # Try case-insensitive match
-        for ws_name in all_worksheets:
-            if ws_name.lower() == worksheet_name.lower():
-                print(f"DEBUG: Found case-insensitive match: {ws_name}, trying to access it...")
-                try:
-                    existing_worksheet = spreadsheet.worksheet(ws_name)
-                    print(f"DEBUG: Successfully accessed existing worksheet: {existing_worksheet.title}")
-                    return f"https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}/edit#gid={existing_worksheet.id}"
-                except Exception as access_error:
-                    print(f"DEBUG: Could not access existing worksheet '{ws_name}': {str(access_error)}")
-        
-        # Try partial match
-        for ws_name in all_worksheets:
-            if worksheet_name.lower() in ws_name.lower() or ws_name.lower() in worksheet_name.lower():
-                print(f"DEBUG: Found partial match: {ws_name}, trying to access it...")
-                try:
-                    existing_worksheet = spreadsheet.worksheet(ws_name)
-                    print(f"DEBUG: Successfully accessed existing worksheet: {existing_worksheet.title}")
-                    return f"https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}/edit#gid={existing_worksheet.id}"
-                except Exception as access_error:
-                    print(f"DEBUG: Could not access existing worksheet '{ws_name}': {str(access_error)}")
-        
-        print(f"DEBUG: No existing worksheet found for '{worksheet_name}', will create new one")
-        
-        # Create new worksheet (handle potential conflicts)
-        print(f"DEBUG: Creating new worksheet: {worksheet_name}")
-        try:
-            worksheet = spreadsheet.add_worksheet(title=worksheet_name, rows=1000, cols=8)
-            print(f"DEBUG: Created new worksheet: {worksheet.title}")
-        except Exception as create_error:
-            print(f"DEBUG: Error creating worksheet '{worksheet_name}': {str(create_error)}")
-            # Try with a suffix if there's a conflict
-            for i in range(1, 10):
-                try:
-                    new_name = f"{worksheet_name}_{i}"
-                    print(f"DEBUG: Trying alternative name: {new_name}")
-                    worksheet = spreadsheet.add_worksheet(title=new_name, rows=1000, cols=8)
-                    print(f"DEBUG: Created worksheet with alternative name: {worksheet.title}")
-                    break
-                except Exception as alt_error:
-                    print(f"DEBUG: Failed to create worksheet '{new_name}': {str(alt_error)}")
-                    continue
-            else:
-                print(f"DEBUG: Could not create worksheet with any name")
-                return None
-        
-        # Add headers to the first row
-        headers = [
-            'Topic',
-            'Level', 
-            'Question',
-            'Correct Answer',
-            "User's Answer",
-            'Status (Correct/Wrong)',
-            'Time Used (seconds)',
-            'Timestamp'
-        ]
-        
-        worksheet.append_row(headers)
-        print(f"DEBUG: Added headers to new worksheet")
-        
-        # Return worksheet URL
-        return f"https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}/edit#gid={worksheet.id}"
-        
-    except Exception as e:
-        print(f"Error creating worksheet for {username}: {str(e)}")
-        print(f"DEBUG: Full error details: {type(e).__name__}: {str(e)}")
-        return None
+    return STORAGE.get_or_create_user_sheet(username)
 
 def get_user_worksheet(username):
     """Get user's worksheet without creating a new one"""
-    if not GOOGLE_SHEETS_AVAILABLE:
+    sheets = sheets_storage()
+    if sheets is None:
         print("Google Sheets not available, using fallback mode")
         return f"fallback://{username}_worksheet"
-        
-    try:
-        # Clean username for worksheet name
-        worksheet_name = username.replace(' ', '_').replace('-', '_').replace('.', '_')
-        worksheet_name = ''.join(c for c in worksheet_name if c.isalnum() or c == '_')
-        print(f"DEBUG: Getting worksheet: {worksheet_name}")
-        
-        # Get all worksheets to find the correct one
-        all_worksheets = [ws.title for ws in spreadsheet.worksheets()]
-        print(f"DEBUG: All available worksheets: {all_worksheets}")
-        
-        # Try exact match first
-        if worksheet_name in all_worksheets:
-            print(f"DEBUG: Found exact match: {worksheet_name}")
-            worksheet = spreadsheet.worksheet(worksheet_name)
-            print(f"DEBUG: Retrieved worksheet: {worksheet.title}")
-            return worksheet
-        
-        # Try case-insensitive match
-        for ws_name in all_worksheets:
-            if ws_name.lower() == worksheet_name.lower():
-                print(f"DEBUG: Found case-insensitive match: {ws_name}")
-                worksheet = spreadsheet.worksheet(ws_name)
-                print(f"DEBUG: Retrieved worksheet: {worksheet.title}")
-                return worksheet
-        
-        # Try partial match (in case there are special characters or variations)
-        for ws_name in all_worksheets:
-            if worksheet_name.lower() in ws_name.lower() or ws_name.lower() in worksheet_name.lower():
-                print(f"DEBUG: Found partial match: {ws_name}")
-                worksheet = spreadsheet.worksheet(ws_name)
-                print(f"DEBUG: Retrieved worksheet: {worksheet.title}")
-                return worksheet
-        
-        print(f"DEBUG: No worksheet found for {username} (cleaned: {worksheet_name})")
-        return None
-        
-    except Exception as e:
-        print(f"DEBUG: Could not get worksheet for {username}: {str(e)}")
-        return None
+    return sheets.get_user_worksheet(username)
 
-# Log quiz attempt to Google Sheets
-def log_quiz_attempt(username, topic, level, question, correct_answer, user_answer, status, time_used):
-    """Log a single quiz attempt to the user's worksheet"""
-    print(f"DEBUG: Attempting to log quiz attempt for {username}")
-    
-    if not GOOGLE_SHEETS_AVAILABLE:
-        print("Google Sheets not available, using fallback mode - quiz data logged to console")
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"FALLBACK QUIZ LOG: {username} | {topic} | {level} | {question[:50]}... | Correct: {correct_answer} | User: {user_answer} | Status: {status} | Time: {time_used}s | {timestamp}")
-        return True
-        
+# Attempts are spooled locally and written behind to the storage backend
+ATTEMPT_SPOOL = AttemptSpool(STORAGE.append_attempt_rows)
+if not isinstance(STORAGE, storage.MemoryStorage):
+    ATTEMPT_SPOOL.start()
+
+def attempt_row(topic, level, question, correct_answer, user_answer, status, time_used):
+    """One attempt log row, in storage.ATTEMPT_COLUMNS order"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return [
+        topic,
+        level,
+        question,
+        str(correct_answer),
+        str(user_answer),
+        status,
+        str(time_used),
+        timestamp
+    ]
+
+# Log quiz attempts to the user's attempt log
+def log_quiz_attempts(username, rows):
+    """Queue attempt rows for the user's attempt log in one write (flushed behind by ATTEMPT_SPOOL)"""
     try:
-        # Get user's worksheet (don't create new one, just get existing)
-        worksheet = get_user_worksheet(username)
-        
-        if worksheet is None:
-            print(f"DEBUG: Could not get worksheet for {username}, attempting to create one...")
-            # Try to create worksheet if it doesn't exist
-            sheet_url = get_or_create_user_worksheet(username)
-            if sheet_url:
-                worksheet = get_user_worksheet(username)
-                if worksheet is None:
-                    print(f"DEBUG: Still could not get worksheet after creation attempt")
-                    return False
-            else:
-                print(f"DEBUG: Failed to create worksheet for {username}")
-                return False
-        
-        print(f"DEBUG: Using worksheet: {worksheet.title}")
-        
-        # Prepare row data
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        row_data = [
-            topic,
-            level,
-            question,
-            str(correct_answer),
-            str(user_answer),
-            status,
-            str(time_used),
-            timestamp
-        ]
-        print(f"DEBUG: Row data: {row_data}")
-        
-        # Append the row
-        worksheet.append_row(row_data)
-        print(f"DEBUG: Successfully appended row to worksheet")
-        
+        if isinstance(storage.unwrap(STORAGE), storage.MemoryStorage):
+            return STORAGE.append_attempt_rows(username, rows)
+        ATTEMPT_SPOOL.enqueue_many(username, rows)
         return True
         
     except Exception as e:
-        print(f"Error logging quiz attempt for {username}: {str(e)}")
-        print(f"DEBUG: Full error details: {type(e).__name__}: {str(e)}")
+        print(f"Error logging quiz attempts for {username}: {str(e)}")
         return False
 
+def log_quiz_attempt(username, topic, level, question, correct_answer, user_answer, status, time_used):
+    """Queue a single quiz attempt for the user's attempt log"""
+    return log_quiz_attempts(username, [attempt_row(topic, level, question, correct_answer, user_answer, status, time_used)])
+
 @app.route('/api/quiz/log-attempt', methods=['POST'])
+@require_session
 def log_quiz_attempt_api():
-    """API endpoint to log quiz attempts to Google Sheets"""
-    print(f"DEBUG: Received quiz log attempt request")
+    """
+    API endpoint to log quiz attempts to Google Sheets.
+    Preferred body: {question_id, user_answer, time_used}; topic, level, correct answer and
+    status come from the question bank. The older full-text body is still accepted.
+    Only questions served to the user in a quiz session can be logged by id: the logged
+    row (and so /api/quiz/attempts) carries the correct answer.
+    """
     try:
         data = request.get_json()
-        print(f"DEBUG: Request data: {data}")
         
-        username = data.get('username')
-        topic = data.get('topic')
-        level = data.get('level')
-        question = data.get('question')
-        correct_answer = data.get('correct_answer')
+        username = g.username
         user_answer = data.get('user_answer')
-        status = data.get('status')  # 'Correct' or 'Wrong'
         time_used = data.get('time_used')  # seconds
-        
-        print(f"DEBUG: Extracted data - username: {username}, topic: {topic}, level: {level}")
-        print(f"DEBUG: question: {question[:50]}..., correct: {correct_answer}, user: {user_answer}, status: {status}, time: {time_used}")
+        question_id = data.get('question_id')
+        if question_id:
+            if question_id not in QUIZ_SESSIONS.issued_ids(username):
+                return jsonify({'success': False, 'message': f"Question '{question_id}' was not served to you in a quiz session"}), 403
+            entry = lookup_question(question_id)
+            if entry is None:
+                return jsonify({'success': False, 'message': f"Unknown question_id '{question_id}'"}), 404
+            filename, level, bank_question = entry
+            topic = question_bank.topic_keys(filename)[0]
+            question = question_id
+            correct_answer = bank_question.get('answer')
+            status = 'Correct' if is_correct(bank_question, user_answer) else 'Wrong'
+        else:
+            topic = data.get('topic')
+            level = data.get('level')
+            question = data.get('question')
+            correct_answer = data.get('correct_answer')
+            status = data.get('status')  # 'Correct' or 'Wrong'
         
         if not all([username, topic, level, question, correct_answer, user_answer, status, time_used is not None]):
-            print(f"DEBUG: Missing required fields")
             return jsonify({'success': False, 'message': 'Missing required fields'}), 400
         
         # Log the attempt
         success = log_quiz_attempt(username, topic, level, question, correct_answer, user_answer, status, time_used)
         
         if success:
-            print(f"DEBUG: Quiz attempt logged successfully")
             return jsonify({'success': True, 'message': 'Quiz attempt logged successfully'})
         else:
-            print(f"DEBUG: Failed to log quiz attempt")
             return jsonify({'success': False, 'message': 'Failed to log quiz attempt'}), 500
             
     except Exception as e:
-        print(f"DEBUG: Exception in log_quiz_attempt_api: {str(e)}")
+        print(f"Error in log_quiz_attempt_api: {str(e)}")
         return jsonify({'success': False, 'message': f'Error logging quiz attempt: {str(e)}'}), 500
 
+@app.route('/api/quiz/attempts/<username>', methods=['GET'])
+@require_session
+@require_storage
+def get_quiz_attempts(username):
+    """Most recent logged attempts for a user (?limit=, default 100; ?expand=1 adds the question lookup table)"""
+    forbidden = session_forbidden(username)
+    if forbidden:
+        return forbidden
+    try:
+        limit = int(request.args.get('limit', 100))
+        rows = STORAGE.get_attempts(username.lower().strip(), limit=limit)
+        response = {
+            'success': True,
+            'columns': storage.ATTEMPT_COLUMNS,
+            'attempts': rows
+        }
+        if request.args.get('expand') in ('1', 'true'):
+            question_ids = {row[2] for row in rows if len(row) > 2}
+            response['questions'] = question_lookup(question_ids)
+        return jsonify(response)
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error reading attempts: {str(e)}'}), 500
+
+@app.route('/api/status', methods=['GET'])
+def status():
+    """Readiness of the storage backend ('warming' until it is connected, then 'ready') and this worker's bank generation"""
+    return jsonify({
+        'status': 'warming' if storage_warming() else 'ready',
+        'storage': STORAGE.stats(),
+        'password_hashing': PASSWORD_HASHER.stats(),
+        'question_bank': question_bank.reload_stats() if question_bank is not None else None
+    })
+
 @app.route('/api/test-sheets', methods=['GET'])
+@require_storage
 def test_sheets():
     """Test endpoint to verify Google Sheets is working"""
     try:
-        if not GOOGLE_SHEETS_AVAILABLE:
+        sheets = sheets_storage()
+        if sheets is None:
             return jsonify({'success': False, 'message': 'Google Sheets not available'})
         
         # Try to access the spreadsheet
-        spreadsheet_info = spreadsheet.title
-        worksheets = [ws.title for ws in spreadsheet.worksheets()]
+        spreadsheet_info = sheets.spreadsheet.title
+        worksheets = [ws.title for ws in sheets.spreadsheet.worksheets()]
         
-        # Get all users from the login sheet
-        users = get_users()
+        # Only counts: the login sheet rows hold password hashes
+        user_directory = USER_DIRECTORY.stats()
         
         return jsonify({
             'success': True,
             'message': 'Google Sheets is working',
             'spreadsheet_title': spreadsheet_info,
             'worksheets': worksheets,
-            'users_in_login_sheet': users,
-            'user_count': len(users)
+            'user_count': user_directory['size'],
+            'storage': STORAGE.stats(),
+            'attempt_spool': ATTEMPT_SPOOL.stats(),
+            'user_directory': user_directory,
+            'sessions': SESSIONS.stats(),
+            'quiz_sessions': QUIZ_SESSIONS.stats()
         })
     except Exception as e:
         return jsonify({'success': False, 'message': f'Google Sheets error: {str(e)}'})
 
 @app.route('/api/test-quiz-log', methods=['POST'])
+@require_session
+@require_storage
 def test_quiz_log():
     """Test endpoint to manually test quiz logging"""
     try:
-        if not GOOGLE_SHEETS_AVAILABLE:
+        sheets = sheets_storage()
+        if sheets is None:
             return jsonify({'success': False, 'message': 'Google Sheets not available'})
         
-        data = request.get_json()
-        username = data.get('username', 'testuser')
+        username = g.username
         
         # Test data
         test_data = {
@@ -420,18 +359,23 @@ def test_quiz_log():
         })
 
 @app.route('/api/test-worksheet/<username>', methods=['GET'])
+@require_session
+@require_storage
 def test_worksheet(username):
     """Test endpoint to check user's worksheet status"""
+    forbidden = session_forbidden(username)
+    if forbidden:
+        return forbidden
     try:
-        if not GOOGLE_SHEETS_AVAILABLE:
+        sheets = sheets_storage()
+        if sheets is None:
             return jsonify({'success': False, 'message': 'Google Sheets not available'})
         
         # Clean username
-        clean_username = username.replace(' ', '_').replace('-', '_').replace('.', '_')
-        clean_username = ''.join(c for c in clean_username if c.isalnum() or c == '_')
+        clean_username = clean_worksheet_name(username)
         
-        # Get all worksheets to see what exists
-        all_worksheets = [ws.title for ws in spreadsheet.worksheets()]
+        # Worksheet titles come from the shared worksheet cache
+        all_worksheets = sheets.worksheet_cache.titles()
         
         print(f"DEBUG: All worksheets: {all_worksheets}")
         print(f"DEBUG: Looking for worksheet: '{clean_username}'")
@@ -498,18 +442,23 @@ def test_worksheet(username):
         })
 
 @app.route('/api/find-worksheet/<username>', methods=['GET'])
+@require_session
+@require_storage
 def find_worksheet(username):
     """Find the exact worksheet name for a user"""
+    forbidden = session_forbidden(username)
+    if forbidden:
+        return forbidden
     try:
-        if not GOOGLE_SHEETS_AVAILABLE:
+        sheets = sheets_storage()
+        if sheets is None:
             return jsonify({'success': False, 'message': 'Google Sheets not available'})
         
         # Clean username
-        clean_username = username.replace(' ', '_').replace('-', '_').replace('.', '_')
-        clean_username = ''.join(c for c in clean_username if c.isalnum() or c == '_')
+        clean_username = clean_worksheet_name(username)
         
-        # Get all worksheets
-        all_worksheets = [ws.title for ws in spreadsheet.worksheets()]
+        # Worksheet titles come from the shared worksheet cache
+        all_worksheets = sheets.worksheet_cache.titles()
         
         # Find potential matches
         exact_matches = [ws for ws in all_worksheets if ws == clean_username]
@@ -523,7 +472,8 @@ def find_worksheet(username):
             'all_worksheets': all_worksheets,
             'exact_matches': exact_matches,
             'case_insensitive_matches': case_insensitive_matches,
-            'partial_matches': partial_matches
+            'partial_matches': partial_matches,
+            'cache': sheets.worksheet_cache.stats()
         })
         
     except Exception as e:
@@ -533,25 +483,33 @@ def find_worksheet(username):
         })
 
 # ---------------- QUESTION LOADER ---------------- #
-LOGIC_FOLDER = os.path.join(os.path.dirname(__file__), 'logic')
-
-# Load all questions into memory    
-def load_questions():
-    questions_by_topic = {}
-    for filename in os.listdir(LOGIC_FOLDER):
-        if filename.endswith(".json"):
-            topic_name = filename.replace("_mcqs_by_level.json", "").replace(".json", "")
-            try:
-                with open(os.path.join(LOGIC_FOLDER, filename), "r", encoding='utf-8') as f:
-                    data = json.load(f)
-                    questions_by_topic[topic_name.lower()] = data
-            except Exception as e:
-                print(f"Failed to load {filename}: {e}")
-    return questions_by_topic
+# Topic index over the in-memory question bank: canonical keys and aliases
+# (e.g. 'triangle'/'triangles', 'Algebra_CBSE_MCQ_by_Difficulty_FULL'/'algebra')
 
-QUESTIONS_DB = load_questions()
+DEFAULT_QUIZ_QUESTIONS = 5
+MAX_QUIZ_QUESTIONS = int(os.getenv('MAX_QUIZ_QUESTIONS', '50'))
+MAX_BATCH_QUESTIONS = int(os.getenv('MAX_BATCH_QUESTIONS', '10000'))
+SEARCH_PER_PAGE = 20
+MAX_SEARCH_PER_PAGE = 100
 
 # ---------------- STATIC FILES ---------------- #
+# Fingerprinted assets from build_assets.py; templates resolve names with asset_url()/asset_picture()
+ASSETS = AssetManifest()
+app.jinja_env.globals.update(asset_url=ASSETS.url, asset_picture=ASSETS.picture)
+
+@app.route('/dist/<path:filename>')
+def serve_dist(filename):
+    """Fingerprinted asset (or its precompressed sibling), cacheable for a year"""
+    encoding = preferred_encoding(request.headers.get('Accept-Encoding', ''), ASSETS.encodings.get(filename, ()))
+    suffix = {'br': '.br', 'gzip': '.gz'}.get(encoding, '')
+    response = send_from_directory(ASSETS.folder, filename + suffix)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+        response.mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
+
 @app.route('/assets/<path:filename>')
 def serve_assets(filename):
     return send_from_directory('assets', filename)
@@ -565,27 +523,33 @@ def serve_script():
     return send_from_directory('templates', 'script.js')
 
 # ---------------- ROUTES ---------------- #
+# The page templates take no context: render them once and serve cached (precompressed) bytes.
+# In debug mode a page is re-rendered when its template file changes.
+PAGE_CACHE = PageCache(app, ['index.html', 'home.html', 'dashboard.html', 'quiz.html', 'result.html'])
+PAGE_CACHE.render_all()
+
 @app.route('/')
 def index():
-    return render_template('index.html')
+    return PAGE_CACHE.response('index.html')
 
 @app.route('/home')
 def home():
-    return render_template('home.html')
+    return PAGE_CACHE.response('home.html')
 
 @app.route('/dashboard')
 def dashboard():
-    return render_template('dashboard.html')
+    return PAGE_CACHE.response('dashboard.html')
 
 @app.route('/quiz')
 def quiz():
-    return render_template('quiz.html')
+    return PAGE_CACHE.response('quiz.html')
 
 @app.route('/result')
 def result():
-    return render_template('result.html')
+    return PAGE_CACHE.response('result.html')
 
 # ---------------- PYTHON MODULE APIs ---------------- #
+# Every question route returns public_question() copies: answers stay on the server for grading
 @app.route('/api/python/algebra/<level>', methods=['GET'])
 def get_algebra_question(level):
     """Get algebra question from Python module"""
@@ -597,44 +561,15 @@ def get_algebra_question(level):
         return jsonify({
             "topic": "algebra",
             "level": level,
-            "question": question
+            "question": public_question(question)
         })
     except Exception as e:
         return jsonify({"error": f"Error getting algebra question: {str(e)}"}), 500
 
 @app.route('/api/python/algebra/quiz/<level>', methods=['GET'])
 def get_algebra_quiz_questions(level):
-    """Get 5 algebra questions for quiz from JSON file"""
-    try:
-        # Load algebra questions from JSON file
-        json_file_path = os.path.join(LOGIC_FOLDER, 'pyqs', 'Algebra_CBSE_MCQ_by_Difficulty_FULL.json')
-        
-        with open(json_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Get questions for the specified level
-        if level.lower() in data and data[level.lower()]:
-            # Select 5 random questions from the available questions
-            available_questions = data[level.lower()]
-            if len(available_questions) >= 5:
-                selected_questions = random.sample(available_questions, 5)
-            else:
-                # If less than 5 questions available, use all available
-                selected_questions = available_questions
-            
-            return jsonify({
-                "topic": "algebra",
-                "level": level,
-                "total_questions": len(selected_questions),
-                "questions": selected_questions
-            })
-        else:
-            return jsonify({"error": f"No questions available for level '{level}'"}), 404
-            
-    except FileNotFoundError:
-        return jsonify({"error": "Algebra questions JSON file not found"}), 404
-    except Exception as e:
-        return jsonify({"error": f"Error loading algebra questions: {str(e)}"}), 500
+    """Get algebra quiz questions (kept for older clients; same as /api/python/quiz/algebra/<level>)"""
+    return get_quiz_questions('algebra', level)
 
 @app.route('/api/python/real_numbers/<level>', methods=['GET'])
 def get_real_numbers_question(level):
@@ -643,11 +578,14 @@ def get_real_numbers_question(level):
         return jsonify({"error": "Python modules not available"}), 500
     
     try:
-        question = real_numbers.get_question(level)
+        # ?mode=dynamic serves a pre-generated question from the question pool
+        mode = request.args.get('mode', 'static')
+        question = real_numbers.get_question(level=level, mode=mode)
         return jsonify({
             "topic": "real_numbers",
             "level": level,
-            "question": question
+            "mode": mode,
+            "question": public_question(question)
         })
     except Exception as e:
         return jsonify({"error": f"Error getting real numbers question: {str(e)}"}), 500
@@ -666,7 +604,7 @@ def get_stats_question(level):
             "topic": "statistics",
             "level": level,
             "mode": mode,
-            "question": question
+            "question": public_question(question)
         })
     except Exception as e:
         return jsonify({"error": f"Error getting statistics question: {str(e)}"}), 500
@@ -678,11 +616,14 @@ def get_surface_areas_volumes_question(level):
         return jsonify({"error": "Python modules not available"}), 500
     
     try:
-        question = surface_areas_volumes.get_question(level)
+        # ?mode=dynamic serves a pre-generated question from the question pool
+        mode = request.args.get('mode', 'static')
+        question = surface_areas_volumes.get_question(level=level, mode=mode)
         return jsonify({
             "topic": "surface_areas_volumes",
             "level": level,
-            "question": question
+            "mode": mode,
+            "question": public_question(question)
         })
     except Exception as e:
         return jsonify({"error": f"Error getting surface areas and volumes question: {str(e)}"}), 500
@@ -694,11 +635,14 @@ def get_triangles_question(level):
         return jsonify({"error": "Python modules not available"}), 500
     
     try:
-        question = triangles.get_question(level)
+        # ?mode=dynamic serves a pre-generated question from the question pool
+        mode = request.args.get('mode', 'static')
+        question = triangles.get_question(level=level, mode=mode)
         return jsonify({
             "topic": "triangles",
             "level": level,
-            "question": question
+            "mode": mode,
+            "question": public_question(question)
         })
     except Exception as e:
         return jsonify({"error": f"Error getting triangles question: {str(e)}"}), 500
@@ -706,7 +650,7 @@ def get_triangles_question(level):
 # ---------------- UNIFIED PYTHON API ---------------- #
 @app.route('/api/python/question/<topic>/<level>', methods=['GET'])
 def get_python_question(topic, level):
-    """Unified API to get questions from any Python module"""
+    """Unified API to get questions from any Python module (?count=N for a batch)"""
     if not PYTHON_MODULES_AVAILABLE:
         return jsonify({"error": "Python modules not available"}), 500
     
@@ -724,66 +668,245 @@ def get_python_question(topic, level):
     try:
         module = topic_mapping[topic]
         
-        # Handle special case for stats module which has mode parameter
-        if topic == 'statistics':
+        # ?count=N returns a batch generated in one pass (optionally reproducible via ?seed=)
+        if 'count' in request.args:
+            try:
+                count = int(request.args['count'])
+                seed = int(request.args['seed']) if 'seed' in request.args else None
+            except ValueError:
+                return jsonify({"error": "Query parameters 'count' and 'seed' must be integers"}), 400
+            if count < 1 or count > MAX_BATCH_QUESTIONS:
+                return jsonify({"error": f"Query parameter 'count' must be between 1 and {MAX_BATCH_QUESTIONS}"}), 400
+            
+            if topic == 'algebra':
+                questions = module.get_questions(level, count, seed=seed)
+            else:
+                questions = module.get_questions(level=level, count=count, seed=seed, mode=request.args.get('mode', 'static'))
+            if isinstance(questions, dict):
+                return jsonify(questions), 400
+            
+            return jsonify({
+                "topic": topic,
+                "level": level,
+                "count": len(questions),
+                "questions": [public_question(q) for q in questions]
+            })
+        
+        # Every module but algebra has generators: ?mode=dynamic serves from the question pool
+        if topic == 'algebra':
+            question = module.get_question(level)
+        else:
             mode = request.args.get('mode', 'static')
             question = module.get_question(level=level, mode=mode)
-        else:
-            question = module.get_question(level)
         
         return jsonify({
             "topic": topic,
             "level": level,
-            "question": question
+            "question": public_question(question)
         })
     except Exception as e:
         return jsonify({"error": f"Error getting {topic} question: {str(e)}"}), 500
 
+def sample_unseen_questions(bank, username, topic, level, count):
+    """
+    Sample for a signed-in user, preferring questions they have not been served yet.
+    The user's seen-set for the topic/level is read from and written back to STORAGE,
+    so every worker sees it; if storage is unavailable this is a plain sample.
+    """
+    level = level.lower()
+    try:
+        seen = STORAGE.get_seen_set(username, topic, level)
+    except Exception as e:
+        print(f"Warning: seen-set unavailable for {username} ({topic}/{level}): {e}")
+        return bank.topic_sample(topic, level, count)
+    selected_questions, seen = bank.topic_sample_unseen(topic, level, count, seen)
+    if selected_questions:
+        try:
+            STORAGE.put_seen_set(username, topic, level, seen)
+        except Exception as e:
+            print(f"Warning: could not save seen-set for {username} ({topic}/{level}): {e}")
+    return selected_questions
+
+def select_quiz_questions(topic, level, count, username=None):
+    """
+    Sample quiz questions for a topic (or alias) and level from the question bank;
+    with a username, questions the user has already seen are avoided until the pool runs out.
+    Returns (questions, None) or (None, error response).
+    """
+    try:
+        count = int(count)
+    except (TypeError, ValueError):
+        return None, (jsonify({"error": "Question count 'n' must be an integer"}), 400)
+    if count < 1:
+        return None, (jsonify({"error": "Question count 'n' must be at least 1"}), 400)
+    count = min(count, MAX_QUIZ_QUESTIONS)
+    
+    # Resolve the topic (or any alias) through the bank manifest
+    bank = question_bank.get_bank()
+    canonical_topic = bank.resolve_topic(topic)
+    if canonical_topic is None:
+        return None, (jsonify({"error": f"Topic '{topic}' not supported for quiz generation"}), 404)
+    
+    if username:
+        selected_questions = sample_unseen_questions(bank, username, canonical_topic, level, count)
+    else:
+        selected_questions = bank.topic_sample(canonical_topic, level, count)
+    if not selected_questions:
+        return None, (jsonify({"error": f"No questions available for {topic} level '{level}'"}), 404)
+    return selected_questions, None
+
 @app.route('/api/python/quiz/<topic>/<level>', methods=['GET'])
 def get_quiz_questions(topic, level):
-    """Get 5 quiz questions for any topic from JSON files"""
+    """
+    Get quiz questions for any topic from the in-memory question bank (?n= sets the count, default 5).
+    With a session token, questions the user has already seen are served last.
+    """
     try:
-        # Map topic names to JSON file names
-        topic_to_json = {
-            'algebra': 'Algebra_CBSE_MCQ_by_Difficulty_FULL.json',
-            'real_numbers': 'Real_Numbers_CBSE_MCQ_by_Difficulty_FULL.json',
-            'statistics': 'Statistics_CBSE_MCQ_by_Difficulty_FULL.json',
-            'surface_areas_volumes': 'Surface_Areas_Volumes_CBSE_MCQ_by_Difficulty_FULL.json',
-            'triangles': 'Triangles_CBSE_MCQ_by_Difficulty_FULL.json'
-        }
+        selected_questions, error = select_quiz_questions(topic, level, request.args.get('n', DEFAULT_QUIZ_QUESTIONS),
+                                                          optional_session_user())
+        if error:
+            return error
         
-        if topic not in topic_to_json:
-            return jsonify({"error": f"Topic '{topic}' not supported for quiz generation"}), 404
+        # Answers stay on the server; grading happens through /api/quiz/session/*
+        return jsonify({
+            "topic": topic,
+            "level": level,
+            "total_questions": len(selected_questions),
+            "questions": [public_question(q) for q in selected_questions]
+        })
+            
+    except Exception as e:
+        return jsonify({"error": f"Error loading {topic} questions: {str(e)}"}), 500
+
+# ---------------- QUIZ SESSIONS ---------------- #
+# The answer key stays on the server: clients get questions without answers and submit once
+QUIZ_SESSIONS = QuizSessionStore()
+
+@app.route('/api/quiz/session/start', methods=['POST'])
+@require_session
+def start_quiz_session():
+    """Start a quiz: {topic, level, n?} -> session id and questions without answers"""
+    try:
+        data = request.get_json(silent=True) or {}
+        topic = data.get('topic', '')
+        level = data.get('level', '')
+        selected_questions, error = select_quiz_questions(topic, level, data.get('n', DEFAULT_QUIZ_QUESTIONS), g.username)
+        if error:
+            return error
         
-        json_filename = topic_to_json[topic]
-        json_file_path = os.path.join(LOGIC_FOLDER, 'pyqs', json_filename)
+        session = QUIZ_SESSIONS.start(g.username, topic, level, selected_questions)
+        return jsonify({
+            "session_id": session.session_id,
+            "topic": topic,
+            "level": level,
+            "expires_at": int(session.expires),
+            "total_questions": len(session.questions),
+            "questions": [public_question(q) for q in session.questions]
+        })
+    except Exception as e:
+        return jsonify({"error": f"Error starting quiz: {str(e)}"}), 500
+
+@app.route('/api/quiz/session/submit', methods=['POST'])
+@require_session
+def submit_quiz_session():
+    """
+    Grade a whole quiz against the session's answer key and log every attempt in one write.
+    Body: {session_id, answers: [{answer, time_used}, ...]} in question order.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        answers = data.get('answers')
+        if not isinstance(answers, list):
+            return jsonify({'success': False, 'message': "'answers' must be a list"}), 400
         
-        with open(json_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        session = QUIZ_SESSIONS.pop(data.get('session_id'), g.username)
+        if session is None:
+            return jsonify({'success': False, 'message': 'Quiz session not found or expired'}), 404
         
-        # Get questions for the specified level
-        if level.lower() in data and data[level.lower()]:
-            # Select 5 random questions from the available questions
-            available_questions = data[level.lower()]
-            if len(available_questions) >= 5:
-                selected_questions = random.sample(available_questions, 5)
-            else:
-                # If less than 5 questions available, use all available
-                selected_questions = available_questions
-            
-            return jsonify({
-                "topic": topic,
-                "level": level,
-                "total_questions": len(selected_questions),
-                "questions": selected_questions
-            })
-        else:
-            return jsonify({"error": f"No questions available for {topic} level '{level}'"}), 404
-            
-    except FileNotFoundError:
-        return jsonify({"error": f"Questions JSON file for topic '{topic}' not found"}), 404
+        results = []
+        rows = []
+        for index, question in enumerate(session.questions):
+            submitted = answers[index] if index < len(answers) and isinstance(answers[index], dict) else {}
+            user_answer = submitted.get('answer')
+            time_used = submitted.get('time_used', 0)
+            correct = is_correct(question, user_answer)
+            results.append({'question_id': question.get('id'), 'correct': correct, 'correct_answer': question.get('answer')})
+            rows.append(attempt_row(session.topic, session.level, question.get('id') or question.get('question', ''),
+                                    question.get('answer'), user_answer, 'Correct' if correct else 'Wrong', time_used))
+        
+        correct_count = sum(result['correct'] for result in results)
+        score = score_percent(correct_count, len(results))
+        logged = log_quiz_attempts(g.username, rows)
+        return jsonify({
+            'success': True,
+            'logged': logged,
+            'topic': session.topic,
+            'level': session.level,
+            'total_questions': len(results),
+            'correct_answers': correct_count,
+            'score': score,
+            'xp': xp_for(score, session.level),
+            'results': results
+        })
     except Exception as e:
-        return jsonify({"error": f"Error loading {topic} questions: {str(e)}"}), 500
+        print(f"DEBUG: Exception in submit_quiz_session: {str(e)}")
+        return jsonify({'success': False, 'message': f'Error submitting quiz: {str(e)}'}), 500
+
+@app.route('/api/python/quiz/manifest', methods=['GET'])
+def get_quiz_manifest():
+    """Topic -> bank file and per-level pool sizes, as loaded from logic/pyqs"""
+    return jsonify({"manifest": question_bank.get_bank().manifest()})
+
+@app.route('/api/python/pool/metrics', methods=['GET'])
+def get_question_pool_metrics():
+    """Fill levels and refill rate of the pre-generated dynamic question buffers"""
+    if not PYTHON_MODULES_AVAILABLE:
+        return jsonify({"error": "Python modules not available"}), 500
+    return jsonify(question_pool.get_pool().metrics())
+
+@app.route('/api/python/generated/<topic>/<level>', methods=['GET'])
+def get_generated_question(topic, level):
+    """A new seed-addressable dynamic question (?type= and ?seed= pin it); its key regenerates it"""
+    if not PYTHON_MODULES_AVAILABLE:
+        return jsonify({"error": "Python modules not available"}), 500
+    if topic not in question_keys.topics():
+        return jsonify({"error": f"Topic '{topic}' has no generated questions"}), 404
+    try:
+        seed = int(request.args['seed']) if 'seed' in request.args else None
+    except ValueError:
+        return jsonify({"error": "Query parameter 'seed' must be an integer"}), 400
+    if seed is not None and not 0 <= seed < 2 ** question_keys.SEED_BITS:
+        return jsonify({"error": f"Query parameter 'seed' must be between 0 and 2^{question_keys.SEED_BITS} - 1"}), 400
+    q_type = request.args.get('type')
+    if q_type is None and seed is None:
+        # Nothing pinned: any keyed question will do, so take a pre-generated one
+        question = question_pool.pop(topic, level)
+    else:
+        question = question_keys.generate(topic, level, q_type=q_type, seed=seed)
+    if 'error' in question:
+        return jsonify(question), 400
+    return jsonify({
+        "topic": topic,
+        "level": level.lower(),
+        "key": question['key'],
+        "question": public_question(question)
+    })
+
+@app.route('/api/python/generated/<topic>/<level>/<q_type>/<seed>', methods=['GET'])
+def regenerate_question(topic, level, q_type, seed):
+    """The identical generated question for a key (topic/level/type/seed)"""
+    if not PYTHON_MODULES_AVAILABLE:
+        return jsonify({"error": "Python modules not available"}), 500
+    key = question_keys.make_key(topic, level, q_type, seed)
+    question = question_keys.regenerate(key)
+    if question is None:
+        return jsonify({"error": f"Unknown question key '{key}'"}), 404
+    return jsonify({
+        "topic": topic,
+        "level": level,
+        "key": key,
+        "question": public_question(question)
+    })
 
 # ---------------- AVAILABLE TOPICS API ---------------- #
 @app.route('/api/python/topics', methods=['GET'])
@@ -806,19 +929,85 @@ def get_available_python_topics():
     })
 
 # ---------------- EXISTING APIs ---------------- #
+def lookup_question(question_id):
+    """(source, level, question) for a bank question id or a generated-question key"""
+    entry = question_bank.get_bank().lookup(question_id)
+    if entry is None and PYTHON_MODULES_AVAILABLE:
+        entry = question_keys.lookup(question_id)
+    return entry
+
+def question_lookup(question_ids):
+    """{id: question text, options, topic, level} for the bank ids and generated keys found"""
+    found = {}
+    for question_id in question_ids:
+        described = question_bank.get_bank().describe(question_id)
+        if described is None and PYTHON_MODULES_AVAILABLE:
+            described = question_keys.describe(question_id)
+        if described is not None:
+            found[question_id] = described
+    return found
+
+@app.route('/api/questions/lookup', methods=['GET'])
+def lookup_questions():
+    """Question text for logged question ids (?ids=id1,id2,...)"""
+    question_ids = [qid for qid in request.args.get('ids', '').split(',') if qid]
+    if not question_ids:
+        return jsonify({"error": "Query parameter 'ids' is required"}), 400
+    if len(question_ids) > MAX_QUIZ_QUESTIONS * 20:
+        return jsonify({"error": "Too many ids"}), 400
+    return jsonify({"questions": question_lookup(question_ids)})
+
+@app.route('/api/search', methods=['GET'])
+def search_questions():
+    """
+    Search question text and options across every topic through the bank's inverted index.
+    ?q= terms (all must match; 'trig*' matches a prefix), optional ?topic= and ?level= filters,
+    ?page= and ?per_page= for pagination. Results are ranked and carry no answers.
+    """
+    start = time.perf_counter()
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"error": "Query parameter 'q' is required"}), 400
+    try:
+        page = int(request.args.get('page', 1))
+        per_page = int(request.args.get('per_page', SEARCH_PER_PAGE))
+    except ValueError:
+        return jsonify({"error": "Query parameters 'page' and 'per_page' must be integers"}), 400
+    if page < 1 or not 1 <= per_page <= MAX_SEARCH_PER_PAGE:
+        return jsonify({"error": f"'page' must be at least 1 and 'per_page' between 1 and {MAX_SEARCH_PER_PAGE}"}), 400
+
+    bank = question_bank.get_bank()
+    topic = request.args.get('topic')
+    if topic:
+        topic = bank.resolve_topic(topic)
+        if topic is None:
+            return jsonify({"error": f"Topic '{request.args['topic']}' not found"}), 404
+    level = request.args.get('level', '').lower() or None
+
+    total, page_ids, facets = bank.search_index().search(
+        query, topic=topic, level=level, offset=(page - 1) * per_page, limit=per_page)
+    results = []
+    for question_id, score in page_ids:
+        described = bank.describe(question_id)
+        if described is not None:
+            results.append(dict(described, score=score))
+    return jsonify({
+        "query": query,
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "results": results,
+        "facets": facets,
+        "took_ms": round((time.perf_counter() - start) * 1000, 3)
+    })
+
 @app.route('/api/topics', methods=['GET'])
 def list_topics():
-    return jsonify({"available_topics": list(QUESTIONS_DB.keys())})
+    return jsonify({"available_topics": question_bank.get_bank().topics()})
 
 @app.route('/api/questions/<topic>', methods=['GET'])
 def get_questions(topic):
-    topic_key = topic.lower().replace(" ", "_")
-    topic_data = None
-
-    for key in QUESTIONS_DB:
-        if topic_key in key:
-            topic_data = QUESTIONS_DB[key]
-            break
+    topic_data = question_bank.get_bank().topic_levels(topic)
 
     if not topic_data:
         return jsonify({"error": "Topic not found"}), 404
@@ -827,43 +1016,54 @@ def get_questions(topic):
     output = {}
 
     for level in levels:
-        if level in topic_data and isinstance(topic_data[level], list):
-            output[level] = random.sample(topic_data[level], min(2, len(topic_data[level])))
-        else:
-            output[level] = []
+        questions = topic_data.get(level, ())
+        output[level] = [public_question(q) for q in random.sample(questions, min(2, len(questions)))]
 
     return jsonify({
         "topic": topic,
         "questions": output
     })
 
+# Answer key for bank questions, indexed by question id
+SCORING = ScoringEngine(lookup_question)
+MAX_BULK_SUBMISSIONS = int(os.getenv('MAX_BULK_SUBMISSIONS', '100'))
+
 @app.route('/api/quiz/submit', methods=['POST'])
+@require_session
 def submit_quiz():
+    """
+    Grade answers against the question bank.
+    One quiz: {answers: {question_id: answer} | [{question_id, answer}], topic?}
+    Bulk: {submissions: [<quiz>, ...]}
+    Returns score, XP and per-question results for each quiz. The level (and XP)
+    comes from the bank. Per-question correctness is only returned for questions
+    served to the user in a quiz session, and correct answers only once that
+    session was graded; any other question counts towards the score alone.
+    """
     try:
-        data = request.get_json()
-        answers = data.get('answers', {})
-        topic = data.get('topic', '')
-        
-        # Calculate score (simple implementation)
-        correct_answers = 0
-        total_questions = len(answers)
-        
-        # For now, just return a basic result
-        # You can implement more sophisticated scoring logic here
-        score_percentage = random.randint(60, 95)  # Placeholder
+        data = request.get_json(silent=True) or {}
+        reveal = QUIZ_SESSIONS.graded_ids(g.username)
+        issued = QUIZ_SESSIONS.issued_ids(g.username)
+        if 'submissions' in data:
+            submissions = data['submissions']
+            if not isinstance(submissions, list):
+                return jsonify({"error": "'submissions' must be a list"}), 400
+            if len(submissions) > MAX_BULK_SUBMISSIONS:
+                return jsonify({"error": f"At most {MAX_BULK_SUBMISSIONS} submissions per request"}), 400
+            return jsonify({
+                "success": True,
+                "results": SCORING.grade_many((s if isinstance(s, dict) else {} for s in submissions), reveal, issued)
+            })
         
-        return jsonify({
-            "success": True,
-            "score": score_percentage,
-            "total_questions": total_questions,
-            "correct_answers": correct_answers,
-            "topic": topic
-        })
+        return jsonify(dict(SCORING.grade(data, reveal, issued), success=True))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 # ---------------- GOOGLE SHEETS AUTHENTICATION APIs ---------------- #
 @app.route('/api/register', methods=['POST'])
+@require_storage
 def register():
     """Register new user with Google Sheets exclusively"""
     try:
@@ -880,34 +1080,38 @@ def register():
         if len(password) < 6:
             return jsonify({'success': False, 'message': 'Password must be at least 6 characters long'}), 400
 
-        # Check if user already exists in Google Sheets
-        users = get_users()
-        print(f"DEBUG: Existing users in sheet: {users}")
-        if any(user[0].lower() == username for user in users):
+        # Check if user already exists
+        if USER_DIRECTORY.exists(username):
             return jsonify({'success': False, 'message': 'Username already registered'}), 400
 
-        # Hash password with bcrypt and add user to Google Sheets
-        password_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt())
-        print(f"DEBUG: Password hash created: {password_hash.decode()[:20]}...")
+        # Hash password with bcrypt (on the hashing pool) and add user to storage
+        password_hash = PASSWORD_HASHER.hash(password)
         
         if append_user(username, password_hash, name):
             print(f"DEBUG: User '{username}' successfully added to Google Sheets")
+            USER_DIRECTORY.add(username, password_hash, name)
             # Create user worksheet upon registration with headers
             sheet_url = get_or_create_user_worksheet(username)
+            token, expires = SESSIONS.issue(username)
             return jsonify({
                 'success': True, 
                 'message': 'Registration successful',
-                'sheet_url': sheet_url
+                'sheet_url': sheet_url,
+                'token': token,
+                'expires_at': expires
             })
         else:
             print(f"DEBUG: Failed to add user '{username}' to Google Sheets")
             return jsonify({'success': False, 'message': 'Failed to register user'}), 500
 
+    except HashingBusy as e:
+        return jsonify({'success': False, 'message': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         print(f"DEBUG: Registration exception: {str(e)}")
         return jsonify({'success': False, 'message': f'Registration error: {str(e)}'}), 500
 
 @app.route('/api/login', methods=['POST'])
+@require_storage
 def login():
     """Login user with Google Sheets authentication"""
     try:
@@ -920,42 +1124,44 @@ def login():
         if not username or not password:
             return jsonify({'success': False, 'message': 'Username and password required'}), 400
 
-        # Check user credentials in Google Sheets
-        users = get_users()
-        print(f"DEBUG: Users from sheet: {users}")
-        
-        for user in users:
-            if len(user) < 2:
-                print(f"DEBUG: Skipping incomplete row: {user}")
-                continue  # Skip incomplete rows
+        # Check user credentials against the user directory
+        user = USER_DIRECTORY.get(username)
+        if user is None:
+            print(f"DEBUG: No username match found for '{username}'")
+            return jsonify({'success': False, 'message': 'User not found'}), 400
 
-            stored_username = user[0].strip()
-            stored_hash = user[1].strip()
-            
-            print(f"DEBUG: Comparing '{username}' with stored '{stored_username}'")
-
-            if stored_username == username:
-                print(f"DEBUG: Username match found! Checking password...")
-                if bcrypt.checkpw(password.encode(), stored_hash.encode()):
-                    print(f"DEBUG: Password match! Login successful for '{username}'")
-                    # Get or create user worksheet (with headers)
-                    sheet_url = get_or_create_user_worksheet(username)
-                    return jsonify({
-                        'success': True,
-                        'message': 'Login successful',
-                        'sheet_url': sheet_url
-                    })
-                else:
-                    print(f"DEBUG: Password mismatch for user '{username}'")
-                    return jsonify({'success': False, 'message': 'Invalid password'}), 400
-
-        print(f"DEBUG: No username match found for '{username}'")
-        return jsonify({'success': False, 'message': 'User not found'}), 400
+        matches, new_hash = PASSWORD_HASHER.verify(password, user['password_hash'])
+        if matches:
+            print(f"DEBUG: Password match! Login successful for '{username}'")
+            if new_hash is not None and STORAGE.update_password_hash(user['username'], new_hash):
+                # Stored hash used a different work factor: keep the rehashed value
+                USER_DIRECTORY.add(user['username'], new_hash, user['name'])
+            # Get or create user worksheet (with headers)
+            sheet_url = get_or_create_user_worksheet(username)
+            token, expires = SESSIONS.issue(username)
+            return jsonify({
+                'success': True,
+                'message': 'Login successful',
+                'sheet_url': sheet_url,
+                'token': token,
+                'expires_at': expires
+            })
+        else:
+            print(f"DEBUG: Password mismatch for user '{username}'")
+            return jsonify({'success': False, 'message': 'Invalid password'}), 400
 
+    except HashingBusy as e:
+        return jsonify({'success': False, 'message': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         print(f"DEBUG: Login exception: {str(e)}")
         return jsonify({'success': False, 'message': f'Login error: {str(e)}'}), 500
 
+@app.route('/api/logout', methods=['POST'])
+def logout():
+    """Revoke the session token sent in the Authorization header"""
+    revoked = SESSIONS.revoke(bearer_token())
+    return jsonify({'success': True, 'revoked': revoked})
+
 # ---------------- RUN APP ---------------- #
 if __name__ == '__main__':
     print("Starting iSpace Math Flask App...")
@@ -0,0 +1,47 @@
+import json
+import os
+
+from markupsafe import Markup, escape
+
+# ---------- Configuration ----------
+DIST_FOLDER = os.getenv('ASSET_DIST_FOLDER', os.path.join(os.path.dirname(__file__), 'dist'))
+DIST_URL = '/dist/'
+# Fingerprinted files never change, so browsers may keep them for a year
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+# ---------- Built Asset Manifest ----------
+class AssetManifest:
+    """
+    Maps logical asset names ('styles.css', 'assets/earth.png') to the
+    fingerprinted files written by build_assets.py. Without a build (no
+    dist/manifest.json) every name resolves to its plain, unversioned URL.
+    """
+
+    def __init__(self, folder=DIST_FOLDER):
+        self.folder = folder
+        self.entries = {}
+        self.encodings = {}  # built file -> precompressed encodings available
+        path = os.path.join(folder, 'manifest.json')
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+            self.encodings = {entry['file']: set(entry.get('encodings', [])) for entry in self.entries.values()}
+            print(f"Asset manifest loaded: {len(self.entries)} fingerprinted assets")
+
+    def url(self, name):
+        entry = self.entries.get(name)
+        return DIST_URL + entry['file'] if entry else '/' + name
+
+    def srcset(self, name):
+        """WebP srcset ('... 320w, ... 640w') for an image, or '' if none were built"""
+        webp = self.entries.get(name, {}).get('webp', {})
+        return ', '.join(f"{DIST_URL}{path} {width}w" for width, path in sorted(webp.items(), key=lambda item: int(item[0])))
+
+    def picture(self, name, alt='', sizes='100vw'):
+        """<picture> with WebP sources falling back to the original image"""
+        img = f'<img src="{escape(self.url(name))}" alt="{escape(alt)}" />'
+        srcset = self.srcset(name)
+        if not srcset:
+            return Markup(img)
+        return Markup(f'<picture><source type="image/webp" srcset="{escape(srcset)}" sizes="{escape(sizes)}" />{img}</picture>')
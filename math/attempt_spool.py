@@ -0,0 +1,287 @@
+import glob
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# ---------- Configuration ----------
+SPOOL_PATH = os.getenv('ATTEMPT_SPOOL_PATH', os.path.join(os.path.dirname(__file__), 'attempt_spool.jsonl'))
+FLUSH_ROWS = int(os.getenv('ATTEMPT_FLUSH_ROWS', '50'))
+FLUSH_INTERVAL = float(os.getenv('ATTEMPT_FLUSH_INTERVAL', '5.0'))
+# A user's rows that fail this many flushes in a row (retried with exponential backoff,
+# about 20 minutes in total by default) are moved to the dead-letter file
+MAX_RETRIES = int(os.getenv('ATTEMPT_MAX_RETRIES', '8'))
+
+
+def _unlink(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _read_spool(path):
+    """Un-acknowledged (username, row) entries of one spool file, in spool order"""
+    acked = set()
+    if os.path.exists(path + '.acks'):
+        with open(path + '.acks', 'r', encoding='utf-8') as f:
+            acked = {int(line) for line in f if line.strip()}
+    entries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn write from a crash mid-append
+            if entry["seq"] not in acked:
+                entries.append((entry["username"], entry["row"]))
+    return entries
+
+
+# ---------- Write-behind Attempt Spool ----------
+class AttemptSpool:
+    """
+    Durable write-behind queue for quiz attempt rows.
+
+    enqueue() appends the row to this process's spool file (<path>.<pid>),
+    fsyncs it and returns. A background flusher groups pending rows per
+    user and hands each group to `writer(username, rows)` in one call, once
+    FLUSH_ROWS rows are pending or FLUSH_INTERVAL seconds have passed.
+    Flushed entries are recorded in the spool's own ack file.
+
+    Every worker process owns its spool under an exclusive flock, so no two
+    processes ever append to or compact the same file. On start a process
+    adopts the spools of dead processes (their lock is free) and replays
+    every un-acked entry. A user whose rows keep failing is retried with
+    exponential backoff and, after MAX_RETRIES failures, moved to the
+    shared dead-letter file <path>.dead so the spool can be compacted.
+    Without fcntl (Windows) there are no locks and every other spool counts
+    as orphaned, which is only safe with a single worker process.
+    """
+
+    def __init__(self, writer, path=SPOOL_PATH, flush_rows=FLUSH_ROWS, flush_interval=FLUSH_INTERVAL,
+                 max_retries=MAX_RETRIES):
+        self.writer = writer
+        self.base_path = path
+        self.dead_letter_path = path + '.dead'
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self._reset()
+        self.flushed = 0
+        self.failed_flushes = 0
+        self.dead_lettered = 0
+        self.adopted = 0
+        # A forked worker must not share the parent's spool file, lock or queue
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _reset(self):
+        self.path = f"{self.base_path}.{os.getpid()}"
+        self.ack_path = self.path + '.acks'
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._file = None
+        self._pending = []   # [(seq, username, row)] in spool order
+        self._failures = {}  # username -> (failed flushes in a row, retry not before)
+        self._next_seq = 0
+        self._thread = None
+
+    def _after_fork(self):
+        started = self._thread is not None
+        if self._file is not None:
+            # Closing our copy of the descriptor leaves the parent's lock in place
+            self._file.close()
+        self._reset()
+        if started:
+            self.start()
+
+    # ---------- Request Path ----------
+    def enqueue(self, username, row):
+        """Persist one attempt row to the spool and queue it for the next flush"""
+        return self.enqueue_many(username, [row])[0]
+
+    def enqueue_many(self, username, rows):
+        """Persist several attempt rows for one user with a single fsynced spool write"""
+        with self._lock:
+            seqs = self._append([(username, row) for row in rows])
+            self._pending.extend((seq, username, row) for seq, row in zip(seqs, rows))
+            pending = len(self._pending)
+        if pending >= self.flush_rows:
+            self._wakeup.set()
+        return seqs
+
+    def _append(self, entries):
+        # Caller holds self._lock
+        if self._file is None:
+            self._open()
+        seqs = list(range(self._next_seq, self._next_seq + len(entries)))
+        self._next_seq += len(entries)
+        self._file.write(''.join(
+            json.dumps({"seq": seq, "username": username, "row": row}, ensure_ascii=False) + '\n'
+            for seq, (username, row) in zip(seqs, entries)
+        ))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return seqs
+
+    def _open(self):
+        # Held open and locked for the life of the process: a free lock marks a dead owner
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+
+    # ---------- Recovery ----------
+    def replay(self):
+        """Adopt the spools of processes that are gone and queue their un-acked entries"""
+        adopted = 0
+        # The bare path is a spool written before spools were per process
+        for path in [self.base_path] + sorted(glob.glob(glob.escape(self.base_path) + '.*')):
+            if path == self.path or path.endswith(('.acks', '.dead')):
+                continue
+            orphan = self._lock_orphan(path)
+            if orphan is None:
+                continue
+            try:
+                entries = _read_spool(path)
+                if entries:
+                    with self._lock:
+                        seqs = self._append(entries)
+                        self._pending.extend((seq, username, row) for seq, (username, row) in zip(seqs, entries))
+                    adopted += len(entries)
+                # Only once the entries are safely in our own spool
+                _unlink(path + '.acks')
+                _unlink(path)
+            finally:
+                orphan.close()
+        self.adopted += adopted
+        if adopted:
+            print(f"Attempt spool: replaying {adopted} unflushed attempts")
+        return adopted
+
+    def _lock_orphan(self, path):
+        """The spool file opened and locked, or None if its owner is alive or it was already adopted"""
+        try:
+            f = open(path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return None
+        if fcntl is None:
+            return f
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            # Another process may have adopted and removed it while we waited to open it
+            if os.fstat(f.fileno()).st_ino != os.stat(path).st_ino:
+                raise FileNotFoundError(path)
+        except (BlockingIOError, FileNotFoundError):
+            f.close()
+            return None
+        return f
+
+    # ---------- Background Flusher ----------
+    def start(self):
+        """Open this process's spool, adopt orphaned ones and start the background flusher (idempotent)"""
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._file is None:
+                    self._open()
+            self.replay()
+            self._thread = threading.Thread(target=self._run, name="attempt-spool-flusher", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """Write all pending rows, one writer call per user; failed groups stay pending and back off"""
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._pending)
+            if not batch:
+                return 0
+
+            now = time.monotonic()
+            groups = {}
+            for seq, username, row in batch:
+                if self._failures.get(username, (0, 0))[1] <= now:
+                    groups.setdefault(username, []).append((seq, row))
+
+            done = set()
+            written = 0
+            for username, entries in groups.items():
+                error = None
+                try:
+                    ok = self.writer(username, [row for _, row in entries])
+                except Exception as e:
+                    print(f"Attempt spool: error flushing {len(entries)} rows for {username}: {e}")
+                    ok, error = False, str(e)
+                if ok:
+                    self._failures.pop(username, None)
+                    done.update(seq for seq, _ in entries)
+                    written += len(entries)
+                    continue
+                self.failed_flushes += 1
+                failures = self._failures.get(username, (0, 0))[0] + 1
+                if failures >= self.max_retries:
+                    self._dead_letter(username, entries, error)
+                    self._failures.pop(username, None)
+                    done.update(seq for seq, _ in entries)
+                else:
+                    self._failures[username] = (failures, now + self.flush_interval * 2 ** failures)
+
+            if done:
+                with open(self.ack_path, 'a', encoding='utf-8') as f:
+                    f.write(''.join(f"{seq}\n" for seq in sorted(done)))
+                    f.flush()
+                    os.fsync(f.fileno())
+            with self._lock:
+                self._pending = [entry for entry in self._pending if entry[0] not in done]
+                self.flushed += written
+                if not self._pending:
+                    self._compact()
+            return written
+
+    def _dead_letter(self, username, entries, error):
+        """Move rows that keep failing to the shared dead-letter file (for manual replay)"""
+        lines = ''.join(
+            json.dumps({"username": username, "row": row, "error": error}, ensure_ascii=False) + '\n'
+            for _, row in entries
+        )
+        with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        self.dead_lettered += len(entries)
+        print(f"Attempt spool: moved {len(entries)} rows for {username} to {self.dead_letter_path} "
+              f"after {self.max_retries} failed flushes")
+
+    def _compact(self):
+        # Caller holds self._lock. Everything in our spool is acknowledged: start it afresh.
+        # Sequence numbers keep counting, so a stale ack file can never match new entries.
+        if self._file is not None:
+            self._file.truncate(0)
+        _unlink(self.ack_path)
+
+    # ---------- Metrics ----------
+    def stats(self):
+        return {
+            "pending": len(self._pending),
+            "flushed": self.flushed,
+            "failed_flushes": self.failed_flushes,
+            "backing_off": len(self._failures),
+            "dead_lettered": self.dead_lettered,
+            "adopted": self.adopted,
+            "flush_rows": self.flush_rows,
+            "flush_interval": self.flush_interval,
+            "flusher_running": self._thread is not None and self._thread.is_alive(),
+        }
@@ -0,0 +1,57 @@
+"""
+Questions per second for the dynamic generators: one generate_*_question()
+call per question (old behaviour) vs a single batched generate call
+(generate_batch: unkeyed NumPy batches, not what the API serves).
+
+Usage: python benchmarks/bench_batch_generation.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from logic.python import real_numbers, stats, surface_areas_volumes, triangles
+
+BATCH_SIZES = (1, 100, 10_000)
+LEVEL = "medium"
+
+GENERATORS = {
+    "real_numbers": (
+        lambda n: [real_numbers.generate_medium_question() for _ in range(n)],
+        lambda n: real_numbers.generate_batch(LEVEL, n),
+    ),
+    "statistics": (
+        lambda n: [stats.generate_dynamic_question(LEVEL) for _ in range(n)],
+        lambda n: stats.generate_dynamic_batch(LEVEL, n),
+    ),
+    "surface_areas_volumes": (
+        lambda n: [surface_areas_volumes.generate_medium_question() for _ in range(n)],
+        lambda n: surface_areas_volumes.generate_batch(LEVEL, n),
+    ),
+    "triangles": (
+        lambda n: [triangles.generate_medium_question() for _ in range(n)],
+        lambda n: triangles.generate_batch(LEVEL, n),
+    ),
+}
+
+
+def questions_per_second(fn, n, min_time=0.2):
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn(n)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return calls * n / elapsed
+
+
+if __name__ == "__main__":
+    print(f"Level: {LEVEL}\n")
+    print(f"{'topic':<24}{'N':>8}{'one-by-one q/s':>18}{'batched q/s':>16}{'speedup':>10}")
+    for topic, (one_by_one, batched) in GENERATORS.items():
+        for n in BATCH_SIZES:
+            before = questions_per_second(one_by_one, n)
+            after = questions_per_second(batched, n)
+            print(f"{topic:<24}{n:>8}{before:>18,.0f}{after:>16,.0f}{after / before:>9.1f}x")
@@ -0,0 +1,99 @@
+"""
+Question bank load cost per worker process: parsing logic/pyqs/*.json into
+dicts (QuestionBank) vs mmapping the compiled artifact (CompiledQuestionBank).
+Each variant runs in a fresh interpreter and reports load time, the RSS it
+added (split into private anonymous memory and shared file-backed pages)
+and the time for 10k id lookups and 10k quiz samples.
+
+The bank is scaled up to `scale` copies of every question (each with
+distinct text, so distinct ids) to model thousands of questions per topic.
+
+Usage: python benchmarks/bench_compiled_bank.py [scale]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, APP_DIR)
+
+from logic.python import compiled_bank, question_bank
+
+SCALE = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+# Runs in the child interpreter; prints one JSON line
+CHILD = """
+import json, random, sys, time
+
+def rss():
+    with open('/proc/self/status') as f:
+        fields = dict(line.split(':', 1) for line in f)
+    return {key: int(fields[key].split()[0]) for key in ('VmRSS', 'RssAnon', 'RssFile')}
+
+from logic.python import compiled_bank, question_bank
+folder, path, compiled = sys.argv[1], sys.argv[2], sys.argv[3] == '1'
+before = rss()
+start = time.perf_counter()
+bank = (compiled_bank.CompiledQuestionBank(path, folder) if compiled else question_bank.QuestionBank(folder)).load_all()
+loaded = time.perf_counter()
+after = rss()
+
+ids = [q['id'] for f in bank.filenames() for pool in bank.levels(f).values() for q in pool[:200]]
+rng = random.Random(0)
+probes = [rng.choice(ids) for _ in range(10000)]
+t = time.perf_counter()
+for qid in probes:
+    bank.lookup(qid)
+lookups = time.perf_counter() - t
+t = time.perf_counter()
+for _ in range(10000):
+    bank.topic_sample('algebra', 'easy', 5)
+samples = time.perf_counter() - t
+
+print('BENCH ' + json.dumps({
+    'load_ms': (loaded - start) * 1000,
+    'rss_kb': after['VmRSS'] - before['VmRSS'],
+    'anon_kb': after['RssAnon'] - before['RssAnon'],
+    'file_kb': after['RssFile'] - before['RssFile'],
+    'lookup_us': lookups / len(probes) * 1e6,
+    'sample_us': samples / 10000 * 1e6,
+}))
+"""
+
+
+def scaled_bank(folder, scale):
+    """Write every bank file with each question repeated `scale` times as distinct variants"""
+    for filename in sorted(f for f in os.listdir(question_bank.PYQS_FOLDER) if f.endswith('.json')):
+        with open(os.path.join(question_bank.PYQS_FOLDER, filename), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        scaled = {
+            level: [dict(q, question=f"{q['question']} (variant {i})") for i in range(scale) for q in questions]
+            for level, questions in data.items()
+        }
+        with open(os.path.join(folder, filename), 'w', encoding='utf-8') as f:
+            json.dump(scaled, f, indent=2, ensure_ascii=False)
+
+
+def run(folder, path, compiled):
+    result = subprocess.run([sys.executable, '-c', CHILD, folder, path, '1' if compiled else '0'],
+                            cwd=APP_DIR, capture_output=True, text=True, check=True)
+    line = next(l for l in result.stdout.splitlines() if l.startswith('BENCH '))
+    return json.loads(line[len('BENCH '):])
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        scaled_bank(folder, SCALE)
+        path = os.path.join(folder, 'question_bank.bin')
+        built = compiled_bank.compile_bank(folder, path)
+        json_bytes = sum(os.path.getsize(os.path.join(folder, f)) for f in os.listdir(folder) if f.endswith('.json'))
+        print(f"Bank x{SCALE}: {built['questions']:,} questions, "
+              f"JSON {json_bytes / 1024:,.0f} KiB -> compiled {built['bytes'] / 1024:,.0f} KiB\n")
+
+        print(f"{'':<10} {'load ms':>9} {'RSS KiB':>9} {'anon KiB':>9} {'file KiB':>9} {'lookup us':>10} {'sample us':>10}")
+        for label, compiled in (("JSON", False), ("compiled", True)):
+            r = run(folder, path, compiled)
+            print(f"{label:<10} {r['load_ms']:9.1f} {r['rss_kb']:9d} {r['anon_kb']:9d} {r['file_kb']:9d} "
+                  f"{r['lookup_us']:10.2f} {r['sample_us']:10.2f}")
@@ -0,0 +1,53 @@
+"""
+Near-duplicate detection cost: MinHash/LSH (find_near_duplicates) vs
+exact Jaccard over every pair of questions. The bank is scaled up to
+`scale` copies of every question, as in bench_compiled_bank.py; the
+pairwise scan is only timed on a sample and extrapolated, since it grows
+with the square of the bank size.
+
+Usage: python benchmarks/bench_near_duplicates.py [scale]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_compiled_bank import scaled_bank
+from logic.python import near_duplicates, question_bank
+
+SCALE = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+PAIRWISE_SAMPLE = 1000
+
+
+def pairwise_seconds(items, threshold):
+    """Seconds to compare every pair of the first PAIRWISE_SAMPLE questions, scaled to all pairs"""
+    sample = [near_duplicates.shingles(q) for _, q in items[:PAIRWISE_SAMPLE]]
+    start = time.perf_counter()
+    for i, a in enumerate(sample):
+        for b in sample[i + 1:]:
+            near_duplicates.jaccard(a, b) >= threshold
+    elapsed = time.perf_counter() - start
+    n, m = len(items), len(sample)
+    return elapsed * (n * (n - 1)) / (m * (m - 1))
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        scaled_bank(folder, SCALE)
+        bank = question_bank.QuestionBank(folder).load_all()
+        # Scaled copies get distinct ids, so every copy of a question is a near-duplicate of the others
+        items = near_duplicates.bank_items(bank)
+
+        start = time.perf_counter()
+        pairs, clusters = near_duplicates.find_near_duplicates(items)
+        lsh = time.perf_counter() - start
+        pairwise = pairwise_seconds(items, near_duplicates.NEAR_DUPLICATE_THRESHOLD)
+
+        print(f"Bank x{SCALE}: {len(items):,} questions, {len(pairs):,} pairs in {len(clusters):,} clusters\n")
+        print(f"{'method':<12} {'seconds':>9}")
+        print(f"{'MinHash/LSH':<12} {lsh:9.2f}")
+        print(f"{'pairwise':<12} {pairwise:9.2f}  (extrapolated from {min(PAIRWISE_SAMPLE, len(items))} questions)")
+        print(f"speedup {pairwise / lsh:.0f}x")
@@ -0,0 +1,50 @@
+"""
+Requests per second for each page route: render_template on every hit
+(old behaviour) vs the pre-rendered PageCache, for a plain request, a
+gzip-accepting browser request, and a revalidation that ends in a 304.
+Requests go through the Flask test client, so WSGI overhead is included.
+
+Usage: python benchmarks/bench_page_cache.py [requests_per_case]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import render_template
+
+import app as ispace
+
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+PAGES = {'/': 'index.html', '/home': 'home.html', '/dashboard': 'dashboard.html',
+         '/quiz': 'quiz.html', '/result': 'result.html'}
+
+
+@ispace.app.route('/_bench/legacy/<name>')
+def legacy_page(name):
+    """What every page route used to do"""
+    return render_template(name)
+
+
+def bench(client, path, headers=None):
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        client.get(path, headers=headers)
+    return REQUESTS / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    client = ispace.app.test_client()
+    print(f"Requests per case: {REQUESTS}\n")
+    print(f"{'page':<12}{'render/req':>12}{'cached':>10}{'cached gz':>11}{'304':>10}")
+    for path, name in PAGES.items():
+        legacy = bench(client, f'/_bench/legacy/{name}')
+        cached = bench(client, path)
+        gzipped = bench(client, path, {'Accept-Encoding': 'gzip, deflate, br'})
+        etag = client.get(path).headers['ETag']
+        revalidated = bench(client, path, {'If-None-Match': etag})
+        print(f"{path:<12}{legacy:>12,.0f}{cached:>10,.0f}{gzipped:>11,.0f}{revalidated:>10,.0f}")
+    print("\nPage sizes (bytes):")
+    for name, sizes in ispace.PAGE_CACHE.stats()['bytes'].items():
+        print(f"  {name:<16}" + "  ".join(f"{enc}={size:,}" for enc, size in sizes.items()))
@@ -0,0 +1,51 @@
+"""
+Logins per second at several concurrency levels: bcrypt.checkpw called
+directly on each request thread vs PasswordHasher's bounded pool. Also
+reports how many logins the pool turned away (HashingBusy) under load.
+
+Usage: python benchmarks/bench_password_hashing.py [rounds] [logins_per_level]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from password_hashing import PasswordHasher, HashingBusy
+
+ROUNDS = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+LOGINS = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+CONCURRENCY = (1, 4, 16, 64)
+PASSWORD = "secret123"
+
+
+def run(label, login, concurrency):
+    rejected = 0
+
+    def one_login(_):
+        nonlocal rejected
+        try:
+            login()
+        except HashingBusy:
+            rejected += 1
+
+    with ThreadPoolExecutor(max_workers=concurrency) as clients:
+        start = time.perf_counter()
+        list(clients.map(one_login, range(LOGINS)))
+        elapsed = time.perf_counter() - start
+    accepted = LOGINS - rejected
+    print(f"{label:<10}{concurrency:>12}{accepted / elapsed:>14,.1f}{rejected:>10}")
+
+
+if __name__ == "__main__":
+    stored_hash = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=ROUNDS)).decode()
+    hasher = PasswordHasher(rounds=ROUNDS)
+    print(f"bcrypt rounds: {ROUNDS}, logins per level: {LOGINS}, pool workers: {hasher.workers}, "
+          f"max pending: {hasher.max_pending}\n")
+    print(f"{'mode':<10}{'concurrency':>12}{'logins/s':>14}{'rejected':>10}")
+    for concurrency in CONCURRENCY:
+        run("inline", lambda: bcrypt.checkpw(PASSWORD.encode(), stored_hash.encode()), concurrency)
+        run("pool", lambda: hasher.verify(PASSWORD, stored_hash), concurrency)
@@ -0,0 +1,44 @@
+"""
+Per-request cost of fetching quiz questions: re-reading the JSON file on
+every call (old behaviour) vs sampling from the in-memory QuestionBank.
+
+Usage: python benchmarks/bench_question_bank.py [iterations]
+"""
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from logic.python import question_bank
+
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+
+def legacy_fetch(filename, level):
+    """What every route and logic module used to do per request"""
+    with open(os.path.join(question_bank.PYQS_FOLDER, filename), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return random.sample(data[level], 5)
+
+
+def bench(label, fn, *args):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn(*args)
+    elapsed = time.perf_counter() - start
+    per_call_us = elapsed / ITERATIONS * 1e6
+    print(f"{label:<28} {per_call_us:10.2f} us/request  ({ITERATIONS / elapsed:,.0f} req/s)")
+    return per_call_us
+
+
+if __name__ == "__main__":
+    bank = question_bank.get_bank()
+    print(f"Iterations per file: {ITERATIONS}\n")
+    for filename in bank.filenames():
+        print(filename)
+        before = bench("  json.load per request", legacy_fetch, filename, "medium")
+        after = bench("  QuestionBank.sample", bank.sample, filename, "medium", 5)
+        print(f"  speedup: {before / after:.1f}x\n")
@@ -0,0 +1,73 @@
+"""
+Grading throughput: 10k five-question submissions graded with
+ScoringEngine (answer-key index keyed by question id) vs scanning the bank
+for each answered question, plus the same batch through the bulk
+/api/quiz/submit endpoint in requests of MAX_BULK_SUBMISSIONS.
+
+Usage: python benchmarks/bench_scoring.py [submissions]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from logic.python import question_bank
+from scoring import ScoringEngine, is_correct, score_percent, xp_for
+
+SUBMISSIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+QUESTIONS_PER_QUIZ = 5
+
+
+def make_submissions(bank):
+    rng = random.Random(0)
+    pools = [(filename, level, pool) for filename in bank.filenames()
+             for level, pool in bank.levels(filename).items() if len(pool) >= QUESTIONS_PER_QUIZ]
+    submissions = []
+    for _ in range(SUBMISSIONS):
+        _, level, pool = rng.choice(pools)
+        answers = {q['id']: rng.choice('ABCD') for q in rng.sample(pool, QUESTIONS_PER_QUIZ)}
+        submissions.append({'level': level, 'answers': answers})
+    return submissions
+
+
+def scan_grade(bank, submission):
+    """Grading without an index: find each answered question by scanning every pool"""
+    correct = 0
+    for question_id, answer in submission['answers'].items():
+        for filename in bank.filenames():
+            match = next((q for pool in bank.levels(filename).values() for q in pool if q['id'] == question_id), None)
+            if match is not None:
+                correct += is_correct(match, answer)
+                break
+    score = score_percent(correct, len(submission['answers']))
+    return score, xp_for(score, submission['level'])
+
+
+def bench(label, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed * 1000:10.1f} ms  ({SUBMISSIONS / elapsed:,.0f} submissions/s)")
+    return elapsed
+
+
+if __name__ == "__main__":
+    bank = question_bank.get_bank()
+    engine = ScoringEngine(bank.lookup)
+    submissions = make_submissions(bank)
+    print(f"Submissions: {SUBMISSIONS} x {QUESTIONS_PER_QUIZ} questions\n")
+
+    before = bench("bank scan per question", lambda: [scan_grade(bank, s) for s in submissions])
+    after = bench("ScoringEngine.grade_many", lambda: engine.grade_many(submissions))
+    print(f"speedup: {before / after:.1f}x\n")
+
+    import app as ispace
+    client = ispace.app.test_client()
+    token, _ = ispace.SESSIONS.issue('bench')
+    headers = {'Authorization': f'Bearer {token}'}
+    chunk = ispace.MAX_BULK_SUBMISSIONS
+    bench("POST /api/quiz/submit (bulk)",
+          lambda: [client.post('/api/quiz/submit', json={'submissions': submissions[i:i + chunk]}, headers=headers)
+                   for i in range(0, len(submissions), chunk)])
@@ -0,0 +1,60 @@
+"""
+/api/search cost: the inverted index (SearchIndex) vs a linear scan that
+lowercases and substring-matches every question dict, for term, two-term
+and prefix queries. The bank is scaled up to `scale` copies of every
+question, as in bench_compiled_bank.py. Index build time is reported too.
+
+Usage: python benchmarks/bench_search.py [scale]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_compiled_bank import scaled_bank
+from logic.python import question_bank
+
+SCALE = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+QUERIES = ["median", "hcf", "area triangle", "poly*", "volume cone"]
+REPEAT = 200
+
+
+def linear_search(bank, query):
+    """Every question whose text or options contain all query words"""
+    words = [w.rstrip('*') for w in query.lower().split()]
+    matches = []
+    for topic in bank.topics():
+        for pool in bank.topic_levels(topic).values():
+            for q in pool:
+                text = (q['question'] + ' ' + ' '.join(q['options'].values())).lower()
+                if all(word in text for word in words):
+                    matches.append(q['id'])
+    return matches
+
+
+def per_query_ms(fn):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        scaled_bank(folder, SCALE)
+        bank = question_bank.QuestionBank(folder).load_all()
+        start = time.perf_counter()
+        index = bank.search_index()
+        build_ms = (time.perf_counter() - start) * 1000
+        print(f"Bank x{SCALE}: {len(index):,} questions, {len(index.vocabulary):,} terms, "
+              f"index built in {build_ms:.0f} ms\n")
+
+        print(f"{'query':<16} {'matches':>8} {'scan ms':>9} {'index ms':>9} {'speedup':>8}")
+        for query in QUERIES:
+            total, _, _ = index.search(query)
+            scan = per_query_ms(lambda: linear_search(bank, query))
+            indexed = per_query_ms(lambda: index.search(query))
+            print(f"{query:<16} {total:8d} {scan:9.3f} {indexed:9.3f} {scan / indexed:7.0f}x")
@@ -0,0 +1,66 @@
+"""
+Cold-start cost of the app: time to `import app` and latency of the first
+requests, with Google Sheets connected in the background
+(STORAGE_LAZY_INIT=1) vs blocking at import (STORAGE_LAZY_INIT=0).
+Each run is a fresh interpreter; the median of the runs is reported.
+
+With --json a single JSON object is printed instead, for tracking in CI.
+The eager/lazy gap only shows with real Sheets credentials configured.
+
+Usage: python benchmarks/bench_startup.py [runs] [--json]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+ARGS = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+RUNS = int(ARGS[0]) if ARGS else 5
+AS_JSON = '--json' in sys.argv
+
+# Runs in the child interpreter; prints one JSON line of timings in ms
+CHILD = """
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.app.test_client()
+client.get('/api/status')
+first_status = time.perf_counter()
+client.get('/api/python/quiz/algebra/easy')
+first_quiz = time.perf_counter()
+print('BENCH ' + json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'first_status_ms': (first_status - imported) * 1000,
+    'first_quiz_ms': (first_quiz - first_status) * 1000,
+    'ready_ms': (first_quiz - start) * 1000,
+}))
+"""
+
+
+def run_once(lazy):
+    env = dict(os.environ, STORAGE_LAZY_INIT='1' if lazy else '0')
+    result = subprocess.run([sys.executable, '-c', CHILD], cwd=APP_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    line = next(l for l in result.stdout.splitlines() if l.startswith('BENCH '))
+    return json.loads(line[len('BENCH '):])
+
+
+def measure(lazy):
+    runs = [run_once(lazy) for _ in range(RUNS)]
+    return {key: round(statistics.median(r[key] for r in runs), 1) for key in runs[0]}
+
+
+if __name__ == "__main__":
+    results = {"lazy": measure(True), "eager": measure(False)}
+    if AS_JSON:
+        print(json.dumps({"runs": RUNS, **results}))
+        sys.exit(0)
+    print(f"Runs per mode: {RUNS} (median)\n")
+    print(f"{'mode':<8}{'import ms':>12}{'1st status ms':>16}{'1st quiz ms':>14}{'ready ms':>12}")
+    for mode, r in results.items():
+        print(f"{mode:<8}{r['import_ms']:>12.1f}{r['first_status_ms']:>16.1f}"
+              f"{r['first_quiz_ms']:>14.1f}{r['ready_ms']:>12.1f}")
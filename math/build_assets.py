@@ -0,0 +1,205 @@
+"""
+Asset build step. Copies every file under assets/ and templates/*.css|js
+into dist/ under a content-hashed name (styles.css -> styles.<hash>.css),
+writes .gz and .br siblings for text assets, resized WebP derivatives for
+images (needs Pillow) and dist/manifest.json, which the app reads through
+asset_manifest.AssetManifest. url(...) references inside CSS are rewritten
+to the fingerprinted files.
+
+Earlier builds are not wiped: pages cached by browsers and workers still
+serving the old manifest mid-deploy keep resolving their fingerprinted
+URLs. dist/builds.json records the files of each build, and files no
+longer referenced by the last KEEP_BUILDS builds are pruned.
+
+Run it before starting the app (or after changing an asset):
+
+    python build_assets.py [--out DIR]
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DIST_FOLDER = os.path.join(BASE_DIR, 'dist')
+MANIFEST_NAME = 'manifest.json'
+BUILDS_NAME = 'builds.json'
+# Builds (including this one) whose files are kept in dist/
+KEEP_BUILDS = int(os.getenv('ASSET_KEEP_BUILDS', '3'))
+
+COMPRESSIBLE = {'.css', '.js', '.svg', '.json', '.txt'}
+IMAGES = {'.jpg', '.jpeg', '.png'}
+# WebP derivative widths; images are never scaled up
+WEBP_WIDTHS = (320, 640, 1280)
+WEBP_QUALITY = 80
+
+CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+def source_files():
+    """(logical name, path) for every asset; logical names match the unbuilt URLs"""
+    for root, _, files in os.walk(os.path.join(BASE_DIR, 'assets')):
+        for filename in sorted(files):
+            path = os.path.join(root, filename)
+            yield os.path.relpath(path, BASE_DIR).replace(os.sep, '/'), path
+    for filename in sorted(os.listdir(os.path.join(BASE_DIR, 'templates'))):
+        if filename.endswith(('.css', '.js')):
+            yield filename, os.path.join(BASE_DIR, 'templates', filename)
+
+
+def fingerprint(name, data):
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+
+
+def write(out, relpath, data):
+    # Files kept from earlier builds may be served meanwhile: replace, never truncate
+    path = os.path.join(out, relpath)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(path + '.tmp', path)
+
+
+def write_json(out, name, data):
+    """Replace a JSON file atomically, so a starting worker never reads half of it"""
+    path = os.path.join(out, name)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def existing_files(out):
+    """Every file under out (relative paths), except the manifest and build history"""
+    files = set()
+    for root, _, filenames in os.walk(out):
+        for filename in filenames:
+            relpath = os.path.relpath(os.path.join(root, filename), out).replace(os.sep, '/')
+            if relpath not in (MANIFEST_NAME, BUILDS_NAME):
+                files.add(relpath)
+    return files
+
+
+def load_builds(out):
+    """Earlier builds, oldest first; files from before builds were recorded count as one build"""
+    path = os.path.join(out, BUILDS_NAME)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    files = existing_files(out)
+    return [{'generation': 0, 'built': None, 'files': sorted(files)}] if files else []
+
+
+def prune(out, builds, keep=KEEP_BUILDS):
+    """Delete files referenced by none of the last `keep` builds; returns the kept builds"""
+    kept = builds[-keep:]
+    referenced = set().union(*(build['files'] for build in kept))
+    removed = 0
+    for relpath in existing_files(out) - referenced:
+        os.remove(os.path.join(out, relpath))
+        removed += 1
+    for root, dirs, files in os.walk(out, topdown=False):
+        if root != out and not dirs and not files:
+            os.rmdir(root)
+    if removed:
+        print(f"Pruned {removed} files no longer referenced by the last {len(kept)} builds")
+    return kept
+
+
+def rewrite_css_urls(css, manifest):
+    """Point url(...) references at fingerprinted assets (absolute /dist/ URLs)"""
+    def replace(match):
+        ref = match.group(2).strip()
+        key = re.sub(r'^(\.\./|\./|/)+', '', ref)
+        entry = manifest.get(key)
+        return f"url('/dist/{entry['file']}')" if entry else match.group(0)
+    return CSS_URL.sub(replace, css)
+
+
+def webp_derivatives(out, built_name, path):
+    derivatives = {}
+    with Image.open(path) as image:
+        image.load()
+        if image.mode not in ('RGB', 'RGBA'):
+            has_alpha = image.mode.endswith('A') or 'transparency' in image.info
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+        widths = [w for w in WEBP_WIDTHS if w < image.width] + [image.width]
+        for width in widths:
+            height = round(image.height * width / image.width)
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            relpath = f"{os.path.splitext(built_name)[0]}.w{width}.webp"
+            path = os.path.join(out, relpath)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            resized.save(path + '.tmp', 'WEBP', quality=WEBP_QUALITY, method=6)
+            os.replace(path + '.tmp', path)
+            derivatives[str(width)] = relpath
+    return derivatives
+
+
+def build(out=DIST_FOLDER):
+    os.makedirs(out, exist_ok=True)
+    builds = load_builds(out)
+
+    # Images and scripts first so stylesheets can reference their fingerprinted names
+    sources = sorted(source_files(), key=lambda item: item[0].endswith('.css'))
+    manifest = {}
+    for name, path in sources:
+        with open(path, 'rb') as f:
+            data = f.read()
+        ext = os.path.splitext(name)[1].lower()
+        if ext == '.css':
+            data = rewrite_css_urls(data.decode('utf-8'), manifest).encode('utf-8')
+
+        built_name = fingerprint(name, data)
+        write(out, built_name, data)
+        entry = {'file': built_name, 'size': len(data), 'encodings': []}
+
+        if ext in COMPRESSIBLE:
+            write(out, built_name + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+            entry['encodings'].append('gzip')
+            if brotli is not None:
+                write(out, built_name + '.br', brotli.compress(data, quality=11))
+                entry['encodings'].append('br')
+
+        if ext in IMAGES and Image is not None:
+            entry['webp'] = webp_derivatives(out, built_name, path)
+
+        manifest[name] = entry
+        print(f"{name:<28} -> {built_name}")
+
+    files = set()
+    for entry in manifest.values():
+        files.add(entry['file'])
+        files.update(entry['file'] + {'gzip': '.gz', 'br': '.br'}[encoding] for encoding in entry['encodings'])
+        files.update(entry.get('webp', {}).values())
+    generation = builds[-1]['generation'] + 1 if builds else 1
+    builds.append({'generation': generation, 'built': int(time.time()), 'files': sorted(files)})
+
+    # The new manifest goes live before anything the previous one references is removed
+    write_json(out, MANIFEST_NAME, manifest)
+    write_json(out, BUILDS_NAME, prune(out, builds))
+
+    if brotli is None:
+        print("Warning: brotli not installed, only gzip variants were written")
+    if Image is None:
+        print("Warning: Pillow not installed, no WebP derivatives were written")
+    return manifest
+
+
+if __name__ == "__main__":
+    out = sys.argv[sys.argv.index('--out') + 1] if '--out' in sys.argv else DIST_FOLDER
+    manifest = build(out)
+    print(f"\n{len(manifest)} assets written to {out}")
@@ -0,0 +1,24 @@
+"""
+Question bank build step. Compiles every logic/pyqs/*.json bank into one
+binary file (logic/question_bank.bin, see logic/python/compiled_bank.py)
+that workers mmap instead of parsing the JSON. The app uses it only while
+it is newer than every JSON file, so rerun this after editing a bank.
+The bank's near-duplicate clusters are saved alongside
+(logic/near_duplicates.json, see logic/python/near_duplicates.py), so no
+worker runs the MinHash check at load time.
+
+    python build_question_bank.py [--out PATH]
+"""
+import sys
+
+from logic.python import compiled_bank, near_duplicates, question_bank
+
+if __name__ == "__main__":
+    out = sys.argv[sys.argv.index('--out') + 1] if '--out' in sys.argv else compiled_bank.COMPILED_PATH
+    result = compiled_bank.compile_bank(path=out)
+    print(f"{result['questions']} questions ({result['records']} distinct, {result['strings']} strings) "
+          f"compiled to {out}: {result['bytes']:,} bytes")
+    _, clusters = near_duplicates.find_near_duplicates(
+        near_duplicates.bank_items(question_bank.QuestionBank().load_all()))
+    near_duplicates.write_clusters(clusters)
+    print(f"{len(clusters)} near-duplicate clusters written to {near_duplicates.CLUSTERS_PATH}")
@@ -0,0 +1,84 @@
+"""
+Near-duplicate report for the question bank. Every distinct question in
+logic/pyqs is MinHashed and bucketed with LSH (logic/python/near_duplicates.py),
+so only likely matches are compared; pairs at or above --threshold Jaccard
+similarity (character shingles of text + options) are reported, grouped
+into clusters whose first question is the one quizzes keep when
+QUIZ_EXCLUDE_NEAR_DUPLICATES=1. Bank questions are listed by position
+(topic:level:position), so a question repeated within a pool shows up as
+a cluster of its copies.
+
+--generated N also draws N seeded questions per topic/level from the
+dynamic generators and reports those that collide with bank questions.
+
+--write saves the bank's clusters to logic/near_duplicates.json, which
+loading banks read (QUIZ_EXCLUDE_NEAR_DUPLICATES) instead of recomputing.
+
+    python find_duplicates.py [--threshold 0.8] [--generated N] [--json] [--write]
+"""
+import argparse
+import json
+import sys
+import time
+
+from logic.python import near_duplicates, question_bank, question_keys
+from logic.python import real_numbers, stats, surface_areas_volumes, triangles  # registers the generators
+
+
+def describe(key, bank):
+    position = near_duplicates.parse_position_key(key)
+    if position is not None:
+        question = near_duplicates.bank_question(bank, key) or {}
+        return {"id": key, "question_id": question.get("id"), "topic": position[0], "level": position[1],
+                "question": question.get("question"), "generated": False}
+    described = question_keys.describe(key) or {}
+    return {"id": key, "topic": described.get("topic"), "level": described.get("level"),
+            "question": described.get("question"), "generated": True}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report near-duplicate questions in the bank")
+    parser.add_argument('--threshold', type=float, default=near_duplicates.NEAR_DUPLICATE_THRESHOLD)
+    parser.add_argument('--generated', type=int, default=0, help="generated questions per topic/level to check")
+    parser.add_argument('--json', action='store_true')
+    parser.add_argument('--write', action='store_true', help=f"save bank clusters to {near_duplicates.CLUSTERS_PATH}")
+    args = parser.parse_args()
+
+    bank = question_bank.QuestionBank().load_all()
+    items = near_duplicates.bank_items(bank)
+    bank_count = len(items)
+    for topic in question_keys.topics():
+        for level in question_bank.LEVELS:
+            if args.generated:
+                items += [(q["key"], q) for q in question_keys.generate_many(topic, level, args.generated, seed=0)]
+
+    start = time.perf_counter()
+    pairs, clusters = near_duplicates.find_near_duplicates(items, args.threshold)
+    elapsed = time.perf_counter() - start
+    # Generated questions from one template resemble each other by design; only collisions with the bank matter
+    pairs = [pair for pair in pairs if "/" not in pair[0] or "/" not in pair[1]]
+    clusters = [cluster for cluster in clusters if any("/" not in key for key in cluster)]
+    if args.write:
+        bank_clusters = [members for members in ([key for key in cluster if "/" not in key] for cluster in clusters)
+                         if len(members) > 1]
+        near_duplicates.write_clusters(bank_clusters, args.threshold)
+        print(f"{len(bank_clusters)} clusters written to {near_duplicates.CLUSTERS_PATH}", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps({
+            "threshold": args.threshold,
+            "questions": len(items),
+            "seconds": round(elapsed, 3),
+            "clusters": [[describe(key, bank) for key in cluster] for cluster in clusters],
+            "pairs": [{"a": a, "b": b, "similarity": similarity} for a, b, similarity in pairs],
+        }, indent=2, ensure_ascii=False))
+    else:
+        similarity = {frozenset((a, b)): s for a, b, s in pairs}
+        for number, cluster in enumerate(clusters, 1):
+            print(f"Cluster {number} ({len(cluster)} questions):")
+            for i, key in enumerate(cluster):
+                info = describe(key, bank)
+                score = "keep" if i == 0 else similarity.get(frozenset((cluster[0], key)), "~")
+                print(f"  [{score}] {info['topic']}/{info['level']} {key}: {info['question']}")
+        print(f"\n{bank_count} bank questions + {len(items) - bank_count} generated, threshold {args.threshold}: "
+              f"{len(pairs)} near-duplicate pairs in {len(clusters)} clusters ({elapsed:.2f}s)")
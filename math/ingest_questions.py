@@ -0,0 +1,240 @@
+"""
+Question ingestion. Streams CSV or NDJSON exports into the question bank
+one record at a time: each record is validated against the bank schema
+(question text, options A-F, answer = one of the option keys), deduplicated
+by content id (question_bank.question_id, also against the questions
+already in the bank) and appended to sharded bank files
+
+    logic/pyqs/<topic>__<level>__<nnnn>.json
+
+of at most --shard-size questions each, which QuestionBank merges into
+the topic. Shards are written under a temporary name and renamed when
+full, so a running app never reads a partial file. Existing shards are
+never rewritten; a re-run continues with the next shard number.
+
+NDJSON records: {"topic", "level", "question", "options": {"A": ...} or
+[...], "answer"}. CSV columns: topic, level, question, answer and one
+column per option (A, B, ... or option_a, option_b, ...). --topic and
+--level fill in records that lack them.
+
+    python ingest_questions.py FILE [FILE ...] [--topic T] [--level L]
+        [--out DIR] [--shard-size N] [--dry-run]
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from logic.python import question_bank
+
+DEFAULT_SHARD_SIZE = 5000
+OPTION_COLUMN = re.compile(r"^(?:option[ _]?)?([a-f])$")
+# How many invalid records are printed before only counting them
+MAX_REPORTED_ERRORS = 20
+
+
+# ---------- Readers ----------
+def read_ndjson(path):
+    """Yield (line number, record) for each non-blank line"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, ValueError(f"invalid JSON: {e.msg}")
+
+
+def read_csv(path):
+    """Yield (line number, record) with option columns gathered into "options" """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        option_columns = {}
+        for column in reader.fieldnames or ():
+            match = OPTION_COLUMN.match(column.strip().lower())
+            if match:
+                option_columns[column] = match.group(1).upper()
+        for row in reader:
+            record = {key.strip().lower(): value for key, value in row.items()
+                      if key is not None and key not in option_columns}
+            record["options"] = {option_columns[column]: row[column] for column in option_columns
+                                 if row.get(column) not in (None, "")}
+            yield reader.line_num, record
+
+
+READERS = {'.csv': read_csv, '.ndjson': read_ndjson, '.jsonl': read_ndjson}
+
+
+# ---------- Validation ----------
+def validate(record, default_topic=None, default_level=None):
+    """Return (topic, level, question) in bank form, or raise ValueError"""
+    if isinstance(record, Exception):
+        raise record
+    if not isinstance(record, dict):
+        raise ValueError("record is not an object")
+
+    topic = question_bank.normalize_topic(str(record.get("topic") or default_topic or ""))
+    if not topic or not re.fullmatch(r"[a-z0-9_]+", topic):
+        raise ValueError(f"invalid topic '{record.get('topic')}'")
+    level = str(record.get("level") or default_level or "").strip().lower()
+    if level not in question_bank.LEVELS:
+        raise ValueError(f"invalid level '{record.get('level')}'")
+
+    text = " ".join(str(record.get("question") or "").split())
+    if not text:
+        raise ValueError("missing question text")
+
+    options = record.get("options")
+    if isinstance(options, list):
+        options = {chr(ord("A") + i): value for i, value in enumerate(options)}
+    if not isinstance(options, dict) or not 2 <= len(options) <= 6:
+        raise ValueError("options must be 2-6 choices")
+    options = {str(key).strip().upper(): " ".join(str(value).split()) for key, value in options.items()}
+    if any(not value for value in options.values()):
+        raise ValueError("empty option")
+
+    answer = str(record.get("answer") or "").strip().upper()
+    if answer not in options:
+        raise ValueError(f"answer '{record.get('answer')}' is not one of the options {sorted(options)}")
+
+    return topic, level, {"question": text, "options": options, "answer": answer}
+
+
+# ---------- Shard Writer ----------
+class ShardWriter:
+    """Appends questions to <topic>__<level>__<nnnn>.json shards, one open shard per (topic, level)"""
+
+    def __init__(self, folder, shard_size=DEFAULT_SHARD_SIZE):
+        self.folder = folder
+        self.shard_size = shard_size
+        self._open = {}  # (topic, level) -> [file, tmp path, final path, count]
+        self._next = {}  # (topic, level) -> next shard number
+        self.shards = []
+
+    def _next_shard(self, topic, level):
+        key = (topic, level)
+        if key not in self._next:
+            numbers = [int(m.group("shard")) for m in map(question_bank.SHARD_PATTERN.match,
+                       (question_bank.normalize_topic(f) for f in os.listdir(self.folder) if f.endswith(".json")))
+                       if m and m.group("topic") == topic and m.group("level") == level]
+            self._next[key] = max(numbers, default=-1) + 1
+        number = self._next[key]
+        self._next[key] += 1
+        return number
+
+    def write(self, topic, level, question):
+        key = (topic, level)
+        shard = self._open.get(key)
+        if shard is None:
+            path = os.path.join(self.folder, f"{topic}__{level}__{self._next_shard(topic, level):04d}.json")
+            f = open(path + ".tmp", 'w', encoding='utf-8')
+            f.write(f'{{"{level}": [\n')
+            shard = self._open[key] = [f, path + ".tmp", path, 0]
+        f = shard[0]
+        if shard[3]:
+            f.write(",\n")
+        f.write(json.dumps(question, ensure_ascii=False))
+        shard[3] += 1
+        if shard[3] >= self.shard_size:
+            self._close(key)
+
+    def _close(self, key):
+        f, tmp, path, count = self._open.pop(key)
+        f.write("\n]}\n")
+        f.close()
+        os.replace(tmp, path)
+        self.shards.append((path, count))
+
+    def close(self):
+        for key in list(self._open):
+            self._close(key)
+
+
+def existing_ids(folder):
+    """Content ids of every question already in the bank folder, one file in memory at a time"""
+    ids = set()
+    for filename in sorted(f for f in os.listdir(folder) if f.endswith(".json")):
+        with open(os.path.join(folder, filename), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for questions in data.values():
+            if isinstance(questions, list):
+                ids.update(q.get("id") or question_bank.question_id(q) for q in questions if isinstance(q, dict))
+    return ids
+
+
+def peak_rss_mib():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+# ---------- Ingestion ----------
+def ingest(paths, folder=question_bank.PYQS_FOLDER, shard_size=DEFAULT_SHARD_SIZE,
+           default_topic=None, default_level=None, dry_run=False):
+    """Stream every input file into shards; returns counters for the report"""
+    seen = existing_ids(folder)
+    writer = None if dry_run else ShardWriter(folder, shard_size)
+    stats = {"read": 0, "written": 0, "duplicates": 0, "invalid": 0}
+    start = time.perf_counter()
+    try:
+        for path in paths:
+            reader = READERS.get(os.path.splitext(path)[1].lower())
+            if reader is None:
+                raise ValueError(f"{path}: unsupported file type (use .csv, .ndjson or .jsonl)")
+            for line_no, record in reader(path):
+                stats["read"] += 1
+                try:
+                    topic, level, question = validate(record, default_topic, default_level)
+                except ValueError as e:
+                    stats["invalid"] += 1
+                    if stats["invalid"] <= MAX_REPORTED_ERRORS:
+                        print(f"{path}:{line_no}: skipped, {e}")
+                    continue
+                qid = question_bank.question_id(question)
+                if qid in seen:
+                    stats["duplicates"] += 1
+                    continue
+                seen.add(qid)
+                if writer is not None:
+                    writer.write(topic, level, question)
+                stats["written"] += 1
+    finally:
+        if writer is not None:
+            writer.close()
+    stats["seconds"] = time.perf_counter() - start
+    stats["shards"] = writer.shards if writer is not None else []
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream CSV/NDJSON question exports into sharded bank files")
+    parser.add_argument('files', nargs='+')
+    parser.add_argument('--topic', help="topic for records without one")
+    parser.add_argument('--level', help="level for records without one")
+    parser.add_argument('--out', default=question_bank.PYQS_FOLDER, help="bank folder (default logic/pyqs)")
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE)
+    parser.add_argument('--dry-run', action='store_true', help="validate and dedupe without writing")
+    args = parser.parse_args()
+
+    stats = ingest(args.files, args.out, args.shard_size, args.topic, args.level, args.dry_run)
+    for path, count in stats["shards"]:
+        print(f"  {os.path.basename(path)}: {count} questions")
+    rate = stats["read"] / stats["seconds"] if stats["seconds"] else 0
+    peak = peak_rss_mib()
+    print(f"\n{stats['read']:,} records: {stats['written']:,} written, {stats['duplicates']:,} duplicates, "
+          f"{stats['invalid']:,} invalid, {len(stats['shards'])} shards")
+    print(f"{stats['seconds']:.2f}s, {rate:,.0f} records/s" + (f", peak RSS {peak:.1f} MiB" if peak else ""))
+    if stats["shards"]:
+        print("Rebuild the compiled bank if you use one: python build_question_bank.py")
@@ -1,19 +1,18 @@
 import random
-import json
-import os
+
+try:
+    from . import question_bank
+    from . import question_batch
+except ImportError:
+    import question_bank
+    import question_batch
 
 # ---------- Load Questions from JSON ----------
+QUESTIONS_FILE = 'Algebra_CBSE_MCQ_by_Difficulty_FULL.json'
+
 def load_algebra_questions():
-    """Load algebra questions from JSON file"""
-    json_file_path = os.path.join(os.path.dirname(__file__), '..', 'pyqs', 'Algebra_CBSE_MCQ_by_Difficulty_FULL.json')
-    
-    try:
-        with open(json_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return data
-    except Exception as e:
-        print(f"Error loading algebra questions from JSON: {e}")
-        return None
+    """Return algebra questions by level from the shared in-memory question bank"""
+    return question_bank.get_bank().levels(QUESTIONS_FILE)
 
 # ---------- Get Questions by Level ----------
 def get_easy_question():
@@ -52,6 +51,17 @@ def get_question(level="easy"):
     else:
         return {"error": "Invalid level. Use 'easy', 'medium', or 'hard'."}
 
+# ---------- Batch Interface ----------
+def get_questions(level="easy", count=1, seed=None):
+    """Batch version of get_question: draw count questions from the bank in one pass"""
+    level = level.lower()
+    if level not in ("easy", "medium", "hard"):
+        return {"error": "Invalid level. Use 'easy', 'medium', or 'hard'."}
+    questions = load_algebra_questions().get(level)
+    if not questions:
+        return {"error": f"No {level} questions available"}
+    return question_batch.sample_static(questions, count, question_batch.make_rng(seed))
+
 # ---------- CLI Testing ----------
 if __name__ == "__main__":
     for level in ["easy", "medium", "hard"]:
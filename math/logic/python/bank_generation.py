@@ -0,0 +1,210 @@
+import hashlib
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# ---------- Configuration ----------
+# Shared by every worker on the host: "<generation> <bank signature>"
+GENERATION_FILE = os.getenv(
+    'QUESTION_BANK_GENERATION_FILE',
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'bank_generation')))
+# How often (seconds) each worker's watcher rescans logic/pyqs
+WATCH_INTERVAL = float(os.getenv('QUESTION_BANK_WATCH_INTERVAL', '1.0'))
+
+
+# ---------- Bank Generation ----------
+# The bank generation is a counter in GENERATION_FILE, bumped whenever the
+# signature of the bank files changes. Every worker runs a watcher that
+# rescans the folder, so a change is picked up (and bumped once, under a
+# file lock) by whichever worker sees it first; the others only see the
+# counter move. A worker whose bank is older than the counter builds a new
+# QuestionBank on a background thread and swaps it in whole, so requests
+# keep being served from the old bank until the new one is complete.
+
+def bank_signature(folder, extra_paths=()):
+    """Digest of the name, size and mtime of every bank file (and any compiled artifact)"""
+    digest = hashlib.blake2b(digest_size=8)
+    try:
+        names = sorted(f for f in os.listdir(folder) if f.endswith(".json"))
+    except OSError:
+        names = []
+    paths = [os.path.join(folder, name) for name in names] + list(extra_paths)
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        digest.update(f"{os.path.basename(path)}:{st.st_size}:{st.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def read_generation(path=GENERATION_FILE):
+    """(generation, signature) recorded in the generation file; (0, None) if there is none"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            generation, signature = f.read().split()
+        return int(generation), signature
+    except (OSError, ValueError):
+        return 0, None
+
+
+def advance_generation(signature, path=GENERATION_FILE):
+    """Bump the generation unless it already records this signature; returns the current generation"""
+    with open(path + ".lock", 'a') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        generation, recorded = read_generation(path)
+        if recorded == signature:
+            return generation
+        generation += 1
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(f"{generation} {signature}\n")
+        os.replace(tmp, path)
+        return generation
+
+
+# ---------- Reloading Bank Holder ----------
+class BankReloader:
+    """
+    Holds this process's QuestionBank and replaces it when the shared
+    generation moves past the one it was loaded at.
+
+    current() just returns the bank; check() is the per-request test (one
+    stat of the generation file) and only starts a reload, never waits.
+    """
+
+    def __init__(self, loader, folder, extra_paths=(), path=GENERATION_FILE, watch_interval=WATCH_INTERVAL,
+                 initial_loader=None):
+        self.loader = loader
+        self.folder = folder
+        self.extra_paths = tuple(extra_paths)
+        self.path = path
+        self.watch_interval = watch_interval
+        self._lock = threading.Lock()
+        self._stamp = None          # (mtime_ns, size) of the generation file when last read
+        self._reloading = False
+        self._watcher = None
+        self.generation = 0         # latest generation seen in the shared file
+        self.loaded_generation = 0  # generation the current bank was loaded at
+        self.failed_generation = None
+        self.loaded_at = None
+        self.reloads = 0
+        self.last_reload_seconds = None
+        self.last_error = None
+
+        # Record the bank on disk before the first load, so it is not reloaded straight away
+        self.generation = self._advance()
+        self.bank = (initial_loader or loader)()
+        self.loaded_generation = self.generation
+        self.loaded_at = time.time()
+        # A forked worker (gunicorn --preload) keeps the bank but not the watcher or reload threads
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        started = self._watcher is not None
+        self._lock = threading.Lock()
+        self._reloading = False
+        self._watcher = None
+        self._stamp = None  # re-read the generation on the next check()
+        if started:
+            self.start()
+
+    def _advance(self):
+        try:
+            return advance_generation(bank_signature(self.folder, self.extra_paths), self.path)
+        except OSError as e:
+            self.last_error = f"Could not update {self.path}: {e}"
+            return self.generation
+
+    def current(self):
+        return self.bank
+
+    def check(self):
+        """Start a background reload if the shared generation moved; cheap when it did not"""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp == self._stamp:
+            return
+        self._stamp = stamp
+        self.generation, _ = read_generation(self.path)
+        if self._stale():
+            self._start_reload()
+
+    def _stale(self):
+        return self.generation > self.loaded_generation and self.generation != self.failed_generation
+
+    def _start_reload(self):
+        with self._lock:
+            if self._reloading:
+                return
+            self._reloading = True
+        threading.Thread(target=self._reload, name="question-bank-reload", daemon=True).start()
+
+    def _reload(self):
+        try:
+            while self._stale():
+                generation = self.generation
+                start = time.perf_counter()
+                try:
+                    bank = self.loader()
+                except Exception as e:
+                    self.last_error = f"Reload to generation {generation} failed: {e}"
+                    print(f"Error reloading question bank: {e}")
+                    # Keep serving the old bank; the next change bumps the generation again
+                    self.failed_generation = generation
+                    break
+                # One reference assignment: requests see either the old bank or the new one
+                self.bank = bank
+                self.loaded_generation = generation
+                self.loaded_at = time.time()
+                self.reloads += 1
+                self.last_reload_seconds = round(time.perf_counter() - start, 4)
+                self.last_error = None
+                print(f"Question bank reloaded at generation {generation} in {self.last_reload_seconds}s")
+        finally:
+            with self._lock:
+                self._reloading = False
+        # The generation may have moved after the loop's last check
+        if self._stale():
+            self._start_reload()
+
+    # ---------- Folder Watcher ----------
+    def start(self):
+        """Start the watcher thread that bumps the generation when bank files change (idempotent)"""
+        if self._watcher is None or not self._watcher.is_alive():
+            self._watcher = threading.Thread(target=self._watch, name="question-bank-watcher", daemon=True)
+            self._watcher.start()
+        return self
+
+    def _watch(self):
+        signature = None
+        while True:
+            time.sleep(self.watch_interval)
+            current = bank_signature(self.folder, self.extra_paths)
+            if current != signature:
+                signature = current
+                self._advance()
+            self.check()
+
+    def stats(self):
+        return {
+            "pid": os.getpid(),
+            "generation": self.generation,
+            "loaded_generation": self.loaded_generation,
+            "failed_generation": self.failed_generation,
+            "loaded_at": self.loaded_at,
+            "reloading": self._reloading,
+            "reloads": self.reloads,
+            "last_reload_seconds": self.last_reload_seconds,
+            "last_error": self.last_error,
+            "bank": type(self.bank).__name__,
+        }
@@ -0,0 +1,267 @@
+import bisect
+import array
+import functools
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+from collections.abc import Sequence
+
+try:
+    from . import question_bank
+except ImportError:
+    import question_bank
+
+# ---------- Binary Question Bank Format ----------
+# A compiled bank is one little-endian file, every section 8-byte aligned:
+#
+#   header        MAGIC, then section counts and byte offsets (HEADER)
+#   string table  u32 offsets[n + 1] + UTF-8 data; every distinct string once
+#                 (question text, option keys and values, answers, names)
+#   records       fixed-width RECORD per distinct question: 8-byte id, string
+#                 indexes, a slice of the option array and its first pool
+#   options       u32 (key, value) string-index pairs
+#   pools         POOL per (file, level): a slice of the pool entries
+#   pool entries  u32 record index per question, in file order
+#   id index      u64 ids sorted ascending + u32 record index, for lookup()
+#
+# Workers mmap the file read-only, so its pages are shared through the page
+# cache rather than copied into each process; questions are decoded into
+# dicts only when read.
+
+MAGIC = b"QBANK\x00\x00\x01"
+HEADER = struct.Struct("<8s6I8I")
+RECORD = struct.Struct("<8sIIIIII")
+POOL = struct.Struct("<IIII")
+NO_STRING = 0xFFFFFFFF
+# Decoded questions kept per process; the hot part of a bank stays as dicts, the rest stays in the map
+RECORD_CACHE_SIZE = int(os.getenv('QUESTION_BANK_RECORD_CACHE', '4096'))
+
+COMPILED_PATH = os.getenv(
+    'QUESTION_BANK_COMPILED',
+    os.path.abspath(os.path.join(question_bank.PYQS_FOLDER, '..', 'question_bank.bin')))
+
+
+def _align(buffer):
+    buffer.extend(b"\x00" * (-len(buffer) % 8))
+    return len(buffer)
+
+
+# ---------- Compiler ----------
+def compile_bank(folder=question_bank.PYQS_FOLDER, path=COMPILED_PATH):
+    """Compile every JSON bank in folder into one binary file; returns {'questions', 'records', 'strings', 'bytes'}"""
+    strings = {}
+
+    def intern(value):
+        return strings.setdefault(value, len(strings))
+
+    records = {}  # id bytes -> RECORD fields
+    options = []
+    pools = []
+    entries = []
+    for filename in sorted(f for f in os.listdir(folder) if f.endswith(".json")):
+        with open(os.path.join(folder, filename), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for level, questions in data.items():
+            if not isinstance(questions, list):
+                continue
+            pool_index = len(pools)
+            pools.append((intern(filename), intern(level.lower()), len(entries), len(questions)))
+            for q in questions:
+                qid = q.get("id") or question_bank.question_id(q)
+                try:
+                    key = bytes.fromhex(qid)
+                except ValueError:
+                    key = b""
+                if len(key) != 8:
+                    raise ValueError(f"{filename}: question id '{qid}' is not 16 hex digits")
+                if key not in records:
+                    extra = {k: v for k, v in q.items() if k not in ("id", "question", "options", "answer")}
+                    q_options = q.get("options") or {}
+                    records[key] = (
+                        key,
+                        intern(str(q.get("question", ""))),
+                        intern(str(q.get("answer", ""))),
+                        len(options) // 2,
+                        len(q_options),
+                        intern(json.dumps(extra, ensure_ascii=False)) if extra else NO_STRING,
+                        pool_index,
+                    )
+                    for option_key, value in q_options.items():
+                        options.extend((intern(str(option_key)), intern(str(value))))
+                entries.append(key)
+
+    record_index = {key: i for i, key in enumerate(records)}
+    encoded = [s.encode('utf-8') for s in strings]
+    string_offsets = [0]
+    for s in encoded:
+        string_offsets.append(string_offsets[-1] + len(s))
+    ids = sorted(records)
+
+    out = bytearray(HEADER.size)
+    offsets = [_align(out)]
+    out += struct.pack(f"<{len(string_offsets)}I", *string_offsets)
+    offsets.append(_align(out))
+    out += b"".join(encoded)
+    offsets.append(_align(out))
+    out += b"".join(RECORD.pack(*fields) for fields in records.values())
+    offsets.append(_align(out))
+    out += struct.pack(f"<{len(options)}I", *options)
+    offsets.append(_align(out))
+    out += b"".join(POOL.pack(*pool) for pool in pools)
+    offsets.append(_align(out))
+    out += struct.pack(f"<{len(entries)}I", *(record_index[key] for key in entries))
+    offsets.append(_align(out))
+    out += struct.pack(f"<{len(ids)}Q", *(int.from_bytes(key, 'big') for key in ids))
+    offsets.append(_align(out))
+    out += struct.pack(f"<{len(ids)}I", *(record_index[key] for key in ids))
+    HEADER.pack_into(out, 0, MAGIC, len(strings), len(records), len(options) // 2, len(pools), len(entries), 0, *offsets)
+
+    # Write beside the target and rename so running workers never map a half-written file
+    tmp = path + ".tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(tmp, 'wb') as f:
+        f.write(out)
+    os.replace(tmp, path)
+    return {"questions": len(entries), "records": len(records), "strings": len(strings), "bytes": len(out)}
+
+
+# ---------- Memory-mapped Reader ----------
+class CompiledPool(Sequence):
+    """Read-only view of a pool (record indexes into the map); questions are decoded on access"""
+
+    def __init__(self, bank, entries):
+        self._bank = bank
+        self._entries = entries
+        self._count = len(entries)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("question pool index out of range")
+        return self._bank.record(self._entries[index])
+
+
+def _sample(pool, k):
+    """random.sample over indices, so only the k chosen questions are decoded"""
+    return [pool[i] for i in random.sample(range(len(pool)), min(k, len(pool)))]
+
+
+class CompiledQuestionBank(question_bank.QuestionBank):
+    """
+    QuestionBank backed by a compile_bank() artifact. The file is mmapped
+    and never parsed as a whole: pools are views over it, lookup() is a
+    binary search of the id index. Reloading means recompiling: with
+    QUESTION_BANK_HOT_RELOAD (the default) every worker maps the new file
+    on the next bank generation (bank_generation.py), otherwise on restart.
+    """
+
+    def __init__(self, path=COMPILED_PATH, folder=question_bank.PYQS_FOLDER):
+        super().__init__(folder=folder)
+        self.path = path
+        self._map = None
+        self.record = functools.lru_cache(maxsize=RECORD_CACHE_SIZE)(self._decode_record)
+
+    def load_all(self):
+        if sys.byteorder != "little":
+            raise ValueError("compiled question banks are little-endian only")
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        (magic, n_strings, n_records, n_options, n_pools, n_entries, _,
+         o_offsets, o_strings, o_records, o_options, o_pools, o_entries, o_ids, o_id_records) = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a compiled question bank (or was built by another version)")
+        self._string_offsets = view[o_offsets:o_offsets + 4 * (n_strings + 1)].cast('I')
+        self._strings = view[o_strings:o_records]
+        self._records = view[o_records:o_records + RECORD.size * n_records]
+        self._options = view[o_options:o_options + 8 * n_options].cast('I')
+        self._entries = view[o_entries:o_entries + 4 * n_entries].cast('I')
+        self._ids = view[o_ids:o_ids + 8 * n_records].cast('Q')
+        self._id_records = view[o_id_records:o_id_records + 4 * n_records].cast('I')
+        self._pools = [POOL.unpack_from(view, o_pools + POOL.size * i) for i in range(n_pools)]
+
+        self._pool_names = [(self.string(filename), self.string(level)) for filename, level, _, _ in self._pools]
+        files = {}
+        for (filename, level), (_, _, start, count) in zip(self._pool_names, self._pools):
+            files.setdefault(filename, {})[level] = CompiledPool(self, self._entries[start:start + count])
+        self._files = files
+        self._build_topic_index()
+        self.loads += 1
+        return self
+
+    def string(self, index):
+        return str(self._strings[self._string_offsets[index]:self._string_offsets[index + 1]], 'utf-8')
+
+    def _decode_record(self, index):
+        """Decode one question record into the same dict shape as the JSON bank (cached as self.record)"""
+        key, text, answer, opt_start, opt_count, extra, _ = RECORD.unpack_from(self._records, RECORD.size * index)
+        pairs = self._options[2 * opt_start:2 * (opt_start + opt_count)]
+        question = {
+            "question": self.string(text),
+            "options": {self.string(pairs[i]): self.string(pairs[i + 1]) for i in range(0, len(pairs), 2)},
+            "answer": self.string(answer),
+        }
+        if extra != NO_STRING:
+            question.update(json.loads(self.string(extra)))
+        question["id"] = key.hex()
+        return question
+
+    # ---------- Lookups ----------
+    def levels(self, filename):
+        return self._files.get(filename, {})
+
+    def topic_levels(self, name):
+        """Like QuestionBank.topic_levels, but sharded topics are merged as index arrays, not decoded"""
+        canonical = self.resolve_topic(name)
+        if canonical is None:
+            return None
+        filenames = self._topics[canonical]
+        if len(filenames) == 1:
+            return self.levels(filenames[0])
+        if canonical not in self._merged:
+            merged = {}
+            for filename in filenames:
+                for level, pool in self.levels(filename).items():
+                    merged.setdefault(level, array.array('I')).extend(pool._entries)
+            self._merged[canonical] = {level: CompiledPool(self, entries) for level, entries in merged.items()}
+        return self._merged[canonical]
+
+    def sample(self, filename, level, k):
+        return _sample(self.questions(filename, level), k)
+
+    def _pool_keys(self, pool):
+        # Repeats of a question are compiled to one record, so record indexes identify questions undecoded
+        return getattr(pool, '_entries', ())
+
+    def lookup(self, question_id):
+        try:
+            key = int(question_id, 16) if len(question_id) == 16 else None
+        except (TypeError, ValueError):
+            key = None
+        if key is None:
+            return None
+        i = bisect.bisect_left(self._ids, key)
+        if i == len(self._ids) or self._ids[i] != key:
+            return None
+        index = self._id_records[i]
+        filename, level = self._pool_names[RECORD.unpack_from(self._records, RECORD.size * index)[6]]
+        return filename, level, self.record(index)
+
+
+def is_current(path=COMPILED_PATH, folder=question_bank.PYQS_FOLDER):
+    """True if the artifact exists and is newer than every JSON bank file"""
+    try:
+        compiled_at = os.path.getmtime(path)
+        sources = [os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(".json")]
+        return all(os.path.getmtime(source) <= compiled_at for source in sources)
+    except OSError:
+        return False
@@ -0,0 +1,185 @@
+import functools
+import json
+import os
+import time
+import zlib
+
+# ---------- Configuration ----------
+# Questions whose shingle sets have at least this Jaccard similarity are near-duplicates
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0.8'))
+# Clusters are found offline (find_duplicates.py --write, build_question_bank.py) and saved
+# here; a loading bank only reads this file. NEAR_DUPLICATE_CHECK=1 runs the full check at
+# every bank load instead, which costs seconds on a large bank.
+CLUSTERS_PATH = os.getenv('NEAR_DUPLICATES_PATH',
+                          os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'near_duplicates.json')))
+NEAR_DUPLICATE_CHECK = os.getenv('NEAR_DUPLICATE_CHECK', '0') == '1'
+# Keep all but one question of each near-duplicate cluster out of quiz sampling
+QUIZ_EXCLUDE_NEAR_DUPLICATES = os.getenv('QUIZ_EXCLUDE_NEAR_DUPLICATES', '0') == '1'
+
+SHINGLE_SIZE = 4
+NUM_PERM = 128
+BANDS = 32           # 32 bands of 4 rows: pairs above ~0.45 similarity usually share a bucket
+ROWS = NUM_PERM // BANDS
+MAX_PAIRWISE_BUCKET = 32  # larger buckets are compared against their first member only
+_PRIME = (1 << 31) - 1
+
+
+@functools.lru_cache(maxsize=None)
+def _permutations():
+    # numpy is only imported when signatures are computed, never by a serving bank load
+    import numpy as np
+    rng = np.random.default_rng(0x5eed)
+    return (np,
+            rng.integers(1, _PRIME, NUM_PERM, dtype=np.uint64)[:, None],
+            rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64)[:, None])
+
+
+# ---------- MinHash ----------
+def shingles(question):
+    """Character shingles of the whitespace-normalized question text and options"""
+    parts = [question.get("question", "")] + [str(v) for v in (question.get("options") or {}).values()]
+    text = " | ".join(" ".join(str(part).lower().split()) for part in parts)
+    if len(text) < SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(shingle_set):
+    """NUM_PERM-value MinHash signature: min of (a * crc32(shingle) + b) mod p per permutation"""
+    np, a, b = _permutations()
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingle_set), dtype=np.uint64, count=len(shingle_set))
+    return ((a * hashes + b) % _PRIME).min(axis=1)
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+# ---------- Locality-Sensitive Hashing ----------
+def find_near_duplicates(items, threshold=NEAR_DUPLICATE_THRESHOLD):
+    """
+    items: [(key, question)] in priority order. Signatures are bucketed per
+    band, only questions sharing a bucket are compared (exact Jaccard), so
+    the work grows with the number of questions, not their pairs.
+    Returns (pairs [(key_a, key_b, similarity)], clusters [[key, ...]]) with
+    each cluster ordered like items, so its first key is the one to keep.
+    """
+    sets = [shingles(question) for _, question in items]
+    signatures = [minhash(s) for s in sets]
+
+    candidates = set()
+    for band in range(BANDS):
+        buckets = {}
+        for doc, signature in enumerate(signatures):
+            buckets.setdefault(signature[band * ROWS:(band + 1) * ROWS].tobytes(), []).append(doc)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            if len(members) <= MAX_PAIRWISE_BUCKET:
+                candidates.update((a, b) for i, a in enumerate(members) for b in members[i + 1:])
+            else:
+                candidates.update((members[0], b) for b in members[1:])
+
+    parent = list(range(len(items)))
+
+    def find(doc):
+        while parent[doc] != doc:
+            parent[doc] = parent[parent[doc]]
+            doc = parent[doc]
+        return doc
+
+    pairs = []
+    for a, b in sorted(candidates):
+        similarity = jaccard(sets[a], sets[b])
+        if similarity >= threshold:
+            pairs.append((items[a][0], items[b][0], round(similarity, 3)))
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    clusters = {}
+    for doc in range(len(items)):
+        clusters.setdefault(find(doc), []).append(items[doc][0])
+    return pairs, [members for members in clusters.values() if len(members) > 1]
+
+
+# ---------- Bank Check ----------
+# Bank questions are keyed by position, "<topic>:<level>:<position>", not by id: a question
+# repeated in a pool shares its content-hash id, and every copy must be reported and excludable
+def position_key(topic, level, position):
+    return f"{topic}:{level}:{position}"
+
+
+def parse_position_key(key):
+    """(topic, level, position) for a position key, or None"""
+    topic, _, rest = str(key).partition(":")
+    level, _, position = rest.partition(":")
+    return (topic, level, int(position)) if topic and level and position.isdigit() else None
+
+
+def bank_question(bank, key):
+    """The bank question at a position key, or None"""
+    parsed = parse_position_key(key)
+    if parsed is None:
+        return None
+    topic, level, position = parsed
+    pool = (bank.topic_levels(topic) or {}).get(level, ())
+    return pool[position] if position < len(pool) else None
+
+
+def bank_items(bank):
+    """[(position key, question)] for every position of every topic/level pool, in stable bank order"""
+    return [(position_key(topic, level, position), question)
+            for topic in bank.topics()
+            for level, pool in sorted((bank.topic_levels(topic) or {}).items())
+            for position, question in enumerate(pool)]
+
+
+def apply_clusters(bank, clusters, exclude=QUIZ_EXCLUDE_NEAR_DUPLICATES):
+    """Record clusters on the bank and, with `exclude`, keep all but their first position out of quizzes"""
+    bank.near_duplicate_clusters = clusters
+    duplicates = frozenset(parsed for cluster in clusters for parsed in map(parse_position_key, cluster[1:])
+                           if parsed is not None)
+    if exclude:
+        bank.exclude_from_sampling(duplicates)
+    return duplicates
+
+
+def check_bank(bank, threshold=NEAR_DUPLICATE_THRESHOLD, exclude=QUIZ_EXCLUDE_NEAR_DUPLICATES):
+    """Full check: find the bank's near-duplicate clusters and apply them"""
+    start = time.perf_counter()
+    _, clusters = find_near_duplicates(bank_items(bank), threshold)
+    duplicates = apply_clusters(bank, clusters, exclude)
+    if clusters:
+        print(f"Near-duplicate check: {len(clusters)} clusters, {len(duplicates)} redundant questions"
+              f"{' excluded from quizzes' if exclude else ''} ({time.perf_counter() - start:.2f}s; "
+              f"python find_duplicates.py for the report)")
+    return clusters
+
+
+# ---------- Saved Clusters ----------
+def write_clusters(clusters, threshold=NEAR_DUPLICATE_THRESHOLD, path=CLUSTERS_PATH):
+    """Save clusters of bank position keys for loading banks (atomic replace)"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({"threshold": threshold, "clusters": clusters}, f, indent=1)
+    os.replace(tmp, path)
+
+
+def read_clusters(path=CLUSTERS_PATH):
+    """Saved clusters, or None if there is no (readable) cluster file"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)["clusters"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def attach_clusters(bank):
+    """Bank load hook: apply the saved clusters, or run the full check with NEAR_DUPLICATE_CHECK=1"""
+    if NEAR_DUPLICATE_CHECK:
+        return check_bank(bank)
+    clusters = read_clusters()
+    if clusters:
+        apply_clusters(bank, clusters)
+    return clusters
@@ -0,0 +1,402 @@
+import functools
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import struct
+import threading
+import time
+
+try:
+    from . import seen_sets
+except ImportError:
+    import seen_sets
+
+# ---------- Configuration ----------
+PYQS_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'pyqs'))
+LEVELS = ("easy", "medium", "hard")
+
+# Filename suffixes stripped to derive a topic key from a bank file
+TOPIC_SUFFIXES = ("_mcqs_by_level", "_cbse_mcq_by_difficulty_full")
+
+# Shard files written by ingest_questions.py: <topic>__<level>__<nnnn>.json
+SHARD_PATTERN = re.compile(r"^(?P<topic>.+?)__(?P<level>easy|medium|hard)__(?P<shard>\d+)$")
+
+# Preferred canonical keys where the stripped filename differs from the app's topic names,
+# plus the data-topic names templates/home.html sends that no filename spells out
+CANONICAL_TOPICS = {
+    "triangle": "triangles",
+    "stats": "statistics",
+    "surface_area_and_volumes": "surface_areas_volumes",
+    "surface_areas_and_volumes": "surface_areas_volumes",
+}
+
+# How often (seconds) a file's mtime is re-checked before serving from memory
+MTIME_CHECK_INTERVAL = float(os.getenv('QUESTION_BANK_CHECK_INTERVAL', '1.0'))
+
+# Reload the whole bank across workers when logic/pyqs changes (see bank_generation.py);
+# with QUESTION_BANK_HOT_RELOAD=0 each file is re-read on its own when its mtime changes
+HOT_RELOAD = os.getenv('QUESTION_BANK_HOT_RELOAD', '1') != '0'
+
+
+# ---------- Topic Keys ----------
+def normalize_topic(name):
+    """Normalize a topic name or filename: lowercase, underscores, no .json extension"""
+    key = name.strip().lower()
+    if key.endswith(".json"):
+        key = key[:-5]
+    return key.replace(" ", "_").replace("-", "_")
+
+
+def topic_keys(filename):
+    """Return (canonical_key, aliases) for a bank file"""
+    filename_key = normalize_topic(filename)
+    shard = SHARD_PATTERN.match(filename_key)
+    stem = shard.group("topic") if shard else filename_key
+    stripped = stem
+    for suffix in TOPIC_SUFFIXES:
+        if stripped.endswith(suffix):
+            stripped = stripped[:-len(suffix)]
+            break
+    canonical = CANONICAL_TOPICS.get(stripped, stripped)
+    aliases = {filename_key, stem, stripped, canonical}
+    aliases.update(key for key, value in CANONICAL_TOPICS.items() if value == canonical)
+    for key in (stripped, canonical):
+        # Accept both singular and plural spellings ("triangle" / "triangles")
+        aliases.add(key[:-1] if key.endswith("s") else key + "s")
+    return canonical, aliases
+
+
+# ---------- Question IDs ----------
+def question_id(question):
+    """
+    Stable, content-derived id for a bank question: a hash of its text and
+    options with whitespace collapsed, so reformatting a file keeps its ids
+    """
+    text = " ".join(str(question.get("question", "")).split())
+    options = {str(key): " ".join(str(value).split()) for key, value in (question.get("options") or {}).items()}
+    payload = json.dumps([text, options], sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+# ---------- Question Bank ----------
+class QuestionBank:
+    """
+    Process-wide, in-memory store of every JSON question file in logic/pyqs.
+
+    Each file is parsed once and indexed as {level: tuple(questions)}.
+    A file is re-read only when its mtime changes on disk. Every question
+    gets an "id" (question_id) and is indexed by it for lookup().
+    """
+
+    def __init__(self, folder=PYQS_FOLDER, check_interval=MTIME_CHECK_INTERVAL, strict=False):
+        self.folder = folder
+        self.check_interval = check_interval
+        self.strict = strict  # raise on an unreadable file instead of leaving it out
+        self._lock = threading.Lock()
+        self._files = {}       # filename -> {level: tuple}
+        self._mtimes = {}      # filename -> mtime of the loaded copy
+        self._checked_at = {}  # filename -> last time the mtime was checked
+        self._topics = {}      # canonical topic -> filenames (one bank file, or several shards)
+        self._merged = {}      # canonical topic -> (mtimes, merged levels) for multi-file topics
+        self._aliases = {}     # alias -> canonical topic
+        self._by_id = {}       # question id -> (filename, level, question)
+        self._file_ids = {}    # filename -> ids indexed from that file
+        self._search_index = None
+        self._search_lock = threading.Lock()
+        self.near_duplicate_clusters = []  # filled by near_duplicates.check_bank
+        self.excluded_positions = frozenset()  # (topic, level, position) quizzes never draw
+        self._sampling = {}                # (topic, level) -> (pool, indices quizzes may draw)
+        self.loads = 0
+
+    def load_all(self):
+        """Load every JSON file in the bank folder"""
+        try:
+            filenames = sorted(f for f in os.listdir(self.folder) if f.endswith(".json"))
+        except OSError as e:
+            print(f"Error listing question bank folder {self.folder}: {e}")
+            return self
+        for filename in filenames:
+            self._load_file(filename)
+        self._build_topic_index()
+        return self
+
+    def _build_topic_index(self):
+        topics = {}
+        aliases = {}
+        for filename in self._files:
+            canonical, keys = topic_keys(filename)
+            topics.setdefault(canonical, []).append(filename)
+            for key in keys:
+                aliases.setdefault(key, canonical)
+        # Canonical keys always win over another file's alias
+        aliases.update({canonical: canonical for canonical in topics})
+        self._topics = {canonical: tuple(sorted(filenames)) for canonical, filenames in topics.items()}
+        self._aliases = aliases
+        self._merged = {}
+
+    def _load_file(self, filename):
+        path = os.path.join(self.folder, filename)
+        try:
+            mtime = os.path.getmtime(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            if self.strict:
+                raise
+            print(f"Error loading question bank {filename}: {e}")
+            return None
+
+        levels = {}
+        by_id = {}
+        if isinstance(data, dict):
+            for level, questions in data.items():
+                if isinstance(questions, list):
+                    level = level.lower()
+                    questions = tuple(
+                        dict(q, id=q.get("id") or question_id(q)) if isinstance(q, dict) else q
+                        for q in questions
+                    )
+                    levels[level] = questions
+                    by_id.update((q["id"], (filename, level, q)) for q in questions if isinstance(q, dict))
+
+        with self._lock:
+            for qid in self._file_ids.get(filename, ()):
+                self._by_id.pop(qid, None)
+            self._by_id.update(by_id)
+            self._file_ids[filename] = set(by_id)
+            self._files[filename] = levels
+            self._mtimes[filename] = mtime
+            self._checked_at[filename] = time.monotonic()
+            self.loads += 1
+        return levels
+
+    def _is_stale(self, filename):
+        now = time.monotonic()
+        if now - self._checked_at.get(filename, 0.0) < self.check_interval:
+            return False
+        self._checked_at[filename] = now
+        try:
+            return os.path.getmtime(os.path.join(self.folder, filename)) != self._mtimes.get(filename)
+        except OSError:
+            return False
+
+    # ---------- Lookups ----------
+    def levels(self, filename):
+        """Return {level: tuple(questions)} for a bank file, reloading it if it changed"""
+        levels = self._files.get(filename)
+        if levels is None or self._is_stale(filename):
+            levels = self._load_file(filename) or levels
+        return levels or {}
+
+    def questions(self, filename, level):
+        return self.levels(filename).get(level.lower(), ())
+
+    def choice(self, filename, level):
+        questions = self.questions(filename, level)
+        return random.choice(questions) if questions else None
+
+    def sample(self, filename, level, k):
+        questions = self.questions(filename, level)
+        return random.sample(questions, min(k, len(questions)))
+
+    def filenames(self):
+        return sorted(self._files)
+
+    def lookup(self, question_id):
+        """Return (filename, level, question) for a question id, or None"""
+        return self._by_id.get(question_id)
+
+    def describe(self, question_id):
+        """Question text, options, topic and level for an id (no answer), or None"""
+        entry = self.lookup(question_id)
+        if entry is None:
+            return None
+        filename, level, question = entry
+        return {
+            "id": question_id,
+            "topic": topic_keys(filename)[0],
+            "level": level,
+            "question": question.get("question"),
+            "options": question.get("options"),
+        }
+
+    def search_index(self):
+        """Inverted index for search (question_search.SearchIndex), built on first use and after a file reloads"""
+        index = self._search_index
+        if index is None or index.bank_loads != self.loads:
+            with self._search_lock:
+                index = self._search_index
+                if index is None or index.bank_loads != self.loads:
+                    try:
+                        from . import question_search
+                    except ImportError:
+                        import question_search
+                    index = self._search_index = question_search.SearchIndex(self)
+        return index
+
+    # ---------- Topic Index ----------
+    def resolve_topic(self, name):
+        """Map a canonical topic, alias or filename to its canonical topic key (or None)"""
+        return self._aliases.get(normalize_topic(name))
+
+    def topics(self):
+        return sorted(self._topics)
+
+    def manifest(self):
+        """Return {topic: {"file": first filename, "files": [...], "levels": {level: pool_size}}} for every bank"""
+        return {
+            topic: {
+                "file": filenames[0],
+                "files": list(filenames),
+                "levels": {level: len(pool) for level, pool in self.topic_levels(topic).items()},
+            }
+            for topic, filenames in sorted(self._topics.items())
+        }
+
+    def topic_levels(self, name):
+        """Return {level: tuple(questions)} for a topic name or alias, across all of its files"""
+        canonical = self.resolve_topic(name)
+        if canonical is None:
+            return None
+        filenames = self._topics[canonical]
+        if len(filenames) == 1:
+            return self.levels(filenames[0])
+        # Sharded topics: merge the files' pools, re-merging only after one of them reloads
+        parts = [self.levels(filename) for filename in filenames]
+        mtimes = tuple(self._mtimes.get(filename) for filename in filenames)
+        cached = self._merged.get(canonical)
+        if cached is None or cached[0] != mtimes:
+            merged = {}
+            for levels in parts:
+                for level, pool in levels.items():
+                    merged.setdefault(level, []).extend(pool)
+            cached = (mtimes, {level: tuple(pool) for level, pool in merged.items()})
+            self._merged[canonical] = cached
+        return cached[1]
+
+    def exclude_from_sampling(self, positions):
+        """Keep these (topic, level, position) out of topic_sample (the questions stay searchable and gradable)"""
+        self.excluded_positions = frozenset(positions)
+        self._sampling = {}
+
+    def _pool_keys(self, pool):
+        """Per position, the identity of its question (repeated questions share one)"""
+        return [q.get("id") for q in pool]
+
+    def _sampling_indices(self, name, level, pool):
+        """
+        Positions quizzes may draw from pool: the first copy of each distinct question
+        that is not excluded. Recomputed only when the pool object changes.
+        """
+        key = (self.resolve_topic(name), level)
+        cached = self._sampling.get(key)
+        if cached is None or cached[0] is not pool:
+            indices = []
+            distinct = set()
+            for i, question in enumerate(self._pool_keys(pool)):
+                if question not in distinct and key + (i,) not in self.excluded_positions:
+                    distinct.add(question)
+                    indices.append(i)
+            cached = (pool, indices)
+            self._sampling[key] = cached
+        return cached[1]
+
+    def topic_sample(self, name, level, k):
+        """Sample up to k distinct questions for a topic/level; O(k) over the preloaded pool"""
+        level = level.lower()
+        pool = (self.topic_levels(name) or {}).get(level, ())
+        indices = self._sampling_indices(name, level, pool)
+        return [pool[i] for i in random.sample(indices, min(k, len(indices)))]
+
+    def topic_sample_unseen(self, name, level, k, seen=b""):
+        """
+        topic_sample for one learner: `seen` is their seen-set for this topic/level
+        (seen_sets.py, one bit per pool position). Only the first copy of a repeated
+        question is a candidate, so its bit stands for every copy. Returns
+        (questions, updated seen-set).
+        """
+        level = level.lower()
+        pool = (self.topic_levels(name) or {}).get(level, ())
+        candidates = self._sampling_indices(name, level, pool)
+        positions, seen = seen_sets.sample_unseen(candidates, len(pool), seen, k)
+        return [pool[i] for i in positions], seen
+
+
+# ---------- Process-wide Instance ----------
+_bank = None
+_reloader = None
+_bank_lock = threading.Lock()
+
+
+def load_bank(check_interval=MTIME_CHECK_INTERVAL, strict=False):
+    """
+    The compiled bank (compiled_bank.py) when an up-to-date artifact exists,
+    otherwise every JSON file parsed into memory
+    """
+    try:
+        from . import compiled_bank
+    except ImportError:
+        import compiled_bank
+    if compiled_bank.COMPILED_PATH and compiled_bank.is_current():
+        try:
+            bank = compiled_bank.CompiledQuestionBank().load_all()
+            print(f"Question bank mapped from {compiled_bank.COMPILED_PATH}")
+        except (OSError, ValueError, struct.error) as e:
+            print(f"Error mapping compiled question bank, parsing JSON instead: {e}")
+            bank = None
+    else:
+        bank = None
+    bank = bank or QuestionBank(check_interval=check_interval, strict=strict).load_all()
+    # Only the saved near-duplicate clusters are read here; the search index is built on
+    # the first search, so a load (or hot reload) stays a parse or an mmap
+    try:
+        from . import near_duplicates
+    except ImportError:
+        import near_duplicates
+    near_duplicates.attach_clusters(bank)
+    return bank
+
+
+def _load_shared_bank():
+    global _bank, _reloader
+    if not HOT_RELOAD:
+        _bank = load_bank()
+        return
+    try:
+        from . import bank_generation, compiled_bank, near_duplicates
+    except ImportError:
+        import bank_generation
+        import compiled_bank
+        import near_duplicates
+    # Hot-reloaded banks are never patched file by file, only replaced whole; a reload
+    # fails (and keeps the old bank) rather than swapping in a bank missing a file
+    _reloader = bank_generation.BankReloader(
+        functools.partial(load_bank, check_interval=math.inf, strict=True),
+        PYQS_FOLDER,
+        extra_paths=(compiled_bank.COMPILED_PATH, near_duplicates.CLUSTERS_PATH),
+        initial_loader=functools.partial(load_bank, check_interval=math.inf),
+    ).start()
+
+
+def get_bank():
+    """Return this process's current QuestionBank, loading it on first use"""
+    if _bank is None and _reloader is None:
+        with _bank_lock:
+            if _bank is None and _reloader is None:
+                _load_shared_bank()
+    return _reloader.bank if _reloader is not None else _bank
+
+
+def check_generation():
+    """Per-request hook: start a background reload if the shared bank generation moved"""
+    if _reloader is not None:
+        _reloader.check()
+
+
+def reload_stats():
+    if _reloader is None:
+        return {"pid": os.getpid(), "hot_reload": False}
+    return dict(_reloader.stats(), hot_reload=True)
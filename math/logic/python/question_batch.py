@@ -0,0 +1,66 @@
+import numpy as np
+
+# ---------- Shared Helpers for Batch Question Generation ----------
+# Generators draw all numeric parameters for a batch as NumPy arrays and
+# render the question text/options for the whole batch in one pass.
+
+
+# Seeding a Generator from OS entropy costs more than generating a small batch,
+# so unseeded calls share one process-wide Generator (its BitGenerator is locked).
+_shared_rng = np.random.default_rng()
+
+
+def make_rng(seed=None):
+    """Return a NumPy Generator; pass a seed for reproducible batches"""
+    if seed is None:
+        return _shared_rng
+    return np.random.default_rng(seed)
+
+
+def randint(rng, low, high, count):
+    """Inclusive on both ends, like random.randint"""
+    return rng.integers(low, high + 1, size=count)
+
+
+def split_types(rng, count, n_types):
+    """Pick a question type for every slot; return the slot indices of each type"""
+    types = rng.integers(0, n_types, size=count)
+    return [np.flatnonzero(types == t) for t in range(n_types)]
+
+
+def offset_options(values, deltas=(1, -1, 2), ndigits=None):
+    """Render options A-D as value, value+deltas[0], ... for a batch; A is the correct one"""
+    if ndigits is None:
+        return [
+            {"A": str(v), "B": str(v + deltas[0]), "C": str(v + deltas[1]), "D": str(v + deltas[2])}
+            for v in values
+        ]
+    return [
+        {
+            "A": str(round(v, ndigits)),
+            "B": str(round(v + deltas[0], ndigits)),
+            "C": str(round(v + deltas[1], ndigits)),
+            "D": str(round(v + deltas[2], ndigits)),
+        }
+        for v in values
+    ]
+
+
+def assemble(count, parts):
+    """
+    Merge per-type batches back into slot order.
+    parts: iterable of (indices, question_texts, options_list)
+    """
+    questions = [None] * count
+    for indices, texts, options in parts:
+        for i, text, opts in zip(indices.tolist(), texts, options):
+            questions[i] = {"question": text, "options": opts, "answer": "A"}
+    return questions
+
+
+def sample_static(pool, count, rng):
+    """Draw count questions from a static pool (without replacement when the pool is large enough)"""
+    if not pool:
+        return []
+    indices = rng.choice(len(pool), size=count, replace=count > len(pool))
+    return [pool[i] for i in indices.tolist()]
@@ -0,0 +1,104 @@
+import random
+import secrets
+
+# ---------- Seed-addressable Dynamic Questions ----------
+# A generated question is fully determined by (topic, level, type, seed): the
+# generator draws every number from random.Random(seed), so the compact key
+# "topic/level/type/seed" regenerates the identical question on any worker.
+
+SEED_BITS = 32
+
+_generators = {}  # topic -> generator(level, q_type, rng) -> question
+_types = {}       # topic -> {level: (type, ...)}
+
+
+def register(topic, generator, types):
+    """Register a topic's keyed generator and its question types per level"""
+    _generators[topic] = generator
+    _types[topic] = {level: tuple(names) for level, names in types.items()}
+
+
+def topics():
+    return sorted(_generators)
+
+
+def question_types(topic, level):
+    return _types.get(topic, {}).get(level, ())
+
+
+def make_key(topic, level, q_type, seed):
+    return f"{topic}/{level}/{q_type}/{seed}"
+
+
+def parse_key(key):
+    """Return (topic, level, q_type, seed) for a well-formed, registered key, else None"""
+    parts = str(key).split("/")
+    if len(parts) != 4:
+        return None
+    topic, level, q_type, seed = parts
+    if q_type not in question_types(topic, level) or not seed.isdigit():
+        return None
+    seed = int(seed)
+    if seed >= 2 ** SEED_BITS:
+        return None
+    return topic, level, q_type, seed
+
+
+# ---------- Generation ----------
+def generate(topic, level, q_type=None, seed=None, rng=None):
+    """
+    Generate one keyed question. Unset type and seed are drawn from rng
+    (a per-call random.Random; a fresh OS-seeded one by default). The
+    question carries its key as both "key" and "id".
+    """
+    level = level.lower()
+    types = question_types(topic, level)
+    if not types:
+        return {"error": f"No generated questions for {topic} level '{level}'"}
+    if q_type is not None and q_type not in types:
+        return {"error": f"Unknown question type '{q_type}' for {topic} level '{level}'"}
+    if q_type is None or seed is None:
+        rng = rng or random.Random(secrets.randbits(SEED_BITS))
+        q_type = q_type or rng.choice(types)
+        seed = rng.getrandbits(SEED_BITS) if seed is None else seed
+    key = make_key(topic, level, q_type, seed)
+    question = _generators[topic](level, q_type, random.Random(seed))
+    return dict(question, key=key, id=key)
+
+
+def generate_many(topic, level, count, seed=None):
+    """count keyed questions; the same seed always yields the same keys"""
+    rng = random.Random(secrets.randbits(SEED_BITS) if seed is None else seed)
+    return [generate(topic, level, rng=rng) for _ in range(count)]
+
+
+def regenerate(key):
+    """The identical question for a key, or None if the key is not valid"""
+    parsed = parse_key(key)
+    if parsed is None:
+        return None
+    return generate(*parsed)
+
+
+def lookup(key):
+    """(topic, level, question) for a key, shaped like QuestionBank.lookup, or None"""
+    question = regenerate(key)
+    if question is None:
+        return None
+    topic, level, _, _ = parse_key(key)
+    return topic, level, question
+
+
+def describe(key):
+    """Question text, options, topic and level for a key (no answer), like QuestionBank.describe"""
+    entry = lookup(key)
+    if entry is None:
+        return None
+    topic, level, question = entry
+    return {
+        "id": key,
+        "topic": topic,
+        "level": level,
+        "question": question.get("question"),
+        "options": question.get("options"),
+    }
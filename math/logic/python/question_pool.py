@@ -0,0 +1,157 @@
+import collections
+import os
+import threading
+import time
+
+# ---------- Configuration ----------
+LEVELS = ("easy", "medium", "hard")
+HIGH_WATER = int(os.getenv('QUESTION_POOL_HIGH_WATER', '256'))
+LOW_WATER = int(os.getenv('QUESTION_POOL_LOW_WATER', str(HIGH_WATER // 4)))
+REFILL_INTERVAL = float(os.getenv('QUESTION_POOL_REFILL_INTERVAL', '1.0'))
+RATE_WINDOW = 60.0  # seconds of refill history used for the refill-rate metric
+
+
+# ---------- Pre-generated Question Pool ----------
+class QuestionPool:
+    """
+    Per-(topic, level) ring buffers of pre-generated dynamic questions.
+
+    Request threads pop from a buffer in O(1). A background worker tops each
+    buffer back up to the high-water mark once it drops below the low-water
+    mark. If a buffer runs dry the question is generated inline instead.
+    """
+
+    def __init__(self, high_water=HIGH_WATER, low_water=LOW_WATER, refill_interval=REFILL_INTERVAL):
+        self.high_water = high_water
+        self.low_water = low_water
+        self.refill_interval = refill_interval
+        self._generators = {}  # topic -> generator(level, count) -> list of questions
+        self._buffers = {}     # (topic, level) -> deque
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._history = collections.deque()  # (timestamp, questions added)
+        self.hits = 0
+        self.misses = 0
+        self.refilled = 0
+        # A forked worker (gunicorn --preload) inherits the buffers but not the refill thread
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        started = self._thread is not None
+        self._wakeup = threading.Event()
+        self._thread = None
+        if started:
+            self.start()
+
+    def register(self, topic, generator, levels=LEVELS):
+        """Register a batch generator for a topic; one buffer is kept per level"""
+        self._generators[topic] = generator
+        for level in levels:
+            self._buffers.setdefault((topic, level), collections.deque(maxlen=self.high_water))
+        self._wakeup.set()
+
+    # ---------- Request Path ----------
+    def pop(self, topic, level):
+        """Return one pre-generated question, generating inline if the buffer is empty"""
+        level = level.lower()
+        buffer = self._buffers.get((topic, level))
+        if buffer is None:
+            return {"error": f"No question pool for {topic} level '{level}'"}
+        try:
+            question = buffer.popleft()
+            self.hits += 1
+        except IndexError:
+            self.misses += 1
+            question = self._generators[topic](level, 1)[0]
+        if len(buffer) < self.low_water:
+            self._wakeup.set()
+        return question
+
+    def pop_many(self, topic, level, count):
+        """Return count pre-generated questions (a list), generating whatever the buffer lacks in one call"""
+        level = level.lower()
+        buffer = self._buffers.get((topic, level))
+        if buffer is None:
+            return {"error": f"No question pool for {topic} level '{level}'"}
+        questions = []
+        while len(questions) < count:
+            try:
+                questions.append(buffer.popleft())
+            except IndexError:
+                break
+        self.hits += len(questions)
+        missing = count - len(questions)
+        if missing:
+            self.misses += missing
+            questions.extend(self._generators[topic](level, missing))
+        if len(buffer) < self.low_water:
+            self._wakeup.set()
+        return questions
+
+    # ---------- Background Refill ----------
+    def start(self):
+        """Start the background refill worker (idempotent)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="question-pool-refill", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.refill_interval)
+            self._wakeup.clear()
+            self.refill()
+
+    def refill(self):
+        """Top every buffer below the low-water mark back up to the high-water mark"""
+        for (topic, level), buffer in list(self._buffers.items()):
+            missing = self.high_water - len(buffer)
+            if len(buffer) >= self.low_water or missing <= 0:
+                continue
+            try:
+                questions = self._generators[topic](level, missing)
+            except Exception as e:
+                print(f"Error refilling question pool {topic}/{level}: {e}")
+                continue
+            buffer.extend(questions)
+            self.refilled += len(questions)
+            self._history.append((time.monotonic(), len(questions)))
+
+    # ---------- Metrics ----------
+    def metrics(self):
+        now = time.monotonic()
+        while self._history and now - self._history[0][0] > RATE_WINDOW:
+            self._history.popleft()
+        recent = sum(count for _, count in self._history)
+        served = self.hits + self.misses
+        return {
+            "high_water": self.high_water,
+            "low_water": self.low_water,
+            "worker_running": self._thread is not None and self._thread.is_alive(),
+            "fill": {f"{topic}/{level}": len(buffer) for (topic, level), buffer in sorted(self._buffers.items())},
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / served, 4) if served else None,
+            "refilled_total": self.refilled,
+            "refill_rate_per_sec": round(recent / RATE_WINDOW, 2),
+        }
+
+
+# ---------- Process-wide Instance ----------
+_pool = QuestionPool()
+
+
+def get_pool():
+    return _pool
+
+
+def register(topic, generator, levels=LEVELS):
+    _pool.register(topic, generator, levels)
+
+
+def pop(topic, level):
+    return _pool.pop(topic, level)
+
+
+def pop_many(topic, level, count):
+    return _pool.pop_many(topic, level, count)
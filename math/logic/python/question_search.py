@@ -0,0 +1,117 @@
+import bisect
+import math
+import re
+from collections import Counter
+
+# ---------- Configuration ----------
+# Question text counts this many times more than an option mentioning the same term
+TEXT_WEIGHT = 2
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Lowercased word tokens; single letters other than digits are dropped ("Heron's" -> heron)"""
+    return [t for t in TOKEN.findall(str(text).lower()) if len(t) > 1 or t.isdigit()]
+
+
+# ---------- Inverted Index ----------
+class SearchIndex:
+    """
+    Inverted index over every question in a bank: token -> [(doc, score)],
+    where a doc is one distinct question id with its topic and level facets
+    and the score is its BM25 weight for the token (question text weighted
+    TEXT_WEIGHT times over options). A sorted vocabulary answers prefix
+    terms ("trig*") by bisecting instead of scanning.
+    """
+
+    def __init__(self, bank):
+        self.bank_loads = bank.loads
+        self.ids = []     # doc -> question id
+        self.topics = []  # doc -> topic
+        self.levels = []  # doc -> level
+        weights = []      # doc -> Counter(token -> weight)
+        seen = set()
+        for topic in bank.topics():
+            for level, pool in (bank.topic_levels(topic) or {}).items():
+                for q in pool:
+                    qid = q.get("id")
+                    if qid in seen:
+                        continue
+                    seen.add(qid)
+                    counts = Counter()
+                    for token in tokenize(q.get("question", "")):
+                        counts[token] += TEXT_WEIGHT
+                    for value in (q.get("options") or {}).values():
+                        counts.update(tokenize(value))
+                    self.ids.append(qid)
+                    self.topics.append(topic)
+                    self.levels.append(level)
+                    weights.append(counts)
+
+        lengths = [sum(counts.values()) for counts in weights]
+        avg_length = sum(lengths) / len(lengths) if lengths else 1.0
+        doc_freq = Counter(token for counts in weights for token in counts)
+        n_docs = len(weights)
+        self.postings = {}
+        for doc, counts in enumerate(weights):
+            norm = K1 * (1 - B + B * lengths[doc] / avg_length)
+            for token, weight in counts.items():
+                idf = math.log(1 + (n_docs - doc_freq[token] + 0.5) / (doc_freq[token] + 0.5))
+                self.postings.setdefault(token, []).append((doc, idf * weight * (K1 + 1) / (weight + norm)))
+        self.vocabulary = sorted(self.postings)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _term_scores(self, term):
+        """{doc: score} for one query term; 'abc*' matches every token starting with abc"""
+        if term.endswith("*"):
+            prefix = term[:-1]
+            scores = {}
+            i = bisect.bisect_left(self.vocabulary, prefix)
+            while i < len(self.vocabulary) and self.vocabulary[i].startswith(prefix):
+                for doc, score in self.postings[self.vocabulary[i]]:
+                    # A doc matching several expansions counts its best one
+                    if score > scores.get(doc, 0.0):
+                        scores[doc] = score
+                i += 1
+            return scores
+        return dict(self.postings.get(term, ()))
+
+    def search(self, query, topic=None, level=None, offset=0, limit=20):
+        """
+        Every query term must match (AND). Returns (total, [(question id, score)]
+        for the requested page, facets) where facets counts the matches per
+        topic and level before the topic/level filters are applied.
+        """
+        terms = []
+        for raw in str(query).lower().split():
+            if raw.endswith("*"):
+                # Keep a one-letter prefix ("h*"), which tokenize() would drop
+                words = TOKEN.findall(raw)
+                terms.extend(tokenize(" ".join(words[:-1])) + [words[-1] + "*"] if words else [])
+            else:
+                terms.extend(tokenize(raw))
+        if not terms:
+            return 0, [], {"topic": {}, "level": {}}
+
+        # Intersect starting from the rarest term
+        term_scores = sorted((self._term_scores(term) for term in terms), key=len)
+        scores = term_scores[0]
+        for other in term_scores[1:]:
+            scores = {doc: score + other[doc] for doc, score in scores.items() if doc in other}
+            if not scores:
+                break
+
+        facets = {"topic": Counter(self.topics[doc] for doc in scores),
+                  "level": Counter(self.levels[doc] for doc in scores)}
+        matches = [(doc, score) for doc, score in scores.items()
+                   if (topic is None or self.topics[doc] == topic) and (level is None or self.levels[doc] == level)]
+        matches.sort(key=lambda item: (-item[1], item[0]))
+        page = [(self.ids[doc], round(score, 4)) for doc, score in matches[offset:offset + limit]]
+        return len(matches), page, {name: dict(counts) for name, counts in facets.items()}
+
@@ -1,31 +1,40 @@
-import json
+import functools
 import random
-import os
 import math
 
+import numpy as np
+
+try:
+    from . import question_bank
+    from . import question_batch
+    from . import question_keys
+    from . import question_pool
+except ImportError:
+    import question_bank
+    import question_batch
+    import question_keys
+    import question_pool
+
 # ---------- Load Questions from File ----------
+QUESTIONS_FILE = 'real_numbers_mcqs_by_level.json'
+
 def load_mcqs_by_level():
-    file_path = os.path.join(os.path.dirname(__file__), '..', 'pyqs', 'real_numbers_mcqs_by_level.json')
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading Real Numbers MCQ: {e}")
-        return {"easy": [], "medium": [], "hard": []}
+    """Return MCQs by level from the shared in-memory question bank"""
+    return question_bank.get_bank().levels(QUESTIONS_FILE)
 
 # ---------- Generate Dynamic Questions ----------
-def generate_easy_question():
+QUESTION_TYPES = {
+    "easy": ("square_root", "cube_root", "power"),
+    "medium": ("irrational_approximation", "decimal_to_fraction", "scientific_notation"),
+    "hard": ("complex_irrational", "logarithm", "exponential"),
+}
+
+def generate_easy_question(rng=random, q_type=None):
     """Generate easy real numbers questions"""
-    question_types = [
-        "square_root",
-        "cube_root", 
-        "power"
-    ]
-    
-    q_type = random.choice(question_types)
+    q_type = q_type or rng.choice(QUESTION_TYPES["easy"])
     
     if q_type == "square_root":
-        num = random.choice([4, 9, 16, 25, 36, 49, 64, 81, 100])
+        num = rng.choice([4, 9, 16, 25, 36, 49, 64, 81, 100])
         answer = int(math.sqrt(num))
         question = f"What is the square root of {num}?"
         options = {
@@ -41,7 +50,7 @@ def generate_easy_question():
         }
     
     elif q_type == "cube_root":
-        num = random.choice([8, 27, 64, 125, 216, 343, 512, 729])
+        num = rng.choice([8, 27, 64, 125, 216, 343, 512, 729])
         answer = int(round(num ** (1/3)))
         question = f"Find the cube root of {num}"
         options = {
@@ -57,8 +66,8 @@ def generate_easy_question():
         }
     
     else:  # power
-        base = random.randint(2, 5)
-        exponent = random.randint(2, 6)
+        base = rng.randint(2, 5)
+        exponent = rng.randint(2, 6)
         answer = base ** exponent
         question = f"What is {base} to the power of {exponent}?"
         options = {
@@ -73,18 +82,12 @@ def generate_easy_question():
             "answer": "A"
         }
 
-def generate_medium_question():
+def generate_medium_question(rng=random, q_type=None):
     """Generate medium real numbers questions"""
-    question_types = [
-        "irrational_approximation",
-        "decimal_to_fraction",
-        "scientific_notation"
-    ]
-    
-    q_type = random.choice(question_types)
+    q_type = q_type or rng.choice(QUESTION_TYPES["medium"])
     
     if q_type == "irrational_approximation":
-        num = random.choice([2, 3, 5, 7, 11])
+        num = rng.choice([2, 3, 5, 7, 11])
         answer = round(math.sqrt(num), 2)
         question = f"Approximate √{num} to 2 decimal places"
         options = {
@@ -102,7 +105,7 @@ def generate_medium_question():
     elif q_type == "decimal_to_fraction":
         # Simple fractions like 0.5 = 1/2
         fractions = [(0.5, "1/2"), (0.25, "1/4"), (0.75, "3/4"), (0.2, "1/5"), (0.4, "2/5")]
-        decimal, fraction = random.choice(fractions)
+        decimal, fraction = rng.choice(fractions)
         question = f"Convert {decimal} to a fraction"
         options = {
             "A": fraction,
@@ -117,8 +120,8 @@ def generate_medium_question():
         }
     
     else:  # scientific_notation
-        num = random.randint(100, 999)
-        power = random.randint(2, 5)
+        num = rng.randint(100, 999)
+        power = rng.randint(2, 5)
         answer = num * (10 ** power)
         question = f"Write {answer} in scientific notation"
         options = {
@@ -133,20 +136,14 @@ def generate_medium_question():
             "answer": "A"
         }
 
-def generate_hard_question():
+def generate_hard_question(rng=random, q_type=None):
     """Generate hard real numbers questions"""
-    question_types = [
-        "complex_irrational",
-        "logarithm",
-        "exponential"
-    ]
-    
-    q_type = random.choice(question_types)
+    q_type = q_type or rng.choice(QUESTION_TYPES["hard"])
     
     if q_type == "complex_irrational":
         # Questions about π, e, etc.
         constants = [("π", 3.14159), ("e", 2.71828)]
-        constant, value = random.choice(constants)
+        constant, value = rng.choice(constants)
         question = f"What is the approximate value of {constant}?"
         options = {
             "A": str(value),
@@ -161,8 +158,8 @@ def generate_hard_question():
         }
     
     elif q_type == "logarithm":
-        base = random.randint(2, 5)
-        num = base ** random.randint(2, 4)
+        base = rng.randint(2, 5)
+        num = base ** rng.randint(2, 4)
         answer = int(math.log(num, base))
         question = f"Find log_{base}({num})"
         options = {
@@ -178,8 +175,8 @@ def generate_hard_question():
         }
     
     else:  # exponential
-        base = random.randint(2, 4)
-        exponent = random.randint(3, 6)
+        base = rng.randint(2, 4)
+        exponent = rng.randint(3, 6)
         answer = base ** exponent
         question = f"Calculate {base}^{exponent}"
         options = {
@@ -194,31 +191,113 @@ def generate_hard_question():
             "answer": "A"
         }
 
+# ---------- Generate Dynamic Questions in Bulk ----------
+SQUARES = [4, 9, 16, 25, 36, 49, 64, 81, 100]
+CUBES = [8, 27, 64, 125, 216, 343, 512, 729]
+FRACTIONS = [(0.5, "1/2"), (0.25, "1/4"), (0.75, "3/4"), (0.2, "1/5"), (0.4, "2/5")]
+CONSTANTS = [("π", 3.14159), ("e", 2.71828)]
+
+def generate_easy_questions(count, rng):
+    """Generate a batch of easy real numbers questions"""
+    square_idx, cube_idx, power_idx = question_batch.split_types(rng, count, 3)
+
+    squares = rng.choice(SQUARES, square_idx.size)
+    square_roots = np.sqrt(squares).astype(int).tolist()
+
+    cubes = rng.choice(CUBES, cube_idx.size)
+    cube_roots = np.rint(np.cbrt(cubes)).astype(int).tolist()
+
+    bases = question_batch.randint(rng, 2, 5, power_idx.size)
+    exponents = question_batch.randint(rng, 2, 6, power_idx.size)
+    powers = (bases ** exponents).tolist()
+
+    return question_batch.assemble(count, [
+        (square_idx, [f"What is the square root of {n}?" for n in squares.tolist()],
+         question_batch.offset_options(square_roots)),
+        (cube_idx, [f"Find the cube root of {n}" for n in cubes.tolist()],
+         question_batch.offset_options(cube_roots)),
+        (power_idx, [f"What is {b} to the power of {e}?" for b, e in zip(bases.tolist(), exponents.tolist())],
+         question_batch.offset_options(powers)),
+    ])
+
+def generate_medium_questions(count, rng):
+    """Generate a batch of medium real numbers questions"""
+    approx_idx, fraction_idx, sci_idx = question_batch.split_types(rng, count, 3)
+
+    nums = rng.choice([2, 3, 5, 7, 11], approx_idx.size).tolist()
+    approximations = [round(math.sqrt(n), 2) for n in nums]
+
+    fractions = [FRACTIONS[i] for i in rng.integers(0, len(FRACTIONS), fraction_idx.size).tolist()]
+
+    mantissas = question_batch.randint(rng, 100, 999, sci_idx.size).tolist()
+    exponents = question_batch.randint(rng, 2, 5, sci_idx.size).tolist()
+
+    return question_batch.assemble(count, [
+        (approx_idx, [f"Approximate √{n} to 2 decimal places" for n in nums],
+         question_batch.offset_options(approximations, deltas=(0.01, -0.01, 0.02))),
+        (fraction_idx, [f"Convert {decimal} to a fraction" for decimal, _ in fractions],
+         [{"A": fraction, "B": "1/3", "C": "2/3", "D": "1/6"} for _, fraction in fractions]),
+        (sci_idx, [f"Write {m * 10 ** p} in scientific notation" for m, p in zip(mantissas, exponents)],
+         [{"A": f"{m} × 10^{p}", "B": f"{m} × 10^{p + 1}", "C": f"{m} × 10^{p - 1}", "D": f"{m + 1} × 10^{p}"}
+          for m, p in zip(mantissas, exponents)]),
+    ])
+
+def generate_hard_questions(count, rng):
+    """Generate a batch of hard real numbers questions"""
+    constant_idx, log_idx, exp_idx = question_batch.split_types(rng, count, 3)
+
+    constants = [CONSTANTS[i] for i in rng.integers(0, len(CONSTANTS), constant_idx.size).tolist()]
+
+    log_bases = question_batch.randint(rng, 2, 5, log_idx.size)
+    log_answers = question_batch.randint(rng, 2, 4, log_idx.size)
+    log_nums = (log_bases ** log_answers).tolist()
+
+    exp_bases = question_batch.randint(rng, 2, 4, exp_idx.size)
+    exp_powers = question_batch.randint(rng, 3, 6, exp_idx.size)
+    exp_values = (exp_bases ** exp_powers).tolist()
+
+    return question_batch.assemble(count, [
+        (constant_idx, [f"What is the approximate value of {name}?" for name, _ in constants],
+         question_batch.offset_options([value for _, value in constants], deltas=(0.1, -0.1, 0.2))),
+        (log_idx, [f"Find log_{b}({n})" for b, n in zip(log_bases.tolist(), log_nums)],
+         question_batch.offset_options(log_answers.tolist())),
+        (exp_idx, [f"Calculate {b}^{e}" for b, e in zip(exp_bases.tolist(), exp_powers.tolist())],
+         question_batch.offset_options(exp_values)),
+    ])
+
 # ---------- Fetch Random Question from Specific Level ----------
 def get_easy_question():
     mcqs = load_mcqs_by_level().get("easy", [])
     if mcqs:
         return random.choice(mcqs)
     else:
-        return generate_easy_question()
+        return question_pool.pop("real_numbers", "easy")
 
 def get_medium_question():
     mcqs = load_mcqs_by_level().get("medium", [])
     if mcqs:
         return random.choice(mcqs)
     else:
-        return generate_medium_question()
+        return question_pool.pop("real_numbers", "medium")
 
 def get_hard_question():
     mcqs = load_mcqs_by_level().get("hard", [])
     if mcqs:
         return random.choice(mcqs)
     else:
-        return generate_hard_question()
+        return question_pool.pop("real_numbers", "hard")
 
 # ---------- Unified Interface ----------
-def get_question(level="easy"):
+def get_question(level="easy", mode="static"):
+    """
+    mode: 'static' => pick from JSON (generated when a level has none)
+          'dynamic' => a pre-generated question from the question pool
+    """
     level = level.lower()
+    if mode == "dynamic":
+        return question_pool.pop("real_numbers", level)
+    elif mode != "static":
+        return {"error": "Invalid mode. Use 'static' or 'dynamic'."}
     if level == "easy":
         return get_easy_question()
     elif level == "medium":
@@ -228,6 +307,66 @@ def get_question(level="easy"):
     else:
         return {"error": "Invalid level. Use 'easy', 'medium', or 'hard'."}
 
+# ---------- Batch Interface ----------
+BATCH_GENERATORS = {
+    "easy": generate_easy_questions,
+    "medium": generate_medium_questions,
+    "hard": generate_hard_questions,
+}
+
+SINGLE_GENERATORS = {
+    "easy": generate_easy_question,
+    "medium": generate_medium_question,
+    "hard": generate_hard_question,
+}
+
+def generate_batch(level="easy", count=1, seed=None):
+    """
+    Generate count unkeyed questions in one NumPy pass (bulk exports, benchmarks).
+    They carry no key, so the API never serves them: use generate_questions.
+    """
+    level = level.lower()
+    generator = BATCH_GENERATORS.get(level)
+    if generator is None:
+        return {"error": "Invalid level. Use 'easy', 'medium', or 'hard'."}
+    return generator(count, question_batch.make_rng(seed))
+
+def generate_questions(level="easy", count=1, seed=None):
+    """
+    count keyed dynamic questions, whatever the batch size: each carries the key that
+    regenerates it (question_keys), so it can be graded and logged. Unseeded batches
+    come from the question pool; the same seed always yields the same questions.
+    """
+    level = level.lower()
+    if level not in BATCH_GENERATORS:
+        return {"error": "Invalid level. Use 'easy', 'medium', or 'hard'."}
+    if seed is None:
+        return question_pool.pop_many("real_numbers", level, count)
+    return question_keys.generate_many("real_numbers", level, count, seed)
+
+def generate_keyed_question(level, q_type, rng):
+    """One question of a given type drawn from rng (see question_keys)"""
+    return SINGLE_GENERATORS[level](rng, q_type)
+
+question_keys.register("real_numbers", generate_keyed_question, QUESTION_TYPES)
+
+# Keep pre-generated keyed questions ready for the request path
+question_pool.register("real_numbers", functools.partial(question_keys.generate_many, "real_numbers"))
+
+def get_questions(level="easy", count=1, seed=None, mode="static"):
+    """Batch version of get_question: static MCQs when available, otherwise generated"""
+    level = level.lower()
+    if level not in BATCH_GENERATORS:
+        return {"error": "Invalid level. Use 'easy', 'medium', or 'hard'."}
+    if mode == "dynamic":
+        return generate_questions(level, count, seed)
+    elif mode != "static":
+        return {"error": "Invalid mode. Use 'static' or 'dynamic'."}
+    mcqs = load_mcqs_by_level().get(level, [])
+    if mcqs:
+        return question_batch.sample_static(mcqs, count, question_batch.make_rng(seed))
+    return generate_questions(level, count, seed)
+
 # ---------- CLI Testing ----------
 if __name__ == "__main__":
     for level in ["easy", "medium", "hard"]:
@@ -0,0 +1,64 @@
+import os
+import random
+
+# ---------- Configuration ----------
+# Random draws per requested question before falling back to listing the unseen positions
+REJECTION_DRAWS = int(os.getenv('SEEN_SET_REJECTION_DRAWS', '4'))
+
+
+# ---------- Bitsets ----------
+# A seen-set is bytes with bit i (byte i // 8, bit i % 8) set once pool[i] of a topic/level
+# pool has been served. Pools only grow (new shards append), so positions stay stable and a
+# pool of n questions costs ceil(n / 8) bytes per user.
+def nbytes(pool_size):
+    return (pool_size + 7) // 8
+
+
+def is_seen(bits, position):
+    byte = position >> 3
+    return byte < len(bits) and (bits[byte] >> (position & 7)) & 1
+
+
+def mark(bits, position):
+    bits[position >> 3] |= 1 << (position & 7)
+
+
+# ---------- Sampling ----------
+def sample_unseen(candidates, pool_size, seen=b"", k=5, rng=random):
+    """
+    Draw up to k distinct positions from `candidates` (the pool positions quizzes
+    may use), preferring ones not set in `seen`. Random probing finds unseen
+    positions in O(k) while most of the pool is unseen; only a nearly exhausted
+    set lists its unseen positions. Once every candidate has been seen the set
+    starts a new cycle, so the answer is (positions, updated seen bytes).
+    """
+    n = len(candidates)
+    k = min(k, n)
+    bits = bytearray(seen[:nbytes(pool_size)])
+    bits.extend(bytes(nbytes(pool_size) - len(bits)))
+
+    picked = []
+    chosen = set()
+    for _ in range(REJECTION_DRAWS * k):
+        if len(picked) == k:
+            break
+        position = candidates[rng.randrange(n)]
+        if position not in chosen and not is_seen(bits, position):
+            chosen.add(position)
+            picked.append(position)
+
+    if len(picked) < k:
+        unseen = [p for p in candidates if p not in chosen and not is_seen(bits, p)]
+        extra = rng.sample(unseen, min(k - len(picked), len(unseen)))
+        chosen.update(extra)
+        picked.extend(extra)
+
+    if len(picked) < k:
+        # Exhausted: start a new cycle that already counts this quiz's questions as seen
+        extra = rng.sample([p for p in candidates if p not in chosen], k - len(picked))
+        picked.extend(extra)
+        bits = bytearray(len(bits))
+
+    for position in picked:
+        mark(bits, position)
+    return picked, bytes(bits)
@@ -1,16 +1,25 @@
-import json
+import functools
 import random
-import os
+
+import numpy as np
+
+try:
+    from . import question_bank
+    from . import question_batch
+    from . import question_keys
+    from . import question_pool
+except ImportError:
+    import question_bank
+    import question_batch
+    import question_keys
+    import question_pool
 
 # ---------- Load Questions from File ----------
+QUESTIONS_FILE = 'statistics_mcqs_by_level.json'
+
 def load_mcqs_by_level():
-    file_path = os.path.join(os.path.dirname(__file__), '..', 'pyqs', 'statistics_mcqs_by_level.json')
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading Statistics MCQ: {e}")
-        return {"easy": [], "medium": [], "hard": []}
+    """Return MCQs by level from the shared in-memory question bank"""
+    return question_bank.get_bank().levels(QUESTIONS_FILE)
 
 # ---------- Get Static MCQs ----------
 def get_static_question(level="easy"):
@@ -18,11 +27,18 @@ def get_static_question(level="easy"):
     return random.choice(mcqs) if mcqs else {"error": f"No {level} questions found."}
 
 # ---------- Generate Dynamic Question ----------
-def generate_dynamic_question(level="easy"):
+# One question type per level
+QUESTION_TYPES = {
+    "easy": ("mean",),
+    "medium": ("median",),
+    "hard": ("mode",),
+}
+
+def generate_dynamic_question(level="easy", rng=random):
     level = level.lower()
     
     if level == "easy":
-        nums = random.sample(range(10, 50), 3)
+        nums = rng.sample(range(10, 50), 3)
         mean_val = sum(nums) // 3
         options = {
             "A": str(mean_val),
@@ -38,7 +54,7 @@ def generate_dynamic_question(level="easy"):
     
     elif level == "medium":
         # Median of 5 values
-        values = sorted(random.sample(range(10, 100), 5))
+        values = sorted(rng.sample(range(10, 100), 5))
         median = values[2]
         options = {
             "A": str(median),
@@ -54,9 +70,9 @@ def generate_dynamic_question(level="easy"):
 
     elif level == "hard":
         # Mode from repeated values
-        base = random.randint(10, 20)
+        base = rng.randint(10, 20)
         values = [base] * 3 + [base + 1] * 2 + [base + 2]  # base is mode
-        random.shuffle(values)
+        rng.shuffle(values)
         mode = base
         options = {
             "A": str(mode),
@@ -73,6 +89,64 @@ def generate_dynamic_question(level="easy"):
     else:
         return {"error": "Invalid difficulty level."}
 
+# ---------- Generate Dynamic Questions in Bulk ----------
+def _distinct_rows(rng, count, low, high, size):
+    """count rows of `size` distinct integers from range(low, high), like random.sample per row"""
+    return rng.random((count, high - low)).argsort(axis=1)[:, :size] + low
+
+def generate_dynamic_batch(level="easy", count=1, seed=None):
+    """
+    Generate count unkeyed questions in one NumPy pass (bulk exports, benchmarks).
+    They carry no key, so the API never serves them: use generate_dynamic_questions.
+    """
+    level = level.lower()
+    if level not in ("easy", "medium", "hard"):
+        return {"error": "Invalid difficulty level."}
+    rng = question_batch.make_rng(seed)
+
+    if level == "easy":
+        nums = _distinct_rows(rng, count, 10, 50, 3)
+        means = (nums.sum(axis=1) // 3).tolist()
+        texts = [f"What is the mean of {a}, {b}, {c}?" for a, b, c in nums.tolist()]
+        options = question_batch.offset_options(means, deltas=(5, -5, 10))
+
+    elif level == "medium":
+        # Median of 5 values
+        values = np.sort(_distinct_rows(rng, count, 10, 100, 5), axis=1).tolist()
+        texts = [f"What is the median of these values: {', '.join(map(str, row))}?" for row in values]
+        options = [{"A": str(row[2]), "B": str(row[1]), "C": str(row[3]), "D": str(row[2] + 5)} for row in values]
+
+    else:
+        # Mode from repeated values
+        bases = question_batch.randint(rng, 10, 20, count)
+        offsets = rng.permuted(np.tile([0, 0, 0, 1, 1, 2], (count, 1)), axis=1)
+        values = (offsets + bases[:, None]).tolist()
+        texts = [f"Find the mode of the dataset: {', '.join(map(str, row))}" for row in values]
+        options = question_batch.offset_options(bases.tolist())
+
+    return [{"question": text, "options": opts, "answer": "A"} for text, opts in zip(texts, options)]
+
+def generate_keyed_question(level, q_type, rng):
+    """One question drawn from rng (see question_keys); each level has a single type"""
+    return generate_dynamic_question(level, rng)
+
+question_keys.register("statistics", generate_keyed_question, QUESTION_TYPES)
+
+# Keep pre-generated keyed questions ready for the request path
+question_pool.register("statistics", functools.partial(question_keys.generate_many, "statistics"))
+
+def generate_dynamic_questions(level="easy", count=1, seed=None):
+    """
+    count keyed dynamic questions, whatever the batch size (see question_keys).
+    Unseeded batches come from the question pool; the same seed always yields the same questions.
+    """
+    level = level.lower()
+    if level not in ("easy", "medium", "hard"):
+        return {"error": "Invalid difficulty level."}
+    if seed is None:
+        return question_pool.pop_many("statistics", level, count)
+    return question_keys.generate_many("statistics", level, count, seed)
+
 # ---------- Main Unified Interface ----------
 def get_question(level="easy", mode="static"):
     """
@@ -82,7 +156,20 @@ def get_question(level="easy", mode="static"):
     if mode == "static":
         return get_static_question(level)
     elif mode == "dynamic":
-        return generate_dynamic_question(level)
+        return question_pool.pop("statistics", level)
+    else:
+        return {"error": "Invalid mode. Use 'static' or 'dynamic'."}
+
+# ---------- Batch Interface ----------
+def get_questions(level="easy", count=1, seed=None, mode="static"):
+    """Batch version of get_question"""
+    if mode == "static":
+        mcqs = load_mcqs_by_level().get(level.lower(), [])
+        if not mcqs:
+            return {"error": f"No {level} questions found."}
+        return question_batch.sample_static(mcqs, count, question_batch.make_rng(seed))
+    elif mode == "dynamic":
+        return generate_dynamic_questions(level, count, seed)
     else:
         return {"error": "Invalid mode. Use 'static' or 'dynamic'."}
 
@@ -1,31 +1,40 @@
-import json
+import functools
 import random
-import os
 import math
 
+import numpy as np
+
+try:
+    from . import question_bank
+    from . import question_batch
+    from . import question_keys
+    from . import question_pool
+except ImportError:
+    import question_bank
+    import question_batch
+    import question_keys
+    import question_pool
+
 # ---------- Load MCQs from JSON ----------
+QUESTIONS_FILE = 'surface_areas_volumes_mcqs_by_level.json'
+
 def load_mcqs_by_level():
-    file_path = os.path.join(os.path.dirname(__file__), '..', 'pyqs', 'surface_areas_volumes_mcqs_by_level.json')
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading MCQs: {e}")
-        return {"easy": [], "medium": [], "hard": []}
+    """Return MCQs by level from the shared in-memory question bank"""
+    return question_bank.get_bank().levels(QUESTIONS_FILE)
 
 # ---------- Generate Dynamic Questions ----------
-def generate_easy_question():
+QUESTION_TYPES = {
+    "easy": ("cube_surface_area", "cube_volume", "sphere_surface_area"),
+    "medium": ("cylinder_volume", "cone_surface_area", "pyramid_volume"),
+    "hard": ("torus_volume", "ellipsoid_volume", "truncated_cone"),
+}
+
+def generate_easy_question(rng=random, q_type=None):
     """Generate easy surface area and volume questions"""
-    question_types = [
-        "cube_surface_area",
-        "cube_volume", 
-        "sphere_surface_area"
-    ]
-    
-    q_type = random.choice(question_types)
+    q_type = q_type or rng.choice(QUESTION_TYPES["easy"])
     
     if q_type == "cube_surface_area":
-        side = random.randint(3, 8)
+        side = rng.randint(3, 8)
         surface_area = 6 * side * side
         question = f"What is the surface area of a cube with side {side}?"
         options = {
@@ -41,7 +50,7 @@ def generate_easy_question():
         }
     
     elif q_type == "cube_volume":
-        side = random.randint(3, 8)
+        side = rng.randint(3, 8)
         volume = side ** 3
         question = f"Find the volume of a cube with side {side}"
         options = {
@@ -57,7 +66,7 @@ def generate_easy_question():
         }
     
     else:  # sphere_surface_area
-        radius = random.randint(2, 6)
+        radius = rng.randint(2, 6)
         surface_area = 4 * math.pi * radius * radius
         question = f"What is the surface area of a sphere with radius {radius}?"
         options = {
@@ -72,19 +81,13 @@ def generate_easy_question():
             "answer": "A"
         }
 
-def generate_medium_question():
+def generate_medium_question(rng=random, q_type=None):
     """Generate medium surface area and volume questions"""
-    question_types = [
-        "cylinder_volume",
-        "cone_surface_area",
-        "pyramid_volume"
-    ]
-    
-    q_type = random.choice(question_types)
+    q_type = q_type or rng.choice(QUESTION_TYPES["medium"])
     
     if q_type == "cylinder_volume":
-        radius = random.randint(2, 5)
-        height = random.randint(4, 8)
+        radius = rng.randint(2, 5)
+        height = rng.randint(4, 8)
         volume = math.pi * radius * radius * height
         question = f"Find the volume of a cylinder with radius {radius} and height {height}"
         options = {
@@ -100,8 +103,8 @@ def generate_medium_question():
         }
     
     elif q_type == "cone_surface_area":
-        radius = random.randint(2, 5)
-        height = random.randint(3, 7)
+        radius = rng.randint(2, 5)
+        height = rng.randint(3, 7)
         slant_height = math.sqrt(radius**2 + height**2)
         surface_area = math.pi * radius * (radius + slant_height)
         question = f"What is the surface area of a cone with radius {radius} and height {height}?"
@@ -118,8 +121,8 @@ def generate_medium_question():
         }
     
     else:  # pyramid_volume
-        base = random.randint(3, 6)
-        height = random.randint(4, 8)
+        base = rng.randint(3, 6)
+        height = rng.randint(4, 8)
         volume = (1/3) * base * base * height
         question = f"Find the volume of a pyramid with base {base} and height {height}"
         options = {
@@ -134,19 +137,13 @@ def generate_medium_question():
             "answer": "A"
         }
 
-def generate_hard_question():
+def generate_hard_question(rng=random, q_type=None):
     """Generate hard surface area and volume questions"""
-    question_types = [
-        "torus_volume",
-        "ellipsoid_volume",
-        "truncated_cone"
-    ]
-    
-    q_type = random.choice(question_types)
+    q_type = q_type or rng.choice(QUESTION_TYPES["hard"])
     
     if q_type == "torus_volume":
-        major_radius = random.randint(4, 8)
-        minor_radius = random.randint(1, 3)
+        major_radius = rng.randint(4, 8)
+        minor_radius = rng.randint(1, 3)
         volume = 2 * math.pi * math.pi * major_radius * minor_radius * minor_radius
         question = f"Find the volume of a torus with major radius {major_radius} and minor radius {minor_radius}"
         options = {
@@ -162,7 +159,7 @@ def generate_hard_question():
         }
     
     elif q_type == "ellipsoid_volume":
-        a, b, c = random.randint(2, 4), random.randint(3, 5), random.randint(4, 6)
+        a, b, c = rng.randint(2, 4), rng.randint(3, 5), rng.randint(4, 6)
         volume = (4/3) * math.pi * a * b * c
         question = f"Find the volume of an ellipsoid with axes {a}, {b}, {c}"
         options = {
@@ -178,7 +175,7 @@ def generate_hard_question():
         }
     
     else:  # truncated_cone
-        r1, r2, h = random.randint(2, 4), random.randint(1, 2), random.randint(3, 6)
+        r1, r2, h = rng.randint(2, 4), rng.randint(1, 2), rng.randint(3, 6)
         volume = (1/3) * math.pi * h * (r1**2 + r1*r2 + r2**2)
         question = f"Find the volume of a truncated cone with radii {r1}, {r2} and height {h}"
         options = {
@@ -193,31 +190,110 @@ def generate_hard_question():
             "answer": "A"
         }
 
+# ---------- Generate Dynamic Questions in Bulk ----------
+def generate_easy_questions(count, rng):
+    """Generate a batch of easy surface area and volume questions"""
+    cube_sa_idx, cube_vol_idx, sphere_idx = question_batch.split_types(rng, count, 3)
+
+    sa_sides = question_batch.randint(rng, 3, 8, cube_sa_idx.size)
+    vol_sides = question_batch.randint(rng, 3, 8, cube_vol_idx.size)
+    radii = question_batch.randint(rng, 2, 6, sphere_idx.size)
+
+    return question_batch.assemble(count, [
+        (cube_sa_idx, [f"What is the surface area of a cube with side {side}?" for side in sa_sides.tolist()],
+         question_batch.offset_options((6 * sa_sides * sa_sides).tolist())),
+        (cube_vol_idx, [f"Find the volume of a cube with side {side}" for side in vol_sides.tolist()],
+         question_batch.offset_options((vol_sides ** 3).tolist())),
+        (sphere_idx, [f"What is the surface area of a sphere with radius {r}?" for r in radii.tolist()],
+         question_batch.offset_options((4 * math.pi * radii * radii).tolist(), ndigits=1)),
+    ])
+
+def generate_medium_questions(count, rng):
+    """Generate a batch of medium surface area and volume questions"""
+    cylinder_idx, cone_idx, pyramid_idx = question_batch.split_types(rng, count, 3)
+
+    cyl_r = question_batch.randint(rng, 2, 5, cylinder_idx.size)
+    cyl_h = question_batch.randint(rng, 4, 8, cylinder_idx.size)
+
+    cone_r = question_batch.randint(rng, 2, 5, cone_idx.size)
+    cone_h = question_batch.randint(rng, 3, 7, cone_idx.size)
+    slant = np.sqrt(cone_r ** 2 + cone_h ** 2)
+
+    pyr_base = question_batch.randint(rng, 3, 6, pyramid_idx.size)
+    pyr_h = question_batch.randint(rng, 4, 8, pyramid_idx.size)
+
+    return question_batch.assemble(count, [
+        (cylinder_idx, [f"Find the volume of a cylinder with radius {r} and height {h}"
+                        for r, h in zip(cyl_r.tolist(), cyl_h.tolist())],
+         question_batch.offset_options((math.pi * cyl_r * cyl_r * cyl_h).tolist(), ndigits=2)),
+        (cone_idx, [f"What is the surface area of a cone with radius {r} and height {h}?"
+                    for r, h in zip(cone_r.tolist(), cone_h.tolist())],
+         question_batch.offset_options((math.pi * cone_r * (cone_r + slant)).tolist(), ndigits=1)),
+        (pyramid_idx, [f"Find the volume of a pyramid with base {b} and height {h}"
+                       for b, h in zip(pyr_base.tolist(), pyr_h.tolist())],
+         question_batch.offset_options(((1/3) * pyr_base * pyr_base * pyr_h).tolist(), ndigits=2)),
+    ])
+
+def generate_hard_questions(count, rng):
+    """Generate a batch of hard surface area and volume questions"""
+    torus_idx, ellipsoid_idx, frustum_idx = question_batch.split_types(rng, count, 3)
+
+    major = question_batch.randint(rng, 4, 8, torus_idx.size)
+    minor = question_batch.randint(rng, 1, 3, torus_idx.size)
+
+    a = question_batch.randint(rng, 2, 4, ellipsoid_idx.size)
+    b = question_batch.randint(rng, 3, 5, ellipsoid_idx.size)
+    c = question_batch.randint(rng, 4, 6, ellipsoid_idx.size)
+
+    r1 = question_batch.randint(rng, 2, 4, frustum_idx.size)
+    r2 = question_batch.randint(rng, 1, 2, frustum_idx.size)
+    h = question_batch.randint(rng, 3, 6, frustum_idx.size)
+
+    return question_batch.assemble(count, [
+        (torus_idx, [f"Find the volume of a torus with major radius {R} and minor radius {r}"
+                     for R, r in zip(major.tolist(), minor.tolist())],
+         question_batch.offset_options((2 * math.pi * math.pi * major * minor * minor).tolist(), ndigits=2)),
+        (ellipsoid_idx, [f"Find the volume of an ellipsoid with axes {x}, {y}, {z}"
+                         for x, y, z in zip(a.tolist(), b.tolist(), c.tolist())],
+         question_batch.offset_options(((4/3) * math.pi * a * b * c).tolist(), ndigits=2)),
+        (frustum_idx, [f"Find the volume of a truncated cone with radii {x}, {y} and height {z}"
+                       for x, y, z in zip(r1.tolist(), r2.tolist(), h.tolist())],
+         question_batch.offset_options(((1/3) * math.pi * h * (r1**2 + r1*r2 + r2**2)).tolist(), ndigits=2)),
+    ])
+
 # ---------- Pick Random MCQ ----------
 def get_easy_question():
     mcqs = load_mcqs_by_level().get("easy", [])
     if mcqs:
         return random.choice(mcqs)
     else:
-        return generate_easy_question()
+        return question_pool.pop("surface_areas_volumes", "easy")
 
 def get_medium_question():
     mcqs = load_mcqs_by_level().get("medium", [])
     if mcqs:
         return random.choice(mcqs)
     else:
-        return generate_medium_question()
+        return question_pool.pop("surface_areas_volumes", "medium")
 
 def get_hard_question():
     mcqs = load_mcqs_by_level().get("hard", [])
     if mcqs:
         return random.choice(mcqs)
     else:
-        return generate_hard_question()
+        return question_pool.pop("surface_areas_volumes", "hard")
 
 # ---------- Unified Interface ----------
-def get_question(level="easy"):
+def get_question(level="easy", mode="static"):
+    """
+    mode: 'static' => pick from JSON (generated when a level has none)
+          'dynamic' => a pre-generated question from the question pool
+    """
     level = level.lower()
+    if mode == "dynamic":
+        return question_pool.pop("surface_areas_volumes", level)
+    elif mode != "static":
+        return {"error": "Invalid mode. Use 'static' or 'dynamic'."}
     if level == "easy":
         return get_easy_question()
     elif level == "medium":
@@ -227,6 +303,66 @@ def get_question(level="easy"):
     else:
         return {"error": "Invalid level. Use 'easy', 'medium', or 'hard'."}
 
+# ---------- Batch Interface ----------
+BATCH_GENERATORS = {
+    "easy": generate_easy_questions,
+    "medium": generate_medium_questions,
+    "hard": generate_hard_questions,
+}
+
+SINGLE_GENERATORS = {
+    "easy": generate_easy_question,
+    "medium": generate_medium_question,
+    "hard": generate_hard_question,
+}
+
+def generate_batch(level="easy", count=1, seed=None):
+    """
+    Generate count unkeyed questions in one NumPy pass (bulk exports, benchmarks).
+    They carry no key, so the API never serves them: use generate_questions.
+    """
+    level = level.lower()
+    generator = BATCH_GENERATORS.get(level)
+    if generator is None:
+        return {"error": "Invalid level. Use 'easy', 'medium', or 'hard'."}
+    return generator(count, question_batch.make_rng(seed))
+
+def generate_questions(level="easy", count=1, seed=None):
+    """
+    count keyed dynamic questions, whatever the batch size: each carries the key that
+    regenerates it (question_keys), so it can be graded and logged. Unseeded batches
+    come from the question pool; the same seed always yields the same questions.
+    """
+    level = level.lower()
+    if level not in BATCH_GENERATORS:
+        return {"error": "Invalid level. Use 'easy', 'medium', or 'hard'."}
+    if seed is None:
+        return question_pool.pop_many("surface_areas_volumes", level, count)
+    return question_keys.generate_many("surface_areas_volumes", level, count, seed)
+
+def generate_keyed_question(level, q_type, rng):
+    """One question of a given type drawn from rng (see question_keys)"""
+    return SINGLE_GENERATORS[level](rng, q_type)
+
+question_keys.register("surface_areas_volumes", generate_keyed_question, QUESTION_TYPES)
+
+# Keep pre-generated keyed questions ready for the request path
+question_pool.register("surface_areas_volumes", functools.partial(question_keys.generate_many, "surface_areas_volumes"))
+
+def get_questions(level="easy", count=1, seed=None, mode="static"):
+    """Batch version of get_question: static MCQs when available, otherwise generated"""
+    level = level.lower()
+    if level not in BATCH_GENERATORS:
+        return {"error": "Invalid level. Use 'easy', 'medium', or 'hard'."}
+    if mode == "dynamic":
+        return generate_questions(level, count, seed)
+    elif mode != "static":
+        return {"error": "Invalid mode. Use 'static' or 'dynamic'."}
+    mcqs = load_mcqs_by_level().get(level, [])
+    if mcqs:
+        return question_batch.sample_static(mcqs, count, question_batch.make_rng(seed))
+    return generate_questions(level, count, seed)
+
 # ---------- CLI Test (optional) ----------
 if __name__ == "__main__":
     for level in ["easy", "medium", "hard"]:
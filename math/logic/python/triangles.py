@@ -1,32 +1,39 @@
-import json
+import functools
 import random
-import os
 import math
 
+try:
+    from . import question_bank
+    from . import question_batch
+    from . import question_keys
+    from . import question_pool
+except ImportError:
+    import question_bank
+    import question_batch
+    import question_keys
+    import question_pool
+
 # ---------- Load Questions from File ----------
+QUESTIONS_FILE = 'triangle_mcqs_by_level.json'
+
 def load_mcqs_by_level():
-    file_path = os.path.join(os.path.dirname(__file__), '..', 'pyqs','triangle_mcqs_by_level.json')
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading MCQs: {e}")
-        return {"easy": [], "medium": [], "hard": []}
+    """Return MCQs by level from the shared in-memory question bank"""
+    return question_bank.get_bank().levels(QUESTIONS_FILE)
 
 # ---------- Generate Dynamic Questions ----------
-def generate_easy_question():
+QUESTION_TYPES = {
+    "easy": ("area_basic", "perimeter", "angles"),
+    "medium": ("heron_formula", "trigonometry_basic", "pythagorean"),
+    "hard": ("law_of_cosines", "trigonometry_advanced", "area_coordinates"),
+}
+
+def generate_easy_question(rng=random, q_type=None):
     """Generate easy triangle questions"""
-    question_types = [
-        "area_basic",
-        "perimeter", 
-        "angles"
-    ]
-    
-    q_type = random.choice(question_types)
+    q_type = q_type or rng.choice(QUESTION_TYPES["easy"])
     
     if q_type == "area_basic":
-        base = random.randint(3, 10)
-        height = random.randint(4, 12)
+        base = rng.randint(3, 10)
+        height = rng.randint(4, 12)
         area = 0.5 * base * height
         question = f"What is the area of a triangle with base {base} and height {height}?"
         options = {
@@ -42,9 +49,9 @@ def generate_easy_question():
         }
     
     elif q_type == "perimeter":
-        a = random.randint(3, 8)
-        b = random.randint(4, 9)
-        c = random.randint(5, 10)
+        a = rng.randint(3, 8)
+        b = rng.randint(4, 9)
+        c = rng.randint(5, 10)
         perimeter = a + b + c
         question = f"Find the perimeter of a triangle with sides {a}, {b}, {c}"
         options = {
@@ -60,8 +67,8 @@ def generate_easy_question():
         }
     
     else:  # angles
-        angle1 = random.randint(30, 60)
-        angle2 = random.randint(30, 60)
+        angle1 = rng.randint(30, 60)
+        angle2 = rng.randint(30, 60)
         angle3 = 180 - angle1 - angle2
         question = f"What is the third angle if two angles are {angle1}° and {angle2}°?"
         options = {
@@ -76,15 +83,9 @@ def generate_easy_question():
             "answer": "A"
         }
 
-def generate_medium_question():
+def generate_medium_question(rng=random, q_type=None):
     """Generate medium triangle questions"""
-    question_types = [
-        "heron_formula",
-        "trigonometry_basic",
-        "pythagorean"
-    ]
-    
-    q_type = random.choice(question_types)
+    q_type = q_type or rng.choice(QUESTION_TYPES["medium"])
     
     if q_type == "heron_formula":
         # Use sides that form a valid triangle
@@ -106,7 +107,7 @@ def generate_medium_question():
     
     elif q_type == "trigonometry_basic":
         angles = [30, 45, 60]
-        angle = random.choice(angles)
+        angle = rng.choice(angles)
         if angle == 30:
             sin_val = 0.5
         elif angle == 45:
@@ -129,7 +130,7 @@ def generate_medium_question():
     else:  # pythagorean
         # Use Pythagorean triple
         triples = [(3, 4, 5), (5, 12, 13), (6, 8, 10)]
-        a, b, c = random.choice(triples)
+        a, b, c = rng.choice(triples)
         question = f"Find the hypotenuse of a right triangle with legs {a} and {b}"
         options = {
             "A": str(c),
@@ -143,15 +144,9 @@ def generate_medium_question():
             "answer": "A"
         }
 
-def generate_hard_question():
+def generate_hard_question(rng=random, q_type=None):
     """Generate hard triangle questions"""
-    question_types = [
-        "law_of_cosines",
-        "trigonometry_advanced",
-        "area_coordinates"
-    ]
-    
-    q_type = random.choice(question_types)
+    q_type = q_type or rng.choice(QUESTION_TYPES["hard"])
     
     if q_type == "law_of_cosines":
         a, b, c = 5, 7, 8
@@ -173,7 +168,7 @@ def generate_hard_question():
     
     elif q_type == "trigonometry_advanced":
         # Special angles
-        angle = random.choice([120, 135, 150])
+        angle = rng.choice([120, 135, 150])
         if angle == 120:
             sin_val = 0.866
         elif angle == 135:
@@ -209,31 +204,117 @@ def generate_hard_question():
             "answer": "A"
         }
 
+# ---------- Generate Dynamic Questions in Bulk ----------
+SINES = {30: 0.5, 45: 0.707, 60: 0.866, 120: 0.866, 135: 0.707, 150: 0.5}
+PYTHAGOREAN_TRIPLES = [(3, 4, 5), (5, 12, 13), (6, 8, 10)]
+
+def _sine_batch(indices, angles):
+    sines = [SINES[angle] for angle in angles]
+    return (indices, [f"What is the sine of {angle}°?" for angle in angles],
+            question_batch.offset_options(sines, deltas=(0.1, -0.1, 0.2)))
+
+def _fixed_batch(indices, text, options):
+    return (indices, [text] * indices.size, [dict(options) for _ in range(indices.size)])
+
+def generate_easy_questions(count, rng):
+    """Generate a batch of easy triangle questions"""
+    area_idx, perimeter_idx, angle_idx = question_batch.split_types(rng, count, 3)
+
+    bases = question_batch.randint(rng, 3, 10, area_idx.size)
+    heights = question_batch.randint(rng, 4, 12, area_idx.size)
+    areas = (0.5 * bases * heights).tolist()
+
+    a = question_batch.randint(rng, 3, 8, perimeter_idx.size)
+    b = question_batch.randint(rng, 4, 9, perimeter_idx.size)
+    c = question_batch.randint(rng, 5, 10, perimeter_idx.size)
+    perimeters = (a + b + c).tolist()
+
+    angle1 = question_batch.randint(rng, 30, 60, angle_idx.size)
+    angle2 = question_batch.randint(rng, 30, 60, angle_idx.size)
+    angle3 = (180 - angle1 - angle2).tolist()
+
+    return question_batch.assemble(count, [
+        (area_idx, [f"What is the area of a triangle with base {b_} and height {h}?"
+                    for b_, h in zip(bases.tolist(), heights.tolist())],
+         question_batch.offset_options(areas)),
+        (perimeter_idx, [f"Find the perimeter of a triangle with sides {x}, {y}, {z}"
+                         for x, y, z in zip(a.tolist(), b.tolist(), c.tolist())],
+         question_batch.offset_options(perimeters)),
+        (angle_idx, [f"What is the third angle if two angles are {x}° and {y}°?"
+                     for x, y in zip(angle1.tolist(), angle2.tolist())],
+         question_batch.offset_options(angle3)),
+    ])
+
+def generate_medium_questions(count, rng):
+    """Generate a batch of medium triangle questions"""
+    heron_idx, trig_idx, pythagorean_idx = question_batch.split_types(rng, count, 3)
+
+    # Heron's formula uses a fixed 5-6-7 triangle
+    s = (5 + 6 + 7) / 2
+    heron = math.sqrt(s * (s - 5) * (s - 6) * (s - 7))
+    triples = [PYTHAGOREAN_TRIPLES[i] for i in rng.integers(0, len(PYTHAGOREAN_TRIPLES), pythagorean_idx.size).tolist()]
+
+    return question_batch.assemble(count, [
+        _fixed_batch(heron_idx, "Find the area using Heron's formula: sides 5, 6, 7",
+                     question_batch.offset_options([heron], ndigits=1)[0]),
+        _sine_batch(trig_idx, rng.choice([30, 45, 60], trig_idx.size).tolist()),
+        (pythagorean_idx, [f"Find the hypotenuse of a right triangle with legs {a} and {b}" for a, b, _ in triples],
+         question_batch.offset_options([c for _, _, c in triples])),
+    ])
+
+def generate_hard_questions(count, rng):
+    """Generate a batch of hard triangle questions"""
+    cosines_idx, trig_idx, coordinates_idx = question_batch.split_types(rng, count, 3)
+
+    # Law of cosines uses a fixed a=5, b=7, c=8 triangle
+    angle_c = math.degrees(math.acos((5**2 + 7**2 - 8**2) / (2 * 5 * 7)))
+    cosines_options = {
+        "A": str(round(angle_c)),
+        "B": str(round(angle_c + 1)),
+        "C": str(round(angle_c - 1)),
+        "D": str(round(angle_c + 2))
+    }
+
+    return question_batch.assemble(count, [
+        _fixed_batch(cosines_idx, "Find the angle using law of cosines: a=5, b=7, c=8", cosines_options),
+        _sine_batch(trig_idx, rng.choice([120, 135, 150], trig_idx.size).tolist()),
+        _fixed_batch(coordinates_idx, "Find the area of a triangle with vertices (0,0), (3,0), (0,4)",
+                     question_batch.offset_options([0.5 * 3 * 4])[0]),
+    ])
+
 # ---------- Fetch Random Question from Specific Level ----------
 def get_easy_question():
     mcqs = load_mcqs_by_level().get("easy", [])
     if mcqs:
         return random.choice(mcqs)
     else:
-        return generate_easy_question()
+        return question_pool.pop("triangles", "easy")
 
 def get_medium_question():
     mcqs = load_mcqs_by_level().get("medium", [])
     if mcqs:
         return random.choice(mcqs)
     else:
-        return generate_medium_question()
+        return question_pool.pop("triangles", "medium")
 
 def get_hard_question():
     mcqs = load_mcqs_by_level().get("hard", [])
     if mcqs:
         return random.choice(mcqs)
     else:
-        return generate_hard_question()
+        return question_pool.pop("triangles", "hard")
 
 # ---------- Unified Interface ----------
-def get_question(level="easy"):
+def get_question(level="easy", mode="static"):
+    """
+    mode: 'static' => pick from JSON (generated when a level has none)
+          'dynamic' => a pre-generated question from the question pool
+    """
     level = level.lower()
+    if mode == "dynamic":
+        return question_pool.pop("triangles", level)
+    elif mode != "static":
+        return {"error": "Invalid mode. Use 'static' or 'dynamic'."}
     if level == "easy":
         return get_easy_question()
     elif level == "medium":
@@ -243,6 +324,66 @@ def get_question(level="easy"):
     else:
         return {"error": "Invalid level. Use 'easy', 'medium', or 'hard'."}
 
+# ---------- Batch Interface ----------
+BATCH_GENERATORS = {
+    "easy": generate_easy_questions,
+    "medium": generate_medium_questions,
+    "hard": generate_hard_questions,
+}
+
+SINGLE_GENERATORS = {
+    "easy": generate_easy_question,
+    "medium": generate_medium_question,
+    "hard": generate_hard_question,
+}
+
+def generate_batch(level="easy", count=1, seed=None):
+    """
+    Generate count unkeyed questions in one NumPy pass (bulk exports, benchmarks).
+    They carry no key, so the API never serves them: use generate_questions.
+    """
+    level = level.lower()
+    generator = BATCH_GENERATORS.get(level)
+    if generator is None:
+        return {"error": "Invalid level. Use 'easy', 'medium', or 'hard'."}
+    return generator(count, question_batch.make_rng(seed))
+
+def generate_questions(level="easy", count=1, seed=None):
+    """
+    count keyed dynamic questions, whatever the batch size: each carries the key that
+    regenerates it (question_keys), so it can be graded and logged. Unseeded batches
+    come from the question pool; the same seed always yields the same questions.
+    """
+    level = level.lower()
+    if level not in BATCH_GENERATORS:
+        return {"error": "Invalid level. Use 'easy', 'medium', or 'hard'."}
+    if seed is None:
+        return question_pool.pop_many("triangles", level, count)
+    return question_keys.generate_many("triangles", level, count, seed)
+
+def generate_keyed_question(level, q_type, rng):
+    """One question of a given type drawn from rng (see question_keys)"""
+    return SINGLE_GENERATORS[level](rng, q_type)
+
+question_keys.register("triangles", generate_keyed_question, QUESTION_TYPES)
+
+# Keep pre-generated keyed questions ready for the request path
+question_pool.register("triangles", functools.partial(question_keys.generate_many, "triangles"))
+
+def get_questions(level="easy", count=1, seed=None, mode="static"):
+    """Batch version of get_question: static MCQs when available, otherwise generated"""
+    level = level.lower()
+    if level not in BATCH_GENERATORS:
+        return {"error": "Invalid level. Use 'easy', 'medium', or 'hard'."}
+    if mode == "dynamic":
+        return generate_questions(level, count, seed)
+    elif mode != "static":
+        return {"error": "Invalid mode. Use 'static' or 'dynamic'."}
+    mcqs = load_mcqs_by_level().get(level, [])
+    if mcqs:
+        return question_batch.sample_static(mcqs, count, question_batch.make_rng(seed))
+    return generate_questions(level, count, seed)
+
 # ---------- CLI Testing ----------
 if __name__ == "__main__":
     for level in ["easy", "medium", "hard"]:
@@ -0,0 +1,122 @@
+import gzip
+import hashlib
+import os
+import threading
+
+from flask import Response, render_template, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None  # Optional: without it only gzip and identity are served
+
+
+# ---------- Rendered Page ----------
+class RenderedPage:
+    """One rendered template with precompressed variants and strong ETags per encoding"""
+
+    def __init__(self, body, mtime):
+        self.mtime = mtime
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.variants = {None: (body, f'"{digest}"')}
+        self.variants['gzip'] = (gzip.compress(body, compresslevel=9, mtime=0), f'"{digest}-gz"')
+        if brotli is not None:
+            self.variants['br'] = (brotli.compress(body, quality=11), f'"{digest}-br"')
+        self.etags = {etag for _, etag in self.variants.values()}
+
+
+def preferred_encoding(accept_encoding, available):
+    """Pick br, then gzip, then identity from an Accept-Encoding header"""
+    offered = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        offered[coding.strip().lower()] = quality
+    for coding in ('br', 'gzip'):
+        if coding in available and offered.get(coding, 0) > 0:
+            return coding
+    return None
+
+
+# ---------- Pre-rendered Page Cache ----------
+class PageCache:
+    """
+    Templates without context, rendered once and served as bytes.
+
+    Each page is kept as identity, gzip and (if the brotli package is
+    installed) brotli bodies. Requests get the best encoding they accept,
+    or a 304 when If-None-Match matches. With `auto_reload` (by default:
+    whenever the app runs in debug mode) a page is re-rendered when its
+    template file changes.
+    """
+
+    def __init__(self, app, templates, auto_reload=None):
+        self.app = app
+        self.templates = list(templates)
+        self.auto_reload = auto_reload
+        self._lock = threading.Lock()
+        self._pages = {}
+        self.hits = 0
+        self.not_modified = 0
+        self.renders = 0
+
+    def _template_mtime(self, name):
+        path = os.path.join(self.app.root_path, self.app.template_folder, name)
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return None
+
+    def _render(self, name):
+        with self.app.app_context():
+            body = render_template(name).encode('utf-8')
+        page = RenderedPage(body, self._template_mtime(name))
+        with self._lock:
+            self._pages[name] = page
+            self.renders += 1
+        return page
+
+    def render_all(self):
+        for name in self.templates:
+            self._render(name)
+
+    def _page(self, name):
+        page = self._pages.get(name)
+        auto_reload = self.app.debug if self.auto_reload is None else self.auto_reload
+        if page is None or (auto_reload and self._template_mtime(name) != page.mtime):
+            page = self._render(name)
+        return page
+
+    def response(self, name):
+        """Response for the current request: cached bytes in the best encoding, or 304"""
+        page = self._page(name)
+        headers = {'Vary': 'Accept-Encoding', 'Cache-Control': 'no-cache'}
+
+        for tag in request.headers.get('If-None-Match', '').split(','):
+            if tag.strip() in page.etags:
+                self.not_modified += 1
+                return Response(status=304, headers=dict(headers, ETag=tag.strip()))
+
+        encoding = preferred_encoding(request.headers.get('Accept-Encoding', ''), page.variants)
+        body, etag = page.variants[encoding]
+        headers['ETag'] = etag
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        self.hits += 1
+        return Response(body, mimetype='text/html', headers=headers)
+
+    def stats(self):
+        return {
+            "pages": len(self._pages),
+            "bytes": {name: {enc or 'identity': len(body) for enc, (body, _) in page.variants.items()}
+                      for name, page in self._pages.items()},
+            "hits": self.hits,
+            "not_modified": self.not_modified,
+            "renders": self.renders,
+            "brotli": brotli is not None,
+        }
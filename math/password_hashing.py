@@ -0,0 +1,117 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import bcrypt
+
+# ---------- Configuration ----------
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+# Hash/verify jobs allowed in flight (running + queued) before new ones are turned away
+HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', str(HASH_WORKERS * 4)))
+HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', '10'))
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing pool is saturated or a job outlived its timeout; callers should ask the client to retry"""
+
+
+def hash_rounds(stored_hash):
+    """Cost factor of a bcrypt hash ('$2b$12$...' -> 12), or None if it cannot be parsed"""
+    try:
+        return int(stored_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+# ---------- Bounded Password Hashing Pool ----------
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification on a dedicated, bounded thread pool
+    (bcrypt releases the GIL), so a burst of logins cannot occupy every
+    request worker. At most `max_pending` jobs are admitted at once; beyond
+    that HashingBusy is raised immediately instead of queueing, and a caller
+    that waits longer than `timeout` gets HashingBusy too. A job keeps its
+    slot until it finishes, even if its caller gave up.
+    """
+
+    def __init__(self, rounds=BCRYPT_ROUNDS, workers=HASH_WORKERS, max_pending=HASH_MAX_PENDING, timeout=HASH_TIMEOUT):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.rehashed = 0
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashingBusy("Password hashing is busy, please retry")
+        with self._lock:
+            self.in_flight += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._finished(None)
+            raise
+        # The slot is held until the job itself ends, not until this caller stops waiting:
+        # a job that outlives the timeout still occupies the pool
+        future.add_done_callback(self._finished)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            with self._lock:
+                self.timed_out += 1
+            raise HashingBusy("Password hashing timed out, please retry") from None
+
+    def _finished(self, future):
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+        self._slots.release()
+
+    def _hash(self, password):
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=self.rounds)).decode()
+
+    def _verify(self, password, stored_hash):
+        if not bcrypt.checkpw(password.encode(), stored_hash.encode()):
+            return False, None
+        if hash_rounds(stored_hash) != self.rounds:
+            # Upgrade (or downgrade) the stored hash to the configured work factor
+            return True, self._hash(password)
+        return True, None
+
+    def hash(self, password):
+        """Return a bcrypt hash (str) of the password at the configured work factor"""
+        return self._run(self._hash, password)
+
+    def verify(self, password, stored_hash):
+        """
+        Check a password against a stored hash.
+        Returns (matches, new_hash); new_hash is set when the stored hash should
+        be replaced because its cost differs from the configured one.
+        """
+        matches, new_hash = self._run(self._verify, password, stored_hash)
+        if new_hash is not None:
+            with self._lock:
+                self.rehashed += 1
+        return matches, new_hash
+
+    def stats(self):
+        return {
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "rehashed": self.rehashed,
+        }
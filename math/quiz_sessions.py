@@ -0,0 +1,120 @@
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+# ---------- Configuration ----------
+QUIZ_SESSION_TTL = float(os.getenv('QUIZ_SESSION_TTL', '3600'))
+QUIZ_SESSION_MAX = int(os.getenv('QUIZ_SESSION_MAX', '10000'))
+# Question ids per user whose answers may be shown after their quiz session was graded
+GRADED_IDS_PER_USER = int(os.getenv('QUIZ_GRADED_IDS_PER_USER', '500'))
+
+
+def public_question(question):
+    """A question as sent to the browser: everything except the answer"""
+    return {key: value for key, value in question.items() if key != 'answer'}
+
+
+class QuizSession:
+    __slots__ = ('session_id', 'username', 'topic', 'level', 'questions', 'expires')
+
+    def __init__(self, session_id, username, topic, level, questions, expires):
+        self.session_id = session_id
+        self.username = username
+        self.topic = topic
+        self.level = level
+        self.questions = questions
+        self.expires = expires
+
+
+# ---------- Quiz Session Store ----------
+class QuizSessionStore:
+    """
+    Quizzes in progress, keyed by an unguessable session id. Each session
+    holds the full questions (the answer key); clients only ever see
+    public_question() copies.
+
+    Bounded in memory: sessions expire after QUIZ_SESSION_TTL seconds and,
+    past QUIZ_SESSION_MAX live sessions, the oldest are evicted first. A
+    session is consumed by its submission, after which its question ids are
+    remembered for the user (graded_ids) so their answers may be revealed.
+    """
+
+    def __init__(self, ttl=QUIZ_SESSION_TTL, max_sessions=QUIZ_SESSION_MAX):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()  # session id -> QuizSession, oldest first
+        self._graded = OrderedDict()    # username -> OrderedDict of graded question ids, least recent user first
+        self.started = 0
+        self.submitted = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def _evict(self, now):
+        # Sessions are ordered by creation and share one TTL, so expired ones are at the front
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.expires > now:
+                break
+            self._sessions.popitem(last=False)
+            self.expired += 1
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+
+    def start(self, username, topic, level, questions):
+        now = time.time()
+        session = QuizSession(secrets.token_urlsafe(16), username, topic, level, list(questions), now + self.ttl)
+        with self._lock:
+            self._sessions[session.session_id] = session
+            self.started += 1
+            self._evict(now)
+        return session
+
+    def pop(self, session_id, username):
+        """Remove and return the user's live session, or None if unknown, expired or someone else's"""
+        with self._lock:
+            self._evict(time.time())
+            session = self._sessions.get(session_id)
+            if session is None or session.username != username:
+                return None
+            del self._sessions[session_id]
+            self.submitted += 1
+            graded = self._graded.pop(username, None) or OrderedDict()
+            for question in session.questions:
+                graded.pop(question.get('id'), None)
+                graded[question.get('id')] = None
+            while len(graded) > GRADED_IDS_PER_USER:
+                graded.popitem(last=False)
+            self._graded[username] = graded
+            while len(self._graded) > self.max_sessions:
+                self._graded.popitem(last=False)
+        return session
+
+    def graded_ids(self, username):
+        """Ids of questions from the user's recently graded sessions"""
+        with self._lock:
+            return frozenset(self._graded.get(username, ()))
+
+    def issued_ids(self, username):
+        """Ids of questions served to the user in live or recently graded quiz sessions"""
+        with self._lock:
+            self._evict(time.time())
+            ids = set(self._graded.get(username, ()))
+            for session in self._sessions.values():
+                if session.username == username:
+                    ids.update(question.get('id') for question in session.questions)
+            return frozenset(ids)
+
+    def stats(self):
+        return {
+            "active": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "ttl_seconds": self.ttl,
+            "started": self.started,
+            "submitted": self.submitted,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
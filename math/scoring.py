@@ -0,0 +1,104 @@
+import math
+
+# ---------- Configuration ----------
+# XP per quiz at 100% before the level multiplier (matches the former client-side result.html math)
+BASE_XP = 50
+LEVEL_MULTIPLIERS = {
+    'easy': 1,
+    'medium': 2,
+    'hard': 3
+}
+# Numerical answers within this distance of the key count as correct
+NUMERIC_TOLERANCE = 0.01
+
+
+def is_correct(question, user_answer):
+    """Grade one answer: option letter for MCQs, numeric tolerance otherwise"""
+    if user_answer is None:
+        return False
+    correct_answer = question.get('answer')
+    if question.get('options'):
+        return str(user_answer).strip().upper() == str(correct_answer).strip().upper()
+    try:
+        return abs(float(user_answer) - float(correct_answer)) < NUMERIC_TOLERANCE
+    except (TypeError, ValueError):
+        return str(user_answer).strip() == str(correct_answer).strip()
+
+
+def score_percent(correct, total):
+    return round(correct / total * 100) if total else 0
+
+
+def xp_for(score, level):
+    """XP earned for a quiz score (percent) at a level"""
+    return math.floor(score / 100 * BASE_XP * LEVEL_MULTIPLIERS.get(level, 1))
+
+
+def normalize_answers(answers):
+    """
+    Accept {question_id: answer} or [{question_id, answer}, ...] and return
+    a list of (question_id, answer) pairs in submission order
+    """
+    if isinstance(answers, dict):
+        return list(answers.items())
+    if isinstance(answers, list):
+        return [(a.get('question_id'), a.get('answer')) for a in answers if isinstance(a, dict)]
+    raise ValueError("'answers' must be an object of question_id -> answer or a list")
+
+
+# ---------- Scoring Engine ----------
+class ScoringEngine:
+    """
+    Grades submitted answers against an answer-key index.
+
+    `lookup(question_id)` returns (source, level, question) or None, e.g.
+    QuestionBank.lookup; grading a question is one dict hit plus a compare.
+    Unknown question ids are graded as wrong and reported. The quiz level
+    (and so the XP) comes from the graded questions, never the submission.
+    Per-question correctness is only included for ids in `issued` (None:
+    every id) and correct answers only for ids in `reveal`; other questions
+    count towards the aggregate score alone.
+    """
+
+    def __init__(self, lookup):
+        self.lookup = lookup
+        self.graded = 0
+
+    def grade(self, submission, reveal=frozenset(), issued=None):
+        """Grade one quiz: {answers, topic?} -> score, XP and per-question results"""
+        results = []
+        correct_count = 0
+        levels = []
+        for question_id, user_answer in normalize_answers(submission.get('answers', {})):
+            entry = self.lookup(question_id)
+            if entry is None:
+                results.append({'question_id': question_id, 'correct': False, 'error': 'Unknown question'})
+                continue
+            _, level, question = entry
+            levels.append(level)
+            correct = is_correct(question, user_answer)
+            correct_count += correct
+            result = {'question_id': question_id}
+            if issued is None or question_id in issued:
+                result['correct'] = correct
+            if question_id in reveal:
+                result['correct_answer'] = question.get('answer')
+            results.append(result)
+
+        total = len(results)
+        # The quiz level is the most common level of its questions in the bank
+        level = max(set(levels), key=levels.count) if levels else 'easy'
+        score = score_percent(correct_count, total)
+        self.graded += 1
+        return {
+            'topic': submission.get('topic', ''),
+            'level': level,
+            'total_questions': total,
+            'correct_answers': correct_count,
+            'score': score,
+            'xp': xp_for(score, level),
+            'results': results
+        }
+
+    def grade_many(self, submissions, reveal=frozenset(), issued=None):
+        return [self.grade(submission, reveal, issued) for submission in submissions]
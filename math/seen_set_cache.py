@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+
+# ---------- Configuration ----------
+# Seconds before the cache is reloaded to pick up seen-sets written by other workers
+SEEN_CACHE_TTL = float(os.getenv('SEEN_CACHE_TTL', '300'))
+
+
+# ---------- (Username, Topic, Level) -> Seen-set Cache ----------
+class SeenSetCache:
+    """
+    Every user's quiz seen-sets (logic/python/seen_sets.py), keyed by
+    (username, topic, level).
+
+    Populated from a single fetch of all seen rows, `load_rows()` ->
+    [(username, topic, level, bits, updated)]. Rows are append-only, so the
+    most recently updated row per key wins. get() and put() are dict
+    operations; once `ttl` seconds have passed one caller reloads the rows
+    while concurrent callers keep using the current snapshot, and local
+    writes newer than the reloaded rows are kept.
+    """
+
+    def __init__(self, load_rows, ttl=SEEN_CACHE_TTL):
+        self.load_rows = load_rows
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._sets = {}  # (username, topic, level) -> (updated, bits)
+        self._loaded_at = None
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    @staticmethod
+    def _key(username, topic, level):
+        return (username.strip().lower(), topic, level)
+
+    def refresh(self):
+        """Rebuild the cache from one fetch of every seen row"""
+        loaded = {}
+        for username, topic, level, bits, updated in self.load_rows():
+            key = self._key(username, topic, level)
+            if key not in loaded or updated >= loaded[key][0]:
+                loaded[key] = (updated, bits)
+        with self._lock:
+            for key, entry in self._sets.items():
+                # Written here after the rows were fetched (or not flushed yet)
+                if key not in loaded or entry[0] > loaded[key][0]:
+                    loaded[key] = entry
+            self._sets = loaded
+            self._loaded_at = time.monotonic()
+            self.refreshes += 1
+
+    def _ensure_fresh(self):
+        if self._loaded_at is None:
+            with self._refresh_lock:
+                if self._loaded_at is None:
+                    self.refresh()
+        elif time.monotonic() - self._loaded_at > self.ttl and self._refresh_lock.acquire(blocking=False):
+            # Single flight: everyone else keeps reading the current snapshot meanwhile
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Seen-set cache: refresh failed, keeping the current snapshot: {e}")
+            finally:
+                self._refresh_lock.release()
+
+    def get(self, username, topic, level):
+        """The user's seen-set bytes for a topic/level (b"" if none)"""
+        self._ensure_fresh()
+        entry = self._sets.get(self._key(username, topic, level))
+        if entry is None:
+            self.misses += 1
+            return b""
+        self.hits += 1
+        return entry[1]
+
+    def put(self, username, topic, level, bits):
+        """Record a new seen-set; returns its update time (epoch seconds) for the stored row"""
+        updated = time.time()
+        with self._lock:
+            self._sets[self._key(username, topic, level)] = (updated, bytes(bits))
+        return updated
+
+    def stats(self):
+        return {
+            "cached_seen_sets": len(self._sets),
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+        }
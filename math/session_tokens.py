@@ -0,0 +1,136 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+
+# ---------- Configuration ----------
+SESSION_TTL = int(os.getenv('SESSION_TTL', str(24 * 60 * 60)))
+# Shared by every worker so tokens issued by one are accepted by the others.
+# Without it the secret is read from SESSION_SECRET_FILE, which the first worker
+# to start creates; that only covers workers on one host (and one checkout).
+SESSION_SECRET = os.getenv('SESSION_SECRET', '')
+SESSION_SECRET_FILE = os.getenv('SESSION_SECRET_FILE', os.path.join(os.path.dirname(__file__), '.session_secret'))
+
+
+def load_or_create_secret(path=SESSION_SECRET_FILE):
+    """The secret persisted at path, created (mode 0600) by whichever process gets there first"""
+    try:
+        with open(path, 'r', encoding='ascii') as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        pass
+    # Written beside the target and hard-linked into place: exactly one process wins,
+    # and no process ever reads a half-written secret
+    tmp = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='ascii') as f:
+        f.write(secrets.token_hex(32))
+    try:
+        os.link(tmp, path)
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(tmp)
+    with open(path, 'r', encoding='ascii') as f:
+        return f.read().strip()
+
+
+class InvalidToken(Exception):
+    """Raised when a session token is malformed, forged, expired or revoked"""
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+# ---------- Signed Session Tokens ----------
+class SessionTokens:
+    """
+    Stateless session tokens: base64url("username:expires:id") + "." +
+    base64url(HMAC-SHA256 of that payload). Verifying one is a single HMAC and
+    a constant-time compare; no storage is touched.
+
+    Revoked token ids are kept in memory until the token would have expired
+    anyway, so the list stays small.
+    """
+
+    def __init__(self, secret=SESSION_SECRET, ttl=SESSION_TTL):
+        if not secret:
+            secret = load_or_create_secret()
+            print(f"Warning: SESSION_SECRET is not set, using the secret in {SESSION_SECRET_FILE} "
+                  f"(set SESSION_SECRET when workers run on more than one host)")
+        self._key = secret.encode() if isinstance(secret, str) else secret
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._revoked = {}  # token id -> expires (epoch seconds)
+        self.issued = 0
+        self.verified = 0
+        self.rejected = 0
+
+    def _sign(self, payload):
+        return hmac.new(self._key, payload, hashlib.sha256).digest()
+
+    def issue(self, username):
+        """Return (token, expires) for a user; expires is epoch seconds"""
+        expires = int(time.time()) + self.ttl
+        payload = f"{username}:{expires}:{secrets.token_hex(8)}".encode()
+        self.issued += 1
+        return f"{_b64encode(payload)}.{_b64encode(self._sign(payload))}", expires
+
+    def _decode(self, token):
+        try:
+            encoded_payload, encoded_signature = token.split('.')
+            payload = _b64decode(encoded_payload)
+            signature = _b64decode(encoded_signature)
+        except (AttributeError, ValueError):
+            raise InvalidToken("Malformed session token")
+        if not hmac.compare_digest(signature, self._sign(payload)):
+            raise InvalidToken("Invalid session token")
+        try:
+            username, expires, token_id = payload.decode().rsplit(':', 2)
+            return username, int(expires), token_id
+        except ValueError:
+            raise InvalidToken("Malformed session token")
+
+    def verify(self, token):
+        """Return the username a token was issued to, or raise InvalidToken"""
+        try:
+            username, expires, token_id = self._decode(token)
+            if expires <= time.time():
+                raise InvalidToken("Session expired")
+            if token_id in self._revoked:
+                raise InvalidToken("Session revoked")
+        except InvalidToken:
+            self.rejected += 1
+            raise
+        self.verified += 1
+        return username
+
+    def revoke(self, token):
+        """Invalidate one token (e.g. on logout). Returns False if it was not valid"""
+        try:
+            _, expires, token_id = self._decode(token)
+        except InvalidToken:
+            return False
+        now = time.time()
+        with self._lock:
+            self._revoked[token_id] = expires
+            # Entries are only needed until the token would have expired anyway
+            self._revoked = {tid: exp for tid, exp in self._revoked.items() if exp > now}
+        return True
+
+    def stats(self):
+        return {
+            "ttl_seconds": self.ttl,
+            "issued": self.issued,
+            "verified": self.verified,
+            "rejected": self.rejected,
+            "revoked": len(self._revoked),
+        }
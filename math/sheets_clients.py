@@ -0,0 +1,85 @@
+import os
+import threading
+
+# ---------- Configuration ----------
+SHEETS_HTTP_TIMEOUT = float(os.getenv('SHEETS_HTTP_TIMEOUT', '30'))
+
+
+# ---------- Per-thread Sheets API Clients ----------
+class SheetsClientPool:
+    """
+    One Sheets API client (and one gspread client) per worker thread, built
+    on a shared set of service-account credentials.
+
+    googleapiclient service objects (and the httplib2 connection under them)
+    are not thread-safe, and neither is the requests session behind a
+    gspread client, so each thread gets its own, created on first use and
+    reused afterwards. Credentials are refreshed here, under a lock, before
+    a client is handed out, so threads never race to refresh the same token.
+    """
+
+    def __init__(self, credentials, timeout=SHEETS_HTTP_TIMEOUT):
+        self.credentials = credentials
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.connections = 0
+        self.reuses = 0
+        self.refreshes = 0
+        self.gspread_clients = 0
+
+    def _fresh_credentials(self):
+        if self.credentials.valid:
+            return self.credentials
+        from google.auth.transport.requests import Request
+
+        with self._lock:
+            if not self.credentials.valid:
+                self.credentials.refresh(Request())
+                self.refreshes += 1
+        return self.credentials
+
+    def service(self):
+        """The calling thread's Sheets v4 service object"""
+        credentials = self._fresh_credentials()
+        service = getattr(self._local, 'service', None)
+        if service is not None:
+            with self._lock:
+                self.reuses += 1
+            return service
+
+        import httplib2
+        from google_auth_httplib2 import AuthorizedHttp
+        from googleapiclient.discovery import build
+
+        http = AuthorizedHttp(credentials, http=httplib2.Http(timeout=self.timeout))
+        service = build('sheets', 'v4', http=http, cache_discovery=False, static_discovery=True)
+        self._local.service = service
+        with self._lock:
+            self.connections += 1
+        return service
+
+    def spreadsheet(self, key):
+        """The calling thread's gspread Spreadsheet for `key` (one metadata fetch per thread)"""
+        self._fresh_credentials()
+        spreadsheets = getattr(self._local, 'spreadsheets', None)
+        if spreadsheets is None:
+            spreadsheets = self._local.spreadsheets = {}
+        spreadsheet = spreadsheets.get(key)
+        if spreadsheet is None:
+            import gspread
+
+            spreadsheet = spreadsheets[key] = gspread.authorize(self.credentials).open_by_key(key)
+            with self._lock:
+                self.gspread_clients += 1
+        return spreadsheet
+
+    def stats(self):
+        requests = self.connections + self.reuses
+        return {
+            "connections": self.connections,
+            "reuses": self.reuses,
+            "reuse_rate": round(self.reuses / requests, 4) if requests else None,
+            "credential_refreshes": self.refreshes,
+            "gspread_clients": self.gspread_clients,
+        }
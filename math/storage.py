@@ -0,0 +1,635 @@
+import base64
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from attempt_spool import AttemptSpool
+from seen_set_cache import SeenSetCache
+from sheets_clients import SheetsClientPool
+from worksheet_cache import WorksheetCache, clean_worksheet_name
+
+# ---------- Configuration ----------
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'sheets')
+SQLITE_PATH = os.getenv('SQLITE_PATH', os.path.join(os.path.dirname(__file__), 'ispace.db'))
+# Connect to Google Sheets on a background thread instead of blocking startup
+STORAGE_LAZY_INIT = os.getenv('STORAGE_LAZY_INIT', '1').lower() not in ('0', 'false', 'no')
+
+SERVICE_ACCOUNT_FILE = os.getenv('SERVICE_ACCOUNT_FILE', 'service_account.json')
+SCOPES = os.getenv('SCOPES', 'https://www.googleapis.com/auth/spreadsheets,https://www.googleapis.com/auth/drive').split(',')
+SPREADSHEET_ID = os.getenv('SPREADSHEET_ID', '1FFLrl7f24QKM3xpQSYwib-NmlSE5s4Mb7iXFeVQVYIg')
+SHEET_NAME = os.getenv('SHEET_NAME', 'login')
+# Worksheet holding every user's quiz seen-sets as append-only rows of
+# [username, topic, level, base64 bits, updated epoch seconds]; the latest row per key wins
+SEEN_SHEET_NAME = os.getenv('SEEN_SHEET_NAME', 'seen')
+SEEN_SHEET_COLUMNS = ['Username', 'Topic', 'Level', 'Seen (base64 bitset)', 'Updated (epoch seconds)']
+# Local write-behind spool for seen rows bound for Google Sheets
+SEEN_SPOOL_PATH = os.getenv('SEEN_SPOOL_PATH', os.path.join(os.path.dirname(__file__), 'seen_spool.jsonl'))
+
+# Column order of an attempt row (also the header row of every user worksheet).
+# Bank questions are stored by id (question_bank.question_id) and answers by option letter;
+# rows written before ids existed hold the question text instead.
+ATTEMPT_COLUMNS = [
+    'Topic',
+    'Level',
+    'Question ID',
+    'Correct Answer',
+    "User's Answer",
+    'Status (Correct/Wrong)',
+    'Time Used (seconds)',
+    'Timestamp'
+]
+
+
+# ---------- Storage Interface ----------
+class StorageBackend:
+    """
+    Persistence for users, per-user attempt logs and per-user sheet metadata.
+
+    Users are rows of [username, password_hash, name]; attempt rows follow
+    ATTEMPT_COLUMNS. Seen-sets are small bitsets (logic/python/seen_sets.py)
+    of the bank questions a user has been served, per topic and level.
+    """
+
+    name = "base"
+
+    def load_user_rows(self):
+        """Return every user row; raise on backend errors"""
+        raise NotImplementedError
+
+    def append_user(self, username, password_hash, name):
+        """Store a new user; password_hash is the bcrypt hash as str. Return True on success"""
+        raise NotImplementedError
+
+    def update_password_hash(self, username, password_hash):
+        """Replace a user's stored hash (e.g. after a work-factor change). Return True on success"""
+        raise NotImplementedError
+
+    def get_or_create_user_sheet(self, username):
+        """Ensure the user has an attempt log; return its URL (or None on failure)"""
+        raise NotImplementedError
+
+    def append_attempt_rows(self, username, rows):
+        """Append several attempt rows to the user's log in one write. Return True on success"""
+        raise NotImplementedError
+
+    def get_attempts(self, username, limit=100):
+        """Return the user's most recent attempt rows, newest last"""
+        raise NotImplementedError
+
+    def get_seen_set(self, username, topic, level):
+        """Return the user's seen-set bytes for a topic/level (b"" if none yet)"""
+        raise NotImplementedError
+
+    def put_seen_set(self, username, topic, level, bits):
+        """Replace the user's seen-set for a topic/level. Return True on success"""
+        raise NotImplementedError
+
+    def stats(self):
+        return {"backend": self.name}
+
+
+# ---------- In-memory Fallback ----------
+class MemoryStorage(StorageBackend):
+    """Per-process storage used when no real backend is available (development/testing)"""
+
+    name = "memory"
+
+    def __init__(self):
+        self.users = {}
+        self.attempts = {}
+        self.seen = {}
+
+    def load_user_rows(self):
+        return [[username, user['password_hash'], user['name']] for username, user in self.users.items()]
+
+    def append_user(self, username, password_hash, name):
+        self.users[username] = {'password_hash': password_hash, 'name': name}
+        print(f"DEBUG: User '{username}' stored in fallback storage")
+        return True
+
+    def update_password_hash(self, username, password_hash):
+        if username not in self.users:
+            return False
+        self.users[username]['password_hash'] = password_hash
+        return True
+
+    def get_or_create_user_sheet(self, username):
+        print("Google Sheets not available, using fallback mode")
+        return f"fallback://{username}_worksheet"
+
+    def append_attempt_rows(self, username, rows):
+        self.attempts.setdefault(username, []).extend(rows)
+        for row in rows:
+            print(f"FALLBACK QUIZ LOG: {username} | " + " | ".join(str(value) for value in row))
+        return True
+
+    def get_attempts(self, username, limit=100):
+        return self.attempts.get(username, [])[-limit:]
+
+    def get_seen_set(self, username, topic, level):
+        return self.seen.get((username, topic, level), b"")
+
+    def put_seen_set(self, username, topic, level, bits):
+        self.seen[(username, topic, level)] = bytes(bits)
+        return True
+
+    def stats(self):
+        return {"backend": self.name, "users": len(self.users)}
+
+
+# ---------- Embedded SQLite ----------
+class SQLiteStorage(StorageBackend):
+    """
+    Embedded SQLite database in WAL mode, shared by every worker process.
+    Users are indexed by username and attempts by (username, timestamp).
+    """
+
+    name = "sqlite"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY COLLATE NOCASE,
+            password_hash TEXT NOT NULL,
+            name TEXT,
+            created_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS user_sheets (
+            username TEXT PRIMARY KEY COLLATE NOCASE,
+            title TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS attempts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL COLLATE NOCASE,
+            topic TEXT,
+            level TEXT,
+            question TEXT,
+            correct_answer TEXT,
+            user_answer TEXT,
+            status TEXT,
+            time_used TEXT,
+            timestamp TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_attempts_username_timestamp ON attempts (username, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_attempts_timestamp ON attempts (timestamp);
+        CREATE TABLE IF NOT EXISTS seen_sets (
+            username TEXT NOT NULL COLLATE NOCASE,
+            topic TEXT NOT NULL,
+            level TEXT NOT NULL,
+            bits BLOB NOT NULL,
+            PRIMARY KEY (username, topic, level)
+        );
+    """
+
+    def __init__(self, path=SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connection()
+        conn.executescript(self.SCHEMA)
+        conn.commit()
+        print(f"SQLite storage enabled: {self.path}")
+
+    def _connection(self):
+        # sqlite3 connections are per thread; WAL lets readers and one writer run concurrently
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load_user_rows(self):
+        cursor = self._connection().execute("SELECT username, password_hash, name FROM users")
+        return [list(row) for row in cursor]
+
+    def get_user(self, username):
+        """Indexed single-user lookup: (username, password_hash, name) or None"""
+        return self._connection().execute(
+            "SELECT username, password_hash, name FROM users WHERE username = ?", (username,)
+        ).fetchone()
+
+    def append_user(self, username, password_hash, name):
+        conn = self._connection()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT INTO users (username, password_hash, name, created_at) VALUES (?, ?, ?, ?)",
+                    (username, password_hash, name, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                )
+            return True
+        except sqlite3.IntegrityError:
+            print(f"Error appending user to SQLite: '{username}' already exists")
+            return False
+
+    def update_password_hash(self, username, password_hash):
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute("UPDATE users SET password_hash = ? WHERE username = ?", (password_hash, username))
+        return cursor.rowcount == 1
+
+    def get_or_create_user_sheet(self, username):
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO user_sheets (username, title, created_at) VALUES (?, ?, ?)",
+                (username, clean_worksheet_name(username), datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+        return f"sqlite://{os.path.basename(self.path)}/{clean_worksheet_name(username)}"
+
+    def append_attempt_rows(self, username, rows):
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT INTO attempts (username, topic, level, question, correct_answer, user_answer,"
+                " status, time_used, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [[username] + list(row) for row in rows]
+            )
+        return True
+
+    def get_attempts(self, username, limit=100):
+        cursor = self._connection().execute(
+            "SELECT topic, level, question, correct_answer, user_answer, status, time_used, timestamp"
+            " FROM attempts WHERE username = ? ORDER BY timestamp DESC, id DESC LIMIT ?",
+            (username, limit)
+        )
+        return [list(row) for row in reversed(cursor.fetchall())]
+
+    def get_seen_set(self, username, topic, level):
+        row = self._connection().execute(
+            "SELECT bits FROM seen_sets WHERE username = ? AND topic = ? AND level = ?", (username, topic, level)
+        ).fetchone()
+        return bytes(row[0]) if row else b""
+
+    def put_seen_set(self, username, topic, level, bits):
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO seen_sets (username, topic, level, bits) VALUES (?, ?, ?, ?)",
+                (username, topic, level, bytes(bits))
+            )
+        return True
+
+    def stats(self):
+        conn = self._connection()
+        return {
+            "backend": self.name,
+            "path": self.path,
+            "users": conn.execute("SELECT COUNT(*) FROM users").fetchone()[0],
+            "attempts": conn.execute("SELECT COUNT(*) FROM attempts").fetchone()[0],
+            "seen_sets": conn.execute("SELECT COUNT(*) FROM seen_sets").fetchone()[0],
+        }
+
+
+# ---------- Google Sheets ----------
+class GoogleSheetsStorage(StorageBackend):
+    """Users in the login sheet, one worksheet of attempts per user"""
+
+    name = "sheets"
+
+    def __init__(self):
+        from google.oauth2 import service_account
+
+        credentials = service_account.Credentials.from_service_account_file(
+            SERVICE_ACCOUNT_FILE,
+            scopes=SCOPES
+        )
+        # Values API calls and gspread (worksheet metadata) both go through per-thread clients
+        self.clients = SheetsClientPool(credentials)
+        # Fail fast if the spreadsheet or login sheet is missing
+        self.spreadsheet.worksheet(SHEET_NAME)
+        # Worksheet handles are cached per user so logging and login skip the metadata listing
+        self.worksheet_cache = WorksheetCache(lambda: self.spreadsheet)
+        # Seen-sets are read from an in-memory cache and written behind through their own spool
+        self._seen_worksheet = None
+        self._seen_worksheet_lock = threading.Lock()
+        self.seen_sets = SeenSetCache(self._load_seen_rows)
+        self.seen_spool = AttemptSpool(self._append_seen_rows, path=SEEN_SPOOL_PATH).start()
+        print("Google Sheets integration enabled")
+
+    @property
+    def sheet_service(self):
+        return self.clients.service()
+
+    @property
+    def spreadsheet(self):
+        return self.clients.spreadsheet(SPREADSHEET_ID)
+
+    def worksheet_url(self, worksheet):
+        return f"https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}/edit#gid={worksheet.id}"
+
+    def load_user_rows(self):
+        result = self.sheet_service.spreadsheets().values().get(
+            spreadsheetId=SPREADSHEET_ID,
+            range=f'{SHEET_NAME}!A2:C'
+        ).execute()
+        return result.get('values', [])
+
+    def append_user(self, username, password_hash, name):
+        try:
+            body = {'values': [[username, password_hash, name]]}
+            self.sheet_service.spreadsheets().values().append(
+                spreadsheetId=SPREADSHEET_ID,
+                range=f'{SHEET_NAME}!A:C',
+                valueInputOption='RAW',
+                body=body
+            ).execute()
+            return True
+        except Exception as e:
+            print(f"Error appending user to Google Sheets: {e}")
+            return False
+
+    def update_password_hash(self, username, password_hash):
+        try:
+            rows = self.load_user_rows()
+            for index, row in enumerate(rows):
+                if row and row[0].strip().lower() == username.lower():
+                    # Data starts at row 2 of the login sheet; the hash is column B
+                    self.sheet_service.spreadsheets().values().update(
+                        spreadsheetId=SPREADSHEET_ID,
+                        range=f'{SHEET_NAME}!B{index + 2}',
+                        valueInputOption='RAW',
+                        body={'values': [[password_hash]]}
+                    ).execute()
+                    return True
+            return False
+        except Exception as e:
+            print(f"Error updating password hash in Google Sheets: {e}")
+            return False
+
+    def get_user_worksheet(self, username):
+        """Get user's worksheet without creating a new one"""
+        try:
+            worksheet = self.worksheet_cache.get(username)
+            if worksheet is None:
+                print(f"DEBUG: No worksheet found for {username} (cleaned: {clean_worksheet_name(username)})")
+            return worksheet
+        except Exception as e:
+            print(f"DEBUG: Could not get worksheet for {username}: {str(e)}")
+            return None
+
+    def get_or_create_user_sheet(self, username):
+        """Get existing worksheet or create new one for the user with quiz headers"""
+        try:
+            # Clean username for worksheet name (remove special characters)
+            worksheet_name = clean_worksheet_name(username)
+
+            existing_worksheet = self.worksheet_cache.get(username)
+            if existing_worksheet is not None:
+                return self.worksheet_url(existing_worksheet)
+
+            # Create new worksheet (handle potential conflicts)
+            print(f"DEBUG: Creating new worksheet: {worksheet_name}")
+            try:
+                worksheet = self.spreadsheet.add_worksheet(title=worksheet_name, rows=1000, cols=8)
+                print(f"DEBUG: Created new worksheet: {worksheet.title}")
+            except Exception as create_error:
+                print(f"DEBUG: Error creating worksheet '{worksheet_name}': {str(create_error)}")
+                # The worksheet may have been created elsewhere (e.g. another worker): re-read metadata once
+                self.worksheet_cache.refresh()
+                existing_worksheet = self.worksheet_cache.get(username)
+                if existing_worksheet is not None:
+                    return self.worksheet_url(existing_worksheet)
+                # Try with a suffix if there's a conflict
+                for i in range(1, 10):
+                    try:
+                        new_name = f"{worksheet_name}_{i}"
+                        print(f"DEBUG: Trying alternative name: {new_name}")
+                        worksheet = self.spreadsheet.add_worksheet(title=new_name, rows=1000, cols=8)
+                        print(f"DEBUG: Created worksheet with alternative name: {worksheet.title}")
+                        break
+                    except Exception as alt_error:
+                        print(f"DEBUG: Failed to create worksheet '{new_name}': {str(alt_error)}")
+                        continue
+                else:
+                    print(f"DEBUG: Could not create worksheet with any name")
+                    return None
+
+            # Add headers to the first row
+            worksheet.append_row(ATTEMPT_COLUMNS)
+            print(f"DEBUG: Added headers to new worksheet")
+            self.worksheet_cache.add(worksheet)
+
+            # Return worksheet URL
+            return self.worksheet_url(worksheet)
+
+        except Exception as e:
+            print(f"Error creating worksheet for {username}: {str(e)}")
+            print(f"DEBUG: Full error details: {type(e).__name__}: {str(e)}")
+            return None
+
+    def append_attempt_rows(self, username, rows):
+        """Append several attempt rows to the user's worksheet with a single values.append call"""
+        worksheet = self.get_user_worksheet(username)
+
+        if worksheet is None:
+            print(f"DEBUG: Could not get worksheet for {username}, attempting to create one...")
+            # Try to create worksheet if it doesn't exist
+            if self.get_or_create_user_sheet(username):
+                worksheet = self.get_user_worksheet(username)
+            if worksheet is None:
+                print(f"DEBUG: Failed to get or create worksheet for {username}")
+                return False
+
+        try:
+            self.sheet_service.spreadsheets().values().append(
+                spreadsheetId=SPREADSHEET_ID,
+                range=f"'{worksheet.title}'!A:H",
+                valueInputOption='RAW',
+                insertDataOption='INSERT_ROWS',
+                body={'values': rows}
+            ).execute()
+        except Exception:
+            # The cached handle may point at a renamed or deleted worksheet
+            self.worksheet_cache.invalidate(username)
+            raise
+        print(f"DEBUG: Flushed {len(rows)} attempt rows to worksheet {worksheet.title}")
+        return True
+
+    def get_attempts(self, username, limit=100):
+        worksheet = self.get_user_worksheet(username)
+        if worksheet is None:
+            return []
+        result = self.sheet_service.spreadsheets().values().get(
+            spreadsheetId=SPREADSHEET_ID,
+            range=f"'{worksheet.title}'!A2:H"
+        ).execute()
+        return result.get('values', [])[-limit:]
+
+    def seen_worksheet(self):
+        """The SEEN_SHEET_NAME worksheet, created with a header row on first use"""
+        with self._seen_worksheet_lock:
+            if self._seen_worksheet is None:
+                import gspread
+                try:
+                    self._seen_worksheet = self.spreadsheet.worksheet(SEEN_SHEET_NAME)
+                except gspread.WorksheetNotFound:
+                    try:
+                        worksheet = self.spreadsheet.add_worksheet(title=SEEN_SHEET_NAME, rows=1000,
+                                                                   cols=len(SEEN_SHEET_COLUMNS))
+                    except gspread.exceptions.APIError:
+                        # Another worker created it first ("already exists")
+                        worksheet = self.spreadsheet.worksheet(SEEN_SHEET_NAME)
+                    else:
+                        worksheet.append_row(SEEN_SHEET_COLUMNS)
+                    self._seen_worksheet = worksheet
+            return self._seen_worksheet
+
+    def _load_seen_rows(self):
+        """Every seen row as (username, topic, level, bits, updated), for SeenSetCache"""
+        result = self.sheet_service.spreadsheets().values().get(
+            spreadsheetId=SPREADSHEET_ID,
+            range=f"'{self.seen_worksheet().title}'!A2:E"
+        ).execute()
+        rows = []
+        for row in result.get('values', []):
+            try:
+                rows.append((row[0], row[1], row[2], base64.b64decode(row[3]), float(row[4])))
+            except (IndexError, ValueError):
+                continue
+        return rows
+
+    def _append_seen_rows(self, username, rows):
+        """Spool writer: append a user's pending seen rows in one values.append call"""
+        self.sheet_service.spreadsheets().values().append(
+            spreadsheetId=SPREADSHEET_ID,
+            range=f"'{self.seen_worksheet().title}'!A:E",
+            valueInputOption='RAW',
+            insertDataOption='INSERT_ROWS',
+            body={'values': rows}
+        ).execute()
+        return True
+
+    def get_seen_set(self, username, topic, level):
+        return self.seen_sets.get(username, topic, level)
+
+    def put_seen_set(self, username, topic, level, bits):
+        updated = self.seen_sets.put(username, topic, level, bits)
+        self.seen_spool.enqueue(username, [username, topic, level,
+                                           base64.b64encode(bytes(bits)).decode('ascii'), f"{updated:.3f}"])
+        return True
+
+    def stats(self):
+        return {
+            "backend": self.name,
+            "worksheet_cache": self.worksheet_cache.stats(),
+            "seen_sets": self.seen_sets.stats(),
+            "seen_spool": self.seen_spool.stats(),
+            "clients": self.clients.stats()
+        }
+
+
+# ---------- Background Initialization ----------
+class StorageWarming(Exception):
+    """Raised by LazyStorage while the real backend is still connecting"""
+
+
+class LazyStorage(StorageBackend):
+    """
+    Builds the real backend with `factory()` on a background thread so the app
+    can start serving immediately. Until it is ready every storage call raises
+    StorageWarming. If the factory fails, in-memory storage is used instead.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.backend = None
+        self.error = None
+        self._started = time.monotonic()
+        self.init_seconds = None
+        self._ready = threading.Event()
+        threading.Thread(target=self._connect, name='storage-init', daemon=True).start()
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # Forked while still connecting: the connecting thread stayed in the parent
+        if not self._ready.is_set():
+            self._ready = threading.Event()
+            threading.Thread(target=self._connect, name='storage-init', daemon=True).start()
+
+    def _connect(self):
+        try:
+            backend = self.factory()
+        except Exception as e:
+            print(f"Warning: Google Sheets not available: {e}")
+            self.error = str(e)
+            backend = MemoryStorage()
+        self.backend = backend
+        self.init_seconds = round(time.monotonic() - self._started, 3)
+        self._ready.set()
+
+    @property
+    def name(self):
+        return self.backend.name if self.backend is not None else "warming"
+
+    def ready(self):
+        return self._ready.is_set()
+
+    def wait(self, timeout=None):
+        """Block until the backend is ready (or timeout); return readiness"""
+        return self._ready.wait(timeout)
+
+    def _require(self):
+        if self.backend is None:
+            raise StorageWarming("Storage is still connecting, please retry shortly")
+        return self.backend
+
+    def load_user_rows(self):
+        return self._require().load_user_rows()
+
+    def append_user(self, username, password_hash, name):
+        return self._require().append_user(username, password_hash, name)
+
+    def update_password_hash(self, username, password_hash):
+        return self._require().update_password_hash(username, password_hash)
+
+    def get_or_create_user_sheet(self, username):
+        return self._require().get_or_create_user_sheet(username)
+
+    def append_attempt_rows(self, username, rows):
+        return self._require().append_attempt_rows(username, rows)
+
+    def get_attempts(self, username, limit=100):
+        return self._require().get_attempts(username, limit=limit)
+
+    def get_seen_set(self, username, topic, level):
+        return self._require().get_seen_set(username, topic, level)
+
+    def put_seen_set(self, username, topic, level, bits):
+        return self._require().put_seen_set(username, topic, level, bits)
+
+    def stats(self):
+        if self.backend is None:
+            return {"backend": self.name, "warming_seconds": round(time.monotonic() - self._started, 3)}
+        return dict(self.backend.stats(), init_seconds=self.init_seconds, init_error=self.error)
+
+
+def unwrap(backend):
+    """The concrete backend behind a LazyStorage (None while it is warming)"""
+    if isinstance(backend, LazyStorage):
+        return backend.backend
+    return backend
+
+
+# ---------- Backend Selection ----------
+def create_backend(name=STORAGE_BACKEND, lazy=STORAGE_LAZY_INIT):
+    """
+    Build the configured backend (STORAGE_BACKEND=sheets|sqlite).
+    If Google Sheets cannot be reached, fall back to in-memory storage.
+    With `lazy` (STORAGE_LAZY_INIT, default on) the Sheets connection is
+    opened in the background and a LazyStorage is returned right away.
+    """
+    name = name.lower()
+    if name == 'sqlite':
+        return SQLiteStorage(SQLITE_PATH)
+    if name != 'sheets':
+        print(f"Warning: Unknown STORAGE_BACKEND '{name}', using Google Sheets")
+    if lazy:
+        return LazyStorage(GoogleSheetsStorage)
+    try:
+        return GoogleSheetsStorage()
+    except Exception as e:
+        print(f"Warning: Google Sheets not available: {e}")
+        return MemoryStorage()
@@ -21,8 +21,14 @@ document.addEventListener('DOMContentLoaded', function() {
     if (logoutLink) {
         logoutLink.addEventListener('click', function(e) {
             e.preventDefault();
+            fetch('/api/logout', {
+                method: 'POST',
+                headers: { 'Authorization': 'Bearer ' + localStorage.getItem('ispace_auth_token') },
+                keepalive: true
+            });
                     localStorage.removeItem('ispace_username');
         localStorage.removeItem('ispace_auth_token');
+        localStorage.removeItem('ispace_auth_expires');
         window.location.href = '/';
         });
     }
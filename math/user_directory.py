@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+
+# ---------- Configuration ----------
+USER_DIRECTORY_TTL = float(os.getenv('USER_DIRECTORY_TTL', '300'))
+# A lookup for an unknown user may trigger a reload (e.g. registered via another worker),
+# but no more often than this
+MISS_REFRESH_INTERVAL = float(os.getenv('USER_DIRECTORY_MISS_REFRESH', '5'))
+
+
+def normalize_username(username):
+    return username.strip().lower()
+
+
+# ---------- In-memory User Directory ----------
+class UserDirectory:
+    """
+    Users keyed by normalized username, loaded from `loader()` (rows of
+    [username, password_hash, name]) and refreshed after USER_DIRECTORY_TTL
+    seconds. Registrations are written through with add(). Lookups are a
+    single dict hit.
+
+    Refreshes are single-flight: when the TTL expires one caller reloads
+    while concurrent lookups keep using the current snapshot, and callers
+    that must wait for a reload (first load, unknown user) share the one
+    already in progress instead of each fetching every user again.
+    """
+
+    def __init__(self, loader, ttl=USER_DIRECTORY_TTL, miss_refresh_interval=MISS_REFRESH_INTERVAL):
+        self.loader = loader
+        self.ttl = ttl
+        self.miss_refresh_interval = miss_refresh_interval
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._users = {}  # normalized username -> {'username', 'password_hash', 'name'}
+        self._loaded_at = None
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def refresh(self):
+        """Reload every user; on failure the previous snapshot is kept"""
+        try:
+            rows = self.loader()
+        except Exception as e:
+            print(f"Error refreshing user directory: {e}")
+            return False
+        users = {}
+        for row in rows:
+            if len(row) < 2:
+                continue  # Skip incomplete rows
+            username = row[0].strip()
+            users[normalize_username(username)] = {
+                'username': username,
+                'password_hash': row[1].strip(),
+                'name': row[2] if len(row) > 2 else username,
+            }
+        with self._lock:
+            self._users = users
+            self._loaded_at = time.monotonic()
+            self.refreshes += 1
+        return True
+
+    def _age(self):
+        return None if self._loaded_at is None else time.monotonic() - self._loaded_at
+
+    def _refresh_once(self, wait):
+        """
+        Refresh unless another caller is already doing it. With `wait`, block until
+        that refresh finishes and use its result; otherwise return at once.
+        """
+        seen = self.refreshes
+        if not self._refresh_lock.acquire(blocking=wait):
+            return
+        try:
+            if self.refreshes == seen:
+                self.refresh()
+        finally:
+            self._refresh_lock.release()
+
+    def get(self, username):
+        """Return the user record for a username, or None"""
+        key = normalize_username(username)
+        age = self._age()
+        if age is None or age > self.ttl:
+            self.misses += 1
+            # Without any snapshot there is nothing to serve from, so wait for the load
+            self._refresh_once(wait=age is None)
+            return self._users.get(key)
+
+        user = self._users.get(key)
+        if user is None and age > self.miss_refresh_interval:
+            self.misses += 1
+            self._refresh_once(wait=True)
+            return self._users.get(key)
+
+        self.hits += 1
+        return user
+
+    def exists(self, username):
+        return self.get(username) is not None
+
+    def add(self, username, password_hash, name):
+        """Write-through for a user that was just stored"""
+        with self._lock:
+            self._users[normalize_username(username)] = {
+                'username': username,
+                'password_hash': password_hash,
+                'name': name,
+            }
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        age = self._age()
+        return {
+            "size": len(self._users),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "refreshes": self.refreshes,
+            "age_seconds": round(age, 1) if age is not None else None,
+            "ttl_seconds": self.ttl,
+        }
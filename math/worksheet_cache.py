@@ -0,0 +1,99 @@
+import threading
+
+
+def clean_worksheet_name(username):
+    """Worksheet name for a user: spaces, hyphens and dots become underscores, other symbols are dropped"""
+    name = username.replace(' ', '_').replace('-', '_').replace('.', '_')
+    return ''.join(c for c in name if c.isalnum() or c == '_')
+
+
+# ---------- Username -> Worksheet Cache ----------
+class WorksheetCache:
+    """
+    Cache of worksheet handles keyed by cleaned worksheet name.
+
+    Populated from a single spreadsheet.worksheets() metadata fetch and
+    updated in place when a worksheet is created. Lookups are exact or
+    case-insensitive dict hits; nothing is re-listed on the hot path.
+    Call invalidate() when a cached handle is known to be wrong.
+
+    `spreadsheet()` returns the calling thread's gspread Spreadsheet
+    (SheetsClientPool.spreadsheet): gspread clients are not thread-safe, so
+    handles are handed out bound to the caller's own client.
+    """
+
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+        self._lock = threading.Lock()
+        self._by_title = {}  # exact title -> Worksheet
+        self._by_lower = {}  # lowercased title -> Worksheet
+        self._loaded = False
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def refresh(self):
+        """Rebuild the cache from one worksheet metadata fetch"""
+        worksheets = self.spreadsheet().worksheets()
+        with self._lock:
+            self._by_title = {ws.title: ws for ws in worksheets}
+            self._by_lower = {}
+            for ws in worksheets:
+                self._by_lower.setdefault(ws.title.lower(), ws)
+            self._loaded = True
+            self.refreshes += 1
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.refresh()
+
+    def _bind(self, worksheet):
+        """The worksheet handle on the calling thread's client (no API call)"""
+        spreadsheet = self.spreadsheet()
+        if worksheet.spreadsheet is spreadsheet:
+            return worksheet
+        return type(worksheet)(spreadsheet, dict(worksheet._properties))
+
+    def get(self, username):
+        """Return the cached Worksheet for a user, or None"""
+        self._ensure_loaded()
+        name = clean_worksheet_name(username)
+        worksheet = self._by_title.get(name) or self._by_lower.get(name.lower())
+        if worksheet is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            worksheet = self._bind(worksheet)
+        return worksheet
+
+    def add(self, worksheet):
+        """Record a worksheet that was just created"""
+        with self._lock:
+            self._by_title[worksheet.title] = worksheet
+            self._by_lower.setdefault(worksheet.title.lower(), worksheet)
+
+    def invalidate(self, username=None):
+        """Forget one user's handle, or everything (the next lookup re-fetches metadata)"""
+        with self._lock:
+            if username is None:
+                self._by_title = {}
+                self._by_lower = {}
+                self._loaded = False
+                return
+            name = clean_worksheet_name(username)
+            for ws in (self._by_title.get(name), self._by_lower.get(name.lower())):
+                if ws is not None:
+                    self._by_title.pop(ws.title, None)
+                    self._by_lower.pop(ws.title.lower(), None)
+
+    def titles(self):
+        self._ensure_loaded()
+        return list(self._by_title)
+
+    def stats(self):
+        return {
+            "cached_worksheets": len(self._by_title),
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+        }